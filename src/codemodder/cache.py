@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from codemodder.change import Action, Change, ChangeSet, DiffSide, PackageAction, Result
+from codemodder.dependency import DefusedXML, Dependency, Fickling, FlaskWTF, Security
+from codemodder.file_context import FileContext
+from codemodder.logging import logger
+
+DEFAULT_CACHE_MAX_SIZE_MB = 512
+
+# Dependencies are stored by requirement and restored from the known ones
+KNOWN_DEPENDENCIES = {
+    str(dependency.requirement): dependency
+    for dependency in (DefusedXML, Fickling, FlaskWTF, Security)
+}
+
+
+@dataclass
+class CacheEntry:
+    """
+    The outcome of applying a codemod to a given version of a file
+
+    A `change_set` of `None` records that the codemod made no change.
+    """
+
+    change_set: ChangeSet | None
+    code: str | None = None
+    dependencies: set[Dependency] = field(default_factory=set)
+
+    def to_json(self):
+        return {
+            "changeSet": self.change_set.to_json() if self.change_set else None,
+            "code": self.code,
+            "dependencies": sorted(str(dep.requirement) for dep in self.dependencies),
+        }
+
+    @classmethod
+    def from_json(cls, data) -> "CacheEntry":
+        """
+        :raises KeyError: If a dependency isn't known or the data is missing a field
+        """
+        change_set = data["changeSet"]
+        return cls(
+            (
+                ChangeSet(
+                    change_set["path"],
+                    change_set["diff"],
+                    [_change_from_json(change) for change in change_set["changes"]],
+                )
+                if change_set is not None
+                else None
+            ),
+            data["code"],
+            {KNOWN_DEPENDENCIES[requirement] for requirement in data["dependencies"]},
+        )
+
+
+def _change_from_json(data) -> Change:
+    return Change(
+        int(data["lineNumber"]),
+        data["description"],
+        DiffSide(data["diffSide"]),
+        data["properties"],
+        [
+            PackageAction(
+                Action(action["action"].lower()),
+                Result(action["result"].lower()),
+                action["package"],
+            )
+            for action in data["packageActions"]
+        ],
+    )
+
+
+class ResultCache:
+    """
+    On-disk cache of codemod results shared by all runs that use the same directory
+
+    Entries are keyed by the content of the file, the codemod (including its
+    version and detector rules) and everything else that determines the
+    result for a file. The least recently used entries are evicted once the
+    cache grows beyond `max_size` bytes. Entries are stored as JSON so that
+    reading the cache can't run any code, and entries that can't be decoded
+    are cache misses.
+    """
+
+    directory: Path
+    max_size: int
+
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, file_context: FileContext, source: str) -> str | None:
+        """
+        Return the cache key for the given file context and file source, or `None` if the file context can't be cached
+        """
+        if file_context.cache_key is None:
+            return None
+
+        digest = hashlib.sha256()
+        for part in (
+            file_context.cache_key,
+            os.path.relpath(file_context.file_path, file_context.base_directory),
+            self._findings_key(file_context),
+            repr(file_context.line_include),
+            repr(file_context.line_exclude),
+            repr(file_context.lines_changed_since),
+            source,
+        ):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _findings_key(self, file_context: FileContext) -> str:
+        # Locations in the file itself are not keyed by path so that the key
+        # doesn't depend on where the project is checked out
+        if file_context.findings is None:
+            return "None"
+        file_paths = {
+            file_context.file_path,
+            Path(os.path.relpath(file_context.file_path, file_context.base_directory)),
+        }
+        return repr(
+            [
+                (
+                    type(result).__name__,
+                    result.rule_id,
+                    [
+                        (
+                            ("" if location.file in file_paths else str(location.file)),
+                            location.start.line,
+                            location.start.column,
+                            location.end.line,
+                            location.end.column,
+                        )
+                        for location in result.locations
+                    ],
+                )
+                for result in file_context.findings
+            ]
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = CacheEntry.from_json(json.load(f))
+            # The modification time is used to evict the least recently used entries
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.debug("unable to read cache entry %s", path, exc_info=True)
+            return None
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        if any(
+            str(dep.requirement) not in KNOWN_DEPENDENCIES for dep in entry.dependencies
+        ):
+            # The entry couldn't be restored
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Write atomically since entries may be written by several workers
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry.to_json(), f)
+            os.replace(tmp_name, path)
+        except Exception:
+            logger.debug("unable to write cache entry %s", path, exc_info=True)
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits within `max_size`
+        """
+        entries = []
+        total_size = 0
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
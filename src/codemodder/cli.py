@@ -3,9 +3,11 @@ import json
 import sys
 
 from codemodder import __version__
+from codemodder.cache import DEFAULT_CACHE_MAX_SIZE_MB
 from codemodder.code_directory import DEFAULT_EXCLUDED_PATHS, DEFAULT_INCLUDED_PATHS
 from codemodder.logging import OutputFormat, logger
 from codemodder.registry import CodemodRegistry
+from codemodder.utils.utils import available_cpu_count
 
 
 class ArgumentParser(argparse.ArgumentParser):
@@ -103,6 +105,25 @@ def build_codemod_validator(codemod_registry: CodemodRegistry):
     return ValidatedCodmods
 
 
+def max_workers_type(value: str) -> int:
+    """
+    argparse type for `--max-workers` which accepts either a positive integer or "auto"
+    """
+    if value == "auto":
+        return available_cpu_count()
+    try:
+        max_workers = int(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(
+            f"invalid value: {value!r} (must be a positive integer or 'auto')"
+        ) from err
+    if max_workers < 1:
+        raise argparse.ArgumentTypeError(
+            f"invalid value: {value!r} (must be a positive integer or 'auto')"
+        )
+    return max_workers
+
+
 def parse_args(argv, codemod_registry: CodemodRegistry):
     """
     Parse CLI arguments according to:
@@ -149,7 +170,12 @@ def parse_args(argv, codemod_registry: CodemodRegistry):
         type=str,
         help="the format for the data output file",
         default="codetf",
-        choices=["codetf", "diff"],
+        choices=["codetf", "codetf-jsonl", "diff"],
+    )
+    parser.add_argument(
+        "--stream-output",
+        action=argparse.BooleanOptionalAction,
+        help="write the results of each codemod to the output file as soon as it finishes instead of at the end of the run; always enabled for codetf-jsonl",
     )
     parser.add_argument(
         "--dry-run",
@@ -184,11 +210,39 @@ def parse_args(argv, codemod_registry: CodemodRegistry):
         default=DEFAULT_INCLUDED_PATHS,
         help="Comma-separated set of UNIX glob patterns to include",
     )
+    parser.add_argument(
+        "--since",
+        type=str,
+        help="only analyze the Python files and lines changed since the given git ref",
+    )
+    parser.add_argument(
+        "--file-major",
+        action=argparse.BooleanOptionalAction,
+        help="parse each file once and apply all codemods to it before moving to the next file",
+    )
     parser.add_argument(
         "--max-workers",
-        type=int,
+        type=max_workers_type,
         default=1,
-        help="maximum number of workers (threads) to use for processing files in parallel",
+        help="maximum number of workers to use for processing files in parallel, or 'auto' to use the number of available CPUs",
+    )
+    parser.add_argument(
+        "--executor",
+        type=str,
+        default="thread",
+        choices=["thread", "process"],
+        help="whether workers are threads or processes; processes are not limited by the GIL",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="directory for caching codemod results between runs; unchanged files are not analyzed again",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        help="maximum size of the cache in megabytes; least recently used results are evicted first",
     )
 
     # At this time we don't do anything with the sarif arg.
@@ -1,7 +1,9 @@
 import fnmatch
-import itertools
+import os
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Callable, Collection, Optional, Sequence
 
 DEFAULT_INCLUDED_PATHS = ["**.py", "**/*.py"]
 DEFAULT_EXCLUDED_PATHS = [
@@ -39,20 +41,112 @@ def file_line_patterns(file_path: str | Path, patterns: Sequence[str]):
     ]
 
 
-def filter_files(names: Sequence[str], patterns: Sequence[str], exclude: bool = False):
-    patterns = (
+def _file_patterns(patterns: Sequence[str] | None, exclude: bool) -> list[str]:
+    return (
         [x.split(":")[0] for x in (patterns or [])]
         if not exclude
         # An excluded line should not cause the entire file to be excluded
         else [x for x in (patterns or []) if ":" not in x]
     )
-    return itertools.chain(*[fnmatch.filter(names, pattern) for pattern in patterns])
+
+
+def compile_patterns(patterns: Sequence[str]) -> Callable[[str], bool]:
+    """
+    Compile UNIX glob patterns into a single function that returns whether a name matches any of them
+    """
+    if not patterns:
+        return lambda name: False
+    regex = re.compile(
+        "|".join(
+            f"(?:{fnmatch.translate(os.path.normcase(pattern))})"
+            for pattern in patterns
+        )
+    )
+    return lambda name: regex.match(os.path.normcase(name)) is not None
+
+
+def _exclude_patterns(exclude_paths: Optional[Sequence[str]]) -> list[str]:
+    return _file_patterns(
+        exclude_paths if exclude_paths is not None else DEFAULT_EXCLUDED_PATHS,
+        exclude=True,
+    )
+
+
+@dataclass
+class ProjectFiles:
+    """
+    The files found by a single walk of a project directory
+    """
+
+    python_files: list[Path]
+    """Python files relative to the project directory"""
+    named_files: dict[str, list[Path]]
+    """Files with each of the requested names, shallowest first"""
+
+
+def scan_project(
+    parent_path: str | Path,
+    exclude_paths: Optional[Sequence[str]] = None,
+    file_names: Collection[str] = (),
+) -> ProjectFiles:
+    """
+    Walk the parent_path once to find all Python files and all files with the given names.
+
+    Directories are not descended into if every path below them is excluded.
+    Symbolic links to directories are not followed.
+
+    :param parent_path: str name for starting directory
+    :param exclude_paths: list of UNIX glob patterns to exclude
+    :param file_names: names of other files to find, e.g. `requirements.txt`
+    """
+    # Everything below a directory is excluded if the directory followed by a
+    # separator matches an exclude pattern without its trailing `*`, e.g. `venv/`
+    # for `venv/**`, since `*` matches any remaining path
+    is_excluded_dir = compile_patterns(
+        [
+            pattern.rstrip("*")
+            for pattern in _exclude_patterns(exclude_paths)
+            if pattern.endswith("*")
+        ]
+    )
+
+    python_files: list[Path] = []
+    named_files: dict[str, list[str]] = {name: [] for name in file_names}
+    dirs = [""]
+    while dirs:
+        rel_dir = dirs.pop()
+        try:
+            with os.scandir(os.path.join(parent_path, rel_dir)) as entries:
+                for entry in entries:
+                    name = rel_dir + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_excluded_dir(name + os.sep):
+                            dirs.append(name + os.sep)
+                        continue
+                    if entry.name in named_files and entry.is_file():
+                        named_files[entry.name].append(name)
+                    if os.path.splitext(entry.name)[1] == ".py" and entry.is_file():
+                        python_files.append(Path(name))
+        except OSError:
+            continue
+
+    return ProjectFiles(
+        python_files,
+        {
+            file_name: [
+                Path(parent_path).joinpath(name)
+                for name in sorted(names, key=lambda name: (name.count(os.sep), name))
+            ]
+            for file_name, names in named_files.items()
+        },
+    )
 
 
 def match_files(
     parent_path: str | Path,
     exclude_paths: Optional[Sequence[str]] = None,
     include_paths: Optional[Sequence[str]] = None,
+    candidate_files: Optional[Sequence[Path]] = None,
 ):
     """
     Find pattern-matching files starting at the parent_path, recursively.
@@ -63,30 +157,25 @@ def match_files(
     :param parent_path: str name for starting directory
     :param exclude_paths: list of UNIX glob patterns to exclude
     :param include_paths: list of UNIX glob patterns to exclude
+    :param candidate_files: only match among these existing paths relative to parent_path instead of walking the directory, e.g. `ProjectFiles.python_files`
 
     :return: list of <pathlib.PosixPath> files found within (including recursively) the parent directory
     that match the criteria of both exclude and include patterns.
     """
-    all_files = [
-        str(Path(path).relative_to(parent_path))
-        for path in Path(parent_path).rglob("*")
-    ]
-    included_files = set(
-        filter_files(
-            all_files,
+    is_included = compile_patterns(
+        _file_patterns(
             include_paths if include_paths is not None else DEFAULT_INCLUDED_PATHS,
+            exclude=False,
         )
     )
-    excluded_files = set(
-        filter_files(
-            all_files,
-            exclude_paths if exclude_paths is not None else DEFAULT_EXCLUDED_PATHS,
-            exclude=True,
-        )
-    )
+    is_excluded = compile_patterns(_exclude_patterns(exclude_paths))
+
+    if candidate_files is None:
+        candidate_files = scan_project(parent_path, exclude_paths).python_files
 
+    names = [str(path) for path in candidate_files if path.suffix == ".py"]
     return [
-        path
-        for p in sorted(list(included_files - excluded_files))
-        if (path := Path(parent_path).joinpath(p)).is_file() and path.suffix == ".py"
+        Path(parent_path).joinpath(name)
+        for name in sorted(names)
+        if is_included(name) and not is_excluded(name)
     ]
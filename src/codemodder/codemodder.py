@@ -1,4 +1,5 @@
 import datetime
+import functools
 import itertools
 import logging
 import os
@@ -6,20 +7,34 @@ import sys
 from pathlib import Path
 from typing import Sequence
 
+import git
+
 from codemodder import __version__, registry
+from codemodder.cache import ResultCache
 from codemodder.cli import parse_args
-from codemodder.code_directory import match_files
+from codemodder.code_directory import match_files, scan_project
 from codemodder.codemods.api import BaseCodemod
+from codemodder.codemods.libcst_transformer import (
+    LibcstTransformerPipeline,
+    apply_codemods_to_file,
+)
 from codemodder.codemods.semgrep import SemgrepRuleDetector
 from codemodder.context import CodemodExecutionContext
 from codemodder.dependency import Dependency
+from codemodder.file_context import FileContext
+from codemodder.git_changes import changed_lines_since
 from codemodder.logging import configure_logger, log_list, log_section, logger
 from codemodder.project_analysis.file_parsers.package_store import PackageStore
-from codemodder.project_analysis.python_repo_manager import PythonRepoManager
-from codemodder.report.codetf_reporter import report_default
+from codemodder.project_analysis.python_repo_manager import (
+    PACKAGE_FILE_NAMES,
+    PythonRepoManager,
+)
+from codemodder.report.codetf_reporter import CodeTFStream, report_default
+from codemodder.report.diff_reporter import DiffStream
 from codemodder.result import ResultSet
 from codemodder.sarifs import detect_sarif_tools
 from codemodder.semgrep import run as run_semgrep
+from codemodder.utils.utils import peak_memory_mb
 
 
 def update_code(file_path, new_code):
@@ -35,7 +50,10 @@ def find_semgrep_results(
     codemods: Sequence[BaseCodemod],
     files_to_analyze: list[Path] | None = None,
 ) -> ResultSet:
-    """Run semgrep once with all configuration files from all codemods and return a set of applicable rule IDs"""
+    """Run semgrep once with all configuration files from all codemods and return a set of applicable rule IDs
+
+    The results are stored in the context so that semgrep detectors can reuse them instead of running semgrep again.
+    """
     yaml_files = list(
         itertools.chain.from_iterable(
             [
@@ -46,10 +64,12 @@ def find_semgrep_results(
             ]
         )
     )
-    if not yaml_files:
+    if not yaml_files or files_to_analyze == []:
         return ResultSet()
 
-    return run_semgrep(context, yaml_files, files_to_analyze)
+    results = run_semgrep(context, yaml_files, files_to_analyze)
+    context.semgrep_prefilter_results = results
+    return results
 
 
 def log_report(context, argv, elapsed_ms, files_to_analyze):
@@ -67,12 +87,45 @@ def log_report(context, argv, elapsed_ms, files_to_analyze):
         len(all_changes),
         len(set(all_changes)),
     )
+    logger.info("semgrep runs: %s", context.semgrep_run_count)
+    if context.cache:
+        logger.info(
+            "cache: %s hits, %s misses",
+            context.cache_hits,
+            context.cache_misses,
+        )
     logger.info("report file: %s", argv.output)
     logger.info("total elapsed: %s ms", elapsed_ms)
     logger.info("  semgrep:     %s ms", context.timer.get_time_ms("semgrep"))
     logger.info("  parse:       %s ms", context.timer.get_time_ms("parse"))
     logger.info("  transform:   %s ms", context.timer.get_time_ms("transform"))
     logger.info("  write:       %s ms", context.timer.get_time_ms("write"))
+    if (peak_memory := peak_memory_mb()) is not None:
+        logger.info("peak memory: %.1f MB", peak_memory)
+
+
+def files_for_codemod(
+    codemod: BaseCodemod,
+    semgrep_results: ResultSet,
+    files_to_analyze: list[Path],
+) -> list[Path] | None:
+    """
+    Return the files a codemod should be applied to, or `None` if the codemod should be skipped
+    """
+    if isinstance(codemod.detector, SemgrepRuleDetector):
+        # Unfortunately the IDs from semgrep are not fully specified
+        # TODO: eventually we need to be able to use fully specified IDs here
+        if codemod.name not in semgrep_results.all_rule_ids():
+            logger.debug(
+                "no results from semgrep for %s, skipping analysis",
+                codemod.id,
+            )
+            return None
+
+        return semgrep_results.files_for_rule(codemod.name)
+
+    # Non-semgrep codemods ignore the semgrep results
+    return files_to_analyze
 
 
 def apply_codemods(
@@ -91,29 +144,153 @@ def apply_codemods(
         logger.info("no codemods to run")
         return
 
-    semgrep_finding_ids = semgrep_results.all_rule_ids()
-
     # run codemods one at a time making sure to respect the given sequence
     for codemod in codemods_to_run:
         # NOTE: this may be used as a progress indicator by upstream tools
         logger.info("running codemod %s", codemod.id)
 
-        if isinstance(codemod.detector, SemgrepRuleDetector):
-            # Unfortunately the IDs from semgrep are not fully specified
-            # TODO: eventually we need to be able to use fully specified IDs here
-            if codemod.name not in semgrep_finding_ids:
-                logger.debug(
-                    "no results from semgrep for %s, skipping analysis",
-                    codemod.id,
-                )
-                continue
+        codemod_files = files_for_codemod(codemod, semgrep_results, files_to_analyze)
+        if codemod_files is None:
+            continue
+
+        codemod.apply(context, codemod_files)
+        record_dependency_update(context.process_dependencies(codemod.id))
+        context.log_changes(codemod.id)
+        context.report_results(codemod)
+
+
+def apply_codemods_file_major(
+    context: CodemodExecutionContext,
+    codemods_to_run: Sequence[BaseCodemod],
+    semgrep_results: ResultSet,
+    files_to_analyze: list[Path],
+):
+    """
+    Apply all codemods to one file at a time instead of one codemod at a time
+
+    Each file is parsed once and the tree is passed through every codemod in
+    the given sequence. The results reported for each codemod are the same as
+    for `apply_codemods`.
+    """
+    if not all(
+        isinstance(codemod.transformer, LibcstTransformerPipeline)
+        for codemod in codemods_to_run
+    ):
+        logger.info("file-major mode requires libcst codemods, running codemod-major")
+        apply_codemods(context, codemods_to_run, semgrep_results, files_to_analyze)
+        return
+
+    log_section("scanning")
+
+    if not files_to_analyze:
+        logger.info("no files to scan")
+        return
+
+    if not codemods_to_run:
+        logger.info("no codemods to run")
+        return
+
+    codemods_with_files: list[tuple[BaseCodemod, list[Path]]] = []
+    detector_results: dict[str, ResultSet | None] = {}
+    for codemod in codemods_to_run:
+        # NOTE: this may be used as a progress indicator by upstream tools
+        logger.info("running codemod %s", codemod.id)
+
+        codemod_files = files_for_codemod(codemod, semgrep_results, files_to_analyze)
+        if codemod_files is None:
+            continue
 
-            files_to_analyze = semgrep_results.files_for_rule(codemod.name)
+        codemod_files = codemod.files_with_triggers(context, codemod_files)
+        if not codemod_files:
+            logger.debug(
+                "no files mention triggers for %s, skipping analysis", codemod.id
+            )
+            continue
 
-        # Non-semgrep codemods ignore the semgrep results
-        codemod.apply(context, files_to_analyze)
+        results = (
+            codemod.detector.apply(codemod.name, context, codemod_files)
+            if codemod.detector
+            else None
+        )
+        codemod_files = codemod.files_with_results(
+            context, results, codemod_files, codemod.rules
+        )
+        if not codemod_files:
+            logger.debug("no results for %s, skipping analysis", codemod.id)
+            continue
+
+        codemods_with_files.append((codemod, codemod_files))
+        detector_results[codemod.id] = results
+
+    files_by_codemod = {
+        codemod.id: set(codemod_files) for codemod, codemod_files in codemods_with_files
+    }
+    file_contexts_by_codemod: dict[str, dict[Path, FileContext]] = {
+        codemod.id: {} for codemod, _ in codemods_with_files
+    }
+    all_files = dict.fromkeys(
+        itertools.chain(
+            files_to_analyze,
+            *(codemod_files for _, codemod_files in codemods_with_files),
+        )
+    )
+    codemods_by_file = [
+        [
+            codemod
+            for codemod, _ in codemods_with_files
+            if filename in files_by_codemod[codemod.id]
+        ]
+        for filename in all_files
+    ]
+    # File contexts only contain the results for their own file so they are
+    # cheap to send to worker processes. They are built as workers become
+    # free, see `CodemodExecutionContext.map`.
+    pipelines_by_file = (
+        [
+            (
+                codemod.transformer,
+                codemod.build_file_context(
+                    filename, context, detector_results[codemod.id], codemod.rules
+                ),
+            )
+            for codemod in codemods
+        ]
+        for filename, codemods in zip(all_files, codemods_by_file)
+    )
+    process_file = functools.partial(apply_codemods_to_file, context)
+    for filename, codemods, file_contexts in zip(
+        all_files,
+        codemods_by_file,
+        context.map(process_file, all_files, pipelines_by_file),
+    ):
+        for codemod, file_context in zip(codemods, file_contexts):
+            context.report_change_sets(file_context.results)
+            if (
+                file_context.results
+                or file_context.failures
+                or file_context.dependencies
+            ):
+                file_contexts_by_codemod[codemod.id][filename] = file_context
+            else:
+                # Nothing is reported for the file, so only its timings and
+                # use of the cache are recorded rather than keeping it
+                context.process_results(codemod.id, [file_context], reported=True)
+
+    for codemod, codemod_files in codemods_with_files:
+        # Report results in the same order as when running one codemod at a time
+        file_contexts_for_codemod = file_contexts_by_codemod[codemod.id]
+        context.process_results(
+            codemod.id,
+            (
+                file_contexts_for_codemod[filename]
+                for filename in codemod_files
+                if filename in file_contexts_for_codemod
+            ),
+            reported=True,
+        )
         record_dependency_update(context.process_dependencies(codemod.id))
         context.log_changes(codemod.id)
+        context.report_results(codemod)
 
 
 def record_dependency_update(dependency_results: dict[Dependency, PackageStore | None]):
@@ -163,9 +340,26 @@ def run(original_args) -> int:
     )
     tool_result_files_map["sonar"] = argv.sonar_issues_json
 
-    repo_manager = PythonRepoManager(Path(argv.directory))
+    directory = Path(argv.directory)
+    project_files = None
+    changed_lines = None
+    if argv.since:
+        try:
+            changed_lines = changed_lines_since(directory, argv.since)
+        except git.GitError as err:
+            logger.error("unable to find changes since '%s': %s", argv.since, err)
+            return 1
+        candidate_files = list(changed_lines)
+        logger.info("changed since %s: %s files", argv.since, len(candidate_files))
+    else:
+        # Source files and package store files are found in a single walk
+        project_files = scan_project(directory, argv.path_exclude, PACKAGE_FILE_NAMES)
+        candidate_files = project_files.python_files
+
+    # Package stores are only parsed once a codemod adds a dependency
+    repo_manager = PythonRepoManager(directory, project_files, argv.path_exclude)
     context = CodemodExecutionContext(
-        Path(argv.directory),
+        directory,
         argv.dry_run,
         argv.verbose,
         codemod_registry,
@@ -174,9 +368,32 @@ def run(original_args) -> int:
         argv.path_exclude,
         tool_result_files_map,
         argv.max_workers,
+        argv.executor,
+        (
+            ResultCache(Path(argv.cache_dir), argv.cache_max_size * 1024 * 1024)
+            if argv.cache_dir
+            else None
+        ),
     )
 
-    repo_manager.parse_project()
+    file_major = argv.file_major
+    if argv.output and argv.output_format == "diff":
+        context.reporter = DiffStream(argv.output, directory)
+        context.reporter.open()
+        # The changes of each codemod to a file must apply after the ones
+        # before it, which a dry run only does one file at a time
+        context.sequential_changes = True
+        file_major = file_major or argv.dry_run
+    elif argv.output and (argv.stream_output or argv.output_format == "codetf-jsonl"):
+        context.reporter = CodeTFStream(
+            argv.output, json_lines=argv.output_format == "codetf-jsonl"
+        )
+        context.reporter.open()
+
+    if changed_lines is not None:
+        context.changed_lines = {
+            directory.joinpath(path): lines for path, lines in changed_lines.items()
+        }
 
     # TODO: this should be a method of CodemodExecutionContext
     codemods_to_run = codemod_registry.match_codemods(
@@ -185,13 +402,18 @@ def run(original_args) -> int:
         sast_only=argv.sonar_issues_json or argv.sarif,
     )
 
+    # Each file is scanned once for the triggers of all the codemods
+    context.trigger_scanner.add(
+        itertools.chain.from_iterable(codemod.triggers for codemod in codemods_to_run)
+    )
+
     log_section("setup")
     log_list(logging.INFO, "running", codemods_to_run, predicate=lambda c: c.id)
     log_list(logging.INFO, "including paths", argv.path_include)
     log_list(logging.INFO, "excluding paths", argv.path_exclude)
 
     files_to_analyze: list[Path] = match_files(
-        context.directory, argv.path_exclude, argv.path_include
+        context.directory, argv.path_exclude, argv.path_include, candidate_files
     )
 
     full_names = [str(path) for path in files_to_analyze]
@@ -203,19 +425,43 @@ def run(original_args) -> int:
         files_to_analyze,
     )
 
-    apply_codemods(
-        context,
-        codemods_to_run,
-        semgrep_results,
-        files_to_analyze,
-    )
+    try:
+        if file_major:
+            apply_codemods_file_major(
+                context,
+                codemods_to_run,
+                semgrep_results,
+                files_to_analyze,
+            )
+        else:
+            apply_codemods(
+                context,
+                codemods_to_run,
+                semgrep_results,
+                files_to_analyze,
+            )
+    finally:
+        context.shutdown()
+        if context.cache:
+            context.cache.evict()
 
-    results = context.compile_results(codemods_to_run)
+    context.write_dependencies()
+
+    if context.reporter is None:
+        results = context.compile_results(codemods_to_run)
+    else:
+        # Codemods that were skipped still have an entry in the report
+        for codemod in codemods_to_run:
+            context.report_results(codemod)
 
     elapsed = datetime.datetime.now() - start
     elapsed_ms = int(elapsed.total_seconds() * 1000)
 
-    if argv.output:
+    if context.reporter is not None:
+        context.reporter.finish(
+            elapsed_ms, original_args, os.path.abspath(argv.directory)
+        )
+    elif argv.output:
         report_default(elapsed_ms, argv, original_args, results)
 
     log_report(context, argv, elapsed_ms, files_to_analyze)
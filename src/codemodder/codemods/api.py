@@ -24,6 +24,8 @@ class SimpleCodemod(LibcstResultTransformer, metaclass=ABCMeta):
     Child classes must implement the following attributes:
     - metadata: Metadata
     - codemod_base: type[BaseCodemod]
+
+    Child classes may set `prune_by_results` to skip the statements that don't overlap any result.
     """
 
     metadata: Metadata
@@ -50,5 +52,7 @@ class SimpleCodemod(LibcstResultTransformer, metaclass=ABCMeta):
                 else None
             ),
             # This allows the transformer to inherit all the methods of the class itself
-            transformer=LibcstTransformerPipeline(cls),
+            transformer=LibcstTransformerPipeline(
+                cls, prune_by_results=cls.prune_by_results
+            ),
         )
@@ -1,14 +1,14 @@
 import functools
+import hashlib
 import importlib.resources
 from abc import ABCMeta, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import cached_property
 from importlib.abc import Traversable
 from pathlib import Path
 
-from codemodder.code_directory import file_line_patterns
+from codemodder import __version__
 from codemodder.codemods.base_detector import BaseDetector
 from codemodder.codemods.base_transformer import BaseTransformerPipeline
 from codemodder.context import CodemodExecutionContext
@@ -42,6 +42,7 @@ class Metadata:
     review_guidance: ReviewGuidance
     references: list[Reference] = field(default_factory=list)
     description: str | None = None
+    triggers: list[str] = field(default_factory=list)
 
 
 class BaseCodemod(metaclass=ABCMeta):
@@ -49,7 +50,8 @@ class BaseCodemod(metaclass=ABCMeta):
     Base class for all codemods
 
     Conceptually a codemod is composed of the following attributes:
-    * Metadata: contains information about the codemod including its name, summary, and review guidance
+    * Metadata: contains information about the codemod including its name, summary, and review guidance,
+      and optionally the names (imported modules or identifiers) that a file must mention for the codemod to apply
     * Detector (optional): the source of results indicating which code locations the codemod should be applied
     * Transformer: a transformer pipeline that will be applied to each applicable file and perform the actual modifications
 
@@ -119,6 +121,32 @@ class BaseCodemod(metaclass=ABCMeta):
     def references(self) -> list[Reference]:
         return self._metadata.references
 
+    @property
+    def triggers(self) -> list[str]:
+        """The names a file must mention for this codemod to apply, if any"""
+        return self._metadata.triggers
+
+    @property
+    def rules(self) -> list[str]:
+        """The detector rules whose results are used by this codemod"""
+        return [self.name]
+
+    @cached_property
+    def cache_key(self) -> str:
+        """
+        Identifies the codemod, the codemodder version, and the detector rules in the result cache
+        """
+        digest = hashlib.sha256()
+        for part in (
+            self.id,
+            __version__,
+            *self.rules,
+            self.detector.rules_hash() if self.detector else "",
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
     def describe(self):
         return {
             "codemod": self.id,
@@ -133,6 +161,11 @@ class BaseCodemod(metaclass=ABCMeta):
         files_to_analyze: list[Path],
         rules: list[str],
     ) -> None:
+        files_to_analyze = self.files_with_triggers(context, files_to_analyze)
+        if not files_to_analyze:
+            logger.debug("no files mention triggers for %s, skipping analysis", self.id)
+            return
+
         results = (
             # It seems like semgrep doesn't like our fully-specified id format
             self.detector.apply(self.name, context, files_to_analyze)
@@ -140,14 +173,21 @@ class BaseCodemod(metaclass=ABCMeta):
             else None
         )
 
-        process_file = functools.partial(
-            self._process_file, context=context, results=results, rules=rules
+        files_to_analyze = self.files_with_results(
+            context, results, files_to_analyze, rules
         )
-
-        with ThreadPoolExecutor() as executor:
-            logger.debug("using executor with %s workers", context.max_workers)
-            contexts = executor.map(process_file, files_to_analyze)
-            executor.shutdown(wait=True)
+        if not files_to_analyze:
+            logger.debug("no results for %s, skipping analysis", self.id)
+            return
+
+        # File contexts only contain the results for their own file so they
+        # are cheap to send to worker processes
+        file_contexts = [
+            self.build_file_context(filename, context, results, rules)
+            for filename in files_to_analyze
+        ]
+        process_file = functools.partial(self._process_file, self.transformer, context)
+        contexts = context.map(process_file, file_contexts)
 
         context.process_results(self.id, contexts)
 
@@ -172,17 +212,53 @@ class BaseCodemod(metaclass=ABCMeta):
         :param context: The codemod execution context
         :param files_to_analyze: The list of files to analyze
         """
-        self._apply(context, files_to_analyze, [self.name])
+        self._apply(context, files_to_analyze, self.rules)
 
-    def _process_file(
+    def files_with_triggers(
+        self,
+        context: CodemodExecutionContext,
+        files_to_analyze: list[Path],
+    ) -> list[Path]:
+        """
+        Return the files that mention any of the codemod's triggers
+
+        Codemods without triggers are given all the files.
+        """
+        return context.trigger_scanner.filter(files_to_analyze, self.triggers)
+
+    def files_with_results(
+        self,
+        context: CodemodExecutionContext,
+        results: ResultSet | None,
+        files_to_analyze: list[Path],
+        rules: list[str],
+    ) -> list[Path]:
+        """
+        Return the files that have any results for the given rules
+
+        Codemods without a detector don't rely on results so all files are returned.
+        """
+        if results is None:
+            return files_to_analyze
+        if not any(rule in results for rule in rules):
+            return []
+        return [
+            filename
+            for filename in files_to_analyze
+            if any(
+                results.results_for_rule_and_file(context, rule, filename)
+                for rule in rules
+            )
+        ]
+
+    def build_file_context(
         self,
         filename: Path,
         context: CodemodExecutionContext,
         results: ResultSet | None,
         rules: list[str],
-    ):
-        line_exclude = file_line_patterns(filename, context.path_exclude)
-        line_include = file_line_patterns(filename, context.path_include)
+    ) -> FileContext:
+        line_exclude, line_include = context.line_filters(filename)
         findings_for_rule = None
         if results is not None:
             findings_for_rule = []
@@ -191,18 +267,24 @@ class BaseCodemod(metaclass=ABCMeta):
                     results.results_for_rule_and_file(context, rule, filename)
                 )
 
-        file_context = FileContext(
+        return FileContext(
             context.directory,
             filename,
             line_exclude,
             line_include,
             findings_for_rule,
+            lines_changed_since=context.lines_changed_since(filename),
+            cache_key=self.cache_key if context.cache else None,
         )
 
-        # TODO: for SAST tools we should preemtively filter out files that are not part of the result set
-
-        if change_set := self.transformer.apply(
-            context, file_context, findings_for_rule
+    @staticmethod
+    def _process_file(
+        transformer: BaseTransformerPipeline,
+        context: CodemodExecutionContext,
+        file_context: FileContext,
+    ) -> FileContext:
+        if change_set := transformer.apply(
+            context, file_context, file_context.findings
         ):
             file_context.add_result(change_set)
 
@@ -6,6 +6,12 @@ from codemodder.result import ResultSet
 
 
 class BaseDetector(metaclass=ABCMeta):
+    def rules_hash(self) -> str:
+        """
+        Hash of any rules used by the detector, so that cached results are invalidated when the rules change
+        """
+        return ""
+
     @abstractmethod
     def apply(
         self,
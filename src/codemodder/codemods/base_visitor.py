@@ -1,15 +1,29 @@
 from typing import ClassVar, Collection
 
+import libcst as cst
 from libcst import MetadataDependent
-from libcst.codemod import ContextAwareVisitor, VisitorBasedCodemodCommand
+from libcst.codemod import (
+    Codemod,
+    CodemodContext,
+    ContextAwareVisitor,
+    VisitorBasedCodemodCommand,
+)
+from libcst.codemod.visitors import AddImportsVisitor, RemoveImportsVisitor
 from libcst.metadata import PositionProvider, ProviderT
 
-from codemodder.result import Result
+from codemodder.codemods.utils import KeepUnchangedNodes
+from codemodder.result import Result, ResultIndex
+
+# Set in the scratch of a codemod context whose requested import changes are
+# applied once at the end, see `apply_import_changes`
+DEFER_IMPORT_CHANGES = "codemodder.defer_import_changes"
 
 
 # TODO: this should just be part of BaseTransformer and BaseVisitor?
 class UtilsMixin(MetadataDependent):
     METADATA_DEPENDENCIES: ClassVar[Collection[ProviderT]] = (PositionProvider,)
+    # Whether `line_include` holds the lines changed since the `--since` ref
+    lines_changed_since: bool = False
 
     def __init__(
         self,
@@ -27,7 +41,18 @@ class UtilsMixin(MetadataDependent):
             # Returning True here means codemods without detectors (and results)
             # will still run their transformations.
             return True
-        return any(result.match_location(pos_to_match, node) for result in self.results)
+        return self.result_index.match_location(pos_to_match, node)
+
+    @property
+    def result_index(self) -> ResultIndex:
+        """
+        Index of the results by line, built once for each list of results
+        """
+        index = getattr(self, "_result_index", None)
+        if index is None or getattr(self, "_indexed_results", None) is not self.results:
+            index = self._result_index = ResultIndex(self.results or [])
+            self._indexed_results = self.results
+        return index
 
     def filter_by_path_includes_or_excludes(self, pos_to_match):
         """
@@ -41,6 +66,10 @@ class UtilsMixin(MetadataDependent):
         return True
 
     def node_is_selected(self, node) -> bool:
+        if isinstance(node, cst.Module) and self.lines_changed_since:
+            # The module spans all lines of the file so it's never included by
+            # the changed lines, the nodes within it are
+            return self.filter_by_result(node)
         pos_to_match = self.node_position(node)
         return self.filter_by_result(node) and self.filter_by_path_includes_or_excludes(
             pos_to_match
@@ -54,7 +83,48 @@ class UtilsMixin(MetadataDependent):
         return self.node_position(node).start.line
 
 
-class BaseTransformer(VisitorBasedCodemodCommand, UtilsMixin):
+class DeferredImportsCommand(VisitorBasedCodemodCommand):
+    """
+    Codemod command that can leave the import changes it requests to the end
+
+    A `VisitorBasedCodemodCommand` adds and removes the imports requested in
+    its context every time it transforms a module, including when it is
+    nested in another command sharing the same context. If the context
+    defers import changes they are left in the context instead, to be applied
+    once with `apply_import_changes`.
+    """
+
+    def transform_module(self, tree: cst.Module) -> cst.Module:
+        if self.context.scratch.get(DEFER_IMPORT_CHANGES):
+            return Codemod.transform_module(self, tree)
+        return super().transform_module(tree)
+
+
+class _AddImportsVisitor(KeepUnchangedNodes, AddImportsVisitor):
+    pass
+
+
+def apply_import_changes(context: CodemodContext, tree: cst.Module) -> cst.Module:
+    """
+    Add and remove the imports requested in the context, if any
+    """
+    for key, visitor_class in (
+        (AddImportsVisitor.CONTEXT_KEY, _AddImportsVisitor),
+        (RemoveImportsVisitor.CONTEXT_KEY, RemoveImportsVisitor),
+    ):
+        if not context.scratch.get(key):
+            continue
+        visitor = visitor_class(context)
+        if visitor.get_inherited_dependencies():
+            tree = visitor.transform_module(tree)
+        else:
+            # Without a metadata wrapper the tree isn't copied, so the
+            # statements that aren't changed remain the same nodes
+            tree = tree.visit(visitor)
+    return tree
+
+
+class BaseTransformer(DeferredImportsCommand, UtilsMixin):
     def __init__(
         self,
         context,
@@ -0,0 +1,243 @@
+import dataclasses
+import inspect
+from contextlib import ExitStack
+from typing import Sequence
+
+import libcst as cst
+from libcst import matchers
+from libcst.codemod import CodemodContext
+
+from codemodder.codemods.libcst_transformer import (
+    LibcstResultTransformer,
+    LibcstTransformerPipeline,
+)
+from codemodder.codemods.metadata_cache import metadata_cache
+from codemodder.codemods.utils import KeepUnchangedNodes
+from codemodder.file_context import FileContext
+
+# The hooks that don't depend on the type of the visited node
+GENERIC_HOOKS = {
+    "on_visit": (
+        cst.CSTTransformer.on_visit,
+        matchers.MatcherDecoratableTransformer.on_visit,
+        LibcstResultTransformer.on_visit,
+    ),
+    "on_leave": (
+        cst.CSTTransformer.on_leave,
+        matchers.MatcherDecoratableTransformer.on_leave,
+        KeepUnchangedNodes.on_leave,
+    ),
+    "on_visit_attribute": (
+        cst.CSTTransformer.on_visit_attribute,
+        matchers.MatcherDecoratableTransformer.on_visit_attribute,
+    ),
+    "on_leave_attribute": (
+        cst.CSTTransformer.on_leave_attribute,
+        matchers.MatcherDecoratableTransformer.on_leave_attribute,
+    ),
+}
+
+# The statements that transformers pruning by results may skip
+PRUNED_TYPES = frozenset(
+    cls.__name__
+    for cls in (
+        cst.SimpleStatementLine,
+        *cst.BaseCompoundStatement.__subclasses__(),
+    )
+)
+
+
+_handled_node_types: dict[type[cst.CSTTransformer], frozenset[str] | None] = {}
+
+
+def handled_node_types(cls: type[cst.CSTTransformer]) -> frozenset[str] | None:
+    """
+    Return the names of the node types that the transformer class has hooks for, or `None` if it may handle any node
+    """
+    if cls not in _handled_node_types:
+        _handled_node_types[cls] = _find_handled_node_types(cls)
+    return _handled_node_types[cls]
+
+
+def _find_handled_node_types(
+    cls: type[cst.CSTTransformer],
+) -> frozenset[str] | None:
+    if any(
+        getattr(cls, name) not in default_hooks
+        for name, default_hooks in GENERIC_HOOKS.items()
+    ):
+        return None
+
+    types = set()
+    for name in dir(cls):
+        prefix, _, rest = name.partition("_")
+        if prefix not in ("visit", "leave") or not rest:
+            continue
+        if getattr(cls, name) is not getattr(cst.CSTTransformer, name, None):
+            # Attribute hooks such as `visit_Call_func` belong to their node type
+            types.add(rest.split("_")[0])
+    return frozenset(types)
+
+
+class FusedVisitor(cst.CSTVisitor):
+    """
+    Walk a tree once on behalf of several transformers without changing it
+
+    Each transformer has its hooks called just as when it transforms the tree
+    by itself, but only for the node types it has hooks for. Once a
+    transformer returns a different node than the one it was given, or
+    raises, it is marked as changed and is no longer called since the rest
+    of its traversal would depend on that change.
+    """
+
+    transformers: list[cst.CSTTransformer]
+    changed: list[bool]
+
+    def __init__(self, transformers: Sequence[cst.CSTTransformer]):
+        super().__init__()
+        self.transformers = list(transformers)
+        self.changed = [False] * len(self.transformers)
+        self._handled = [self._handled_types(t) for t in self.transformers]
+        # The node below which each transformer doesn't visit children, if any
+        self._skipped_at: list[cst.CSTNode | None] = [None] * len(self.transformers)
+
+    @staticmethod
+    def _handled_types(transformer: cst.CSTTransformer) -> frozenset[str] | None:
+        # Matchers are tracked for every node
+        if isinstance(transformer, matchers.MatcherDecoratableTransformer) and (
+            transformer._matchers
+            or transformer._extra_visit_funcs
+            or transformer._extra_leave_funcs
+        ):
+            return None
+        types = handled_node_types(type(transformer))
+        if (
+            types is not None
+            and isinstance(transformer, LibcstResultTransformer)
+            and transformer.prune_by_results
+            and transformer.results is not None
+        ):
+            types |= PRUNED_TYPES
+        return types
+
+    def _active(self, node: cst.CSTNode):
+        """
+        Yield the index of each transformer that should see the node
+        """
+        name = type(node).__name__
+        for index, handled in enumerate(self._handled):
+            if self.changed[index] or self._skipped_at[index] is not None:
+                continue
+            if handled is None or name in handled:
+                yield index
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        for index in self._active(node):
+            try:
+                visit_children = self.transformers[index].on_visit(node)
+            except Exception:
+                self.changed[index] = True
+                continue
+            if not visit_children:
+                self._skipped_at[index] = node
+        # Children are only visited if any transformer still needs them
+        return not all(
+            changed or skipped_at is not None
+            for changed, skipped_at in zip(self.changed, self._skipped_at)
+        )
+
+    def on_leave(self, original_node: cst.CSTNode) -> None:
+        for index, skipped_at in enumerate(self._skipped_at):
+            if skipped_at is original_node:
+                self._skipped_at[index] = None
+        for index in self._active(original_node):
+            try:
+                result = self.transformers[index].on_leave(original_node, original_node)
+            except Exception:
+                self.changed[index] = True
+                continue
+            if result is not original_node:
+                self.changed[index] = True
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        for index in self._active(node):
+            try:
+                self.transformers[index].on_visit_attribute(node, attribute)
+            except Exception:
+                self.changed[index] = True
+
+    def on_leave_attribute(self, original_node: cst.CSTNode, attribute: str) -> None:
+        for index in self._active(original_node):
+            try:
+                self.transformers[index].on_leave_attribute(original_node, attribute)
+            except Exception:
+                self.changed[index] = True
+
+
+def can_fuse(pipeline: LibcstTransformerPipeline) -> bool:
+    """
+    Whether the pipeline only changes the tree from the visitor hooks of a single transformer
+
+    Such pipelines can be checked for changes in a traversal shared with others.
+    """
+    if inspect.getattr_static(
+        type(pipeline), "apply_to_tree"
+    ) is not inspect.getattr_static(LibcstTransformerPipeline, "apply_to_tree"):
+        return False
+    match pipeline.transformers:
+        case [transformer]:
+            return transformer.only_visits()
+    return False
+
+
+def find_unchanged(
+    tree: cst.Module,
+    pipelines: Sequence[tuple[LibcstTransformerPipeline, FileContext]],
+) -> list[bool]:
+    """
+    Walk the tree once on behalf of several pipelines and find the ones that won't change it
+
+    The metadata of the tree is shared by all the pipelines, see `MetadataCache`. Each pipeline
+    records its changes in a copy of its `FileContext` so that nothing is
+    reported. A pipeline won't change the tree if its transformer neither
+    returned a different node nor reported any change, dependency or failure.
+    The pipelines must all be fusable, see `can_fuse`.
+
+    :return: Whether each pipeline leaves the tree unchanged, in the same order as `pipelines`
+    """
+    wrapper = metadata_cache.wrapper(tree)
+    scratch_contexts = [
+        dataclasses.replace(
+            file_context,
+            dependencies=set(),
+            codemod_changes=[],
+            results=[],
+            failures=[],
+        )
+        for _, file_context in pipelines
+    ]
+    transformers = []
+    for (pipeline, file_context), scratch_context in zip(pipelines, scratch_contexts):
+        (transformer_class,) = pipeline.transformers
+        transformer = transformer_class(
+            CodemodContext(wrapper=wrapper),
+            file_context.findings,
+            scratch_context,
+            _transformer=True,
+        )
+        transformer.prune_by_results = pipeline.prune_by_results
+        transformers.append(transformer)
+
+    visitor = FusedVisitor(transformers)
+    with ExitStack() as stack:
+        for transformer in transformers:
+            stack.enter_context(transformer.resolve(wrapper))
+        wrapper.module.visit(visitor)
+
+    return [
+        not changed
+        and not scratch_context.codemod_changes
+        and not scratch_context.dependencies
+        and not scratch_context.failures
+        for changed, scratch_context in zip(visitor.changed, scratch_contexts)
+    ]
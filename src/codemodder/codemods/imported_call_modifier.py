@@ -7,7 +7,7 @@ from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
 from libcst.metadata import PositionProvider
 
 from codemodder.change import Change
-from codemodder.codemods.base_visitor import UtilsMixin
+from codemodder.codemods.base_visitor import DeferredImportsCommand, UtilsMixin
 from codemodder.codemods.utils_mixin import NameResolutionMixin
 from codemodder.file_context import FileContext
 from codemodder.result import Result
@@ -18,7 +18,7 @@ FunctionMatchType = TypeVar("FunctionMatchType", bound=Union[Mapping, Set])
 
 class ImportedCallModifier(
     Generic[FunctionMatchType],
-    VisitorBasedCodemodCommand,
+    DeferredImportsCommand,
     NameResolutionMixin,
     UtilsMixin,
     metaclass=abc.ABCMeta,
@@ -1,18 +1,30 @@
+import inspect
 from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator, Sequence
 
 import libcst as cst
 from libcst import matchers
 from libcst._position import CodeRange
-from libcst.codemod import CodemodContext
+from libcst.codemod import Codemod, CodemodContext, ContextAwareTransformer
 from libcst.codemod.visitors import AddImportsVisitor, RemoveImportsVisitor
 
+from codemodder.cache import CacheEntry
 from codemodder.change import Change, ChangeSet
 from codemodder.codemods.base_transformer import BaseTransformerPipeline
-from codemodder.codemods.base_visitor import BaseTransformer
-from codemodder.codemods.utils import get_call_name
+from codemodder.codemods.base_visitor import (
+    DEFER_IMPORT_CHANGES,
+    BaseTransformer,
+    apply_import_changes,
+)
+from codemodder.codemods.metadata_cache import LazyMetadata, metadata_cache
+from codemodder.codemods.utils import KeepUnchangedNodes, get_call_name
 from codemodder.context import CodemodExecutionContext
 from codemodder.dependency import Dependency
-from codemodder.diff import create_diff_from_tree
+from codemodder.diff import create_diff, create_diff_from_edits
+from codemodder.edits import apply_edits, find_edits, split_lines
 from codemodder.file_context import FileContext
 from codemodder.logging import logger
 from codemodder.result import Result
@@ -28,7 +40,7 @@ def update_code(file_path, new_code):
         f.write(new_code)
 
 
-class LibcstResultTransformer(BaseTransformer):
+class LibcstResultTransformer(KeepUnchangedNodes, BaseTransformer):
     """
     Transformer class that performs libcst-based transformations on a given file
 
@@ -38,6 +50,8 @@ class LibcstResultTransformer(BaseTransformer):
     """
 
     change_description: str = ""
+    # Whether statements that don't overlap any result are skipped
+    prune_by_results: bool = False
 
     def __init__(
         self,
@@ -55,21 +69,102 @@ class LibcstResultTransformer(BaseTransformer):
             line_include=file_context.line_include,
             line_exclude=file_context.line_exclude,
         )
+        self.lines_changed_since = file_context.lines_changed_since
 
     @classmethod
     def transform(
-        cls, module: cst.Module, results: list[Result] | None, file_context: FileContext
+        cls,
+        module: cst.Module,
+        results: list[Result] | None,
+        file_context: FileContext,
+        prune_by_results: bool = False,
+        scratch: dict | None = None,
     ) -> cst.Module:
-        wrapper = cst.MetadataWrapper(module)
+        """
+        Transform the module
+
+        :param scratch: The scratch of the codemod context, shared with other transformers. If it defers import changes, the imports requested by the transformer are added to it rather than to the module, see `apply_import_changes`.
+        """
         codemod = cls(
-            CodemodContext(wrapper=wrapper),
+            CodemodContext(
+                wrapper=metadata_cache.wrapper(module),
+                scratch={} if scratch is None else scratch,
+            ),
             results,
             file_context,
             _transformer=True,
         )
+        codemod.prune_by_results = prune_by_results
 
         return codemod.transform_module(module)
 
+    @classmethod
+    def only_visits(cls) -> bool:
+        """
+        Whether the transformer only changes the tree from its visitor hooks
+
+        Such transformers don't create other visitors that rely on their
+        metadata so it is computed lazily. They can also share a traversal of
+        the tree with other transformers, see `find_unchanged`.
+        """
+        return not any(
+            _overrides(cls, name, base)
+            for name, base in (
+                ("transform", LibcstResultTransformer),
+                ("transform_module", LibcstResultTransformer),
+                ("transform_module_impl", ContextAwareTransformer),
+                ("should_allow_multiple_passes", Codemod),
+            )
+        )
+
+    @contextmanager
+    def resolve(self, wrapper: cst.MetadataWrapper) -> Iterator[None]:
+        dependencies = self.get_inherited_dependencies()
+        # Visitors created by a transformer expect its metadata to be computed
+        # already, see `ContextAwareVisitor`
+        self.metadata = (
+            LazyMetadata(wrapper, dependencies)
+            if self.only_visits()
+            else wrapper.resolve_many(dependencies)
+        )
+        try:
+            yield
+        finally:
+            self.metadata = {}
+
+    @contextmanager
+    def _handle_metadata_reference(self, module: cst.Module) -> Iterator[cst.Module]:
+        # Share the metadata of the tree with other transformers and codemods
+        # rather than computing it again, see `MetadataCache`
+        wrapper = metadata_cache.wrapper(module)
+        old_wrapper = self.context.wrapper
+        with self.resolve(wrapper):
+            self.context = replace(self.context, wrapper=wrapper)
+            try:
+                yield wrapper.module
+            finally:
+                self.context = replace(self.context, wrapper=old_wrapper)
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Matcher decorators keep track of every visited node so the parent
+        # class is always called, even for statements that are pruned
+        visit_children = super().on_visit(node)
+        if (
+            self.prune_by_results
+            and self.results is not None
+            and isinstance(node, (cst.SimpleStatementLine, cst.BaseCompoundStatement))
+        ):
+            return visit_children and self._overlaps_results(node)
+        return visit_children
+
+    def _overlaps_results(self, node: cst.BaseStatement) -> bool:
+        pos = self.node_position(node)
+        start_line = pos.start.line
+        # The position of functions and classes doesn't include their decorators
+        if isinstance(node, (cst.FunctionDef, cst.ClassDef)) and node.decorators:
+            start_line = self.node_position(node.decorators[0]).start.line
+        return self.result_index.overlaps_lines(start_line, pos.end.line)
+
     def _new_or_updated_node(self, original_node, updated_node):
         if self.node_is_selected(original_node):
             if (attr := getattr(self, "on_result_found", None)) is not None:
@@ -241,9 +336,23 @@ class LibcstTransformerPipeline(BaseTransformerPipeline):
     Transformer pipeline class that applies one or more `LibcstResultTransformer` to a given file
 
     This pipeline expects that all transformers accept a libcst `Module` as input and return a libcst `Module` as output.
+
+    When `prune_by_results` is set, transformers that are given results skip
+    the statements that don't overlap any result instead of visiting the whole
+    module. This should only be set for transformers that don't rely on
+    visiting other statements than the ones their results point at.
     """
 
     transformers: list[type[LibcstResultTransformer]]
+    prune_by_results: bool
+
+    def __init__(
+        self,
+        *transformers: type[LibcstResultTransformer],
+        prune_by_results: bool = False,
+    ):
+        super().__init__(*transformers)
+        self.prune_by_results = prune_by_results
 
     def apply(
         self,
@@ -255,36 +364,231 @@ class LibcstTransformerPipeline(BaseTransformerPipeline):
 
         try:
             with file_context.timer.measure("parse"):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    source_tree = cst.parse_module(f.read())
+                source = read_file(file_path)
         except Exception:
             file_context.add_failure(file_path)
-            logger.exception("error parsing file %s", file_path)
+            logger.exception("error reading file %s", file_path)
             return None
 
+        cache_key, entry = get_cached_result(context, file_context, source)
+        if entry is not None:
+            change_set, code = entry.change_set, entry.code
+        else:
+            try:
+                with file_context.timer.measure("parse"):
+                    source_tree = cst.parse_module(source)
+            except Exception:
+                file_context.add_failure(file_path)
+                logger.exception("error parsing file %s", file_path)
+                return None
+
+            change_set, code = self.apply_to_tree(
+                context, file_context, source_tree, results, source
+            )
+            cache_result(context, file_context, cache_key, change_set, code)
+
+        if change_set and code is not None and not context.dry_run:
+            with file_context.timer.measure("write"):
+                update_code(file_context.file_path, code)
+
+        return change_set
+
+    def apply_to_tree(
+        self,
+        context: CodemodExecutionContext,
+        file_context: FileContext,
+        source_tree: cst.Module,
+        results: list[Result] | None,
+        source: str | None = None,
+    ) -> tuple[ChangeSet | None, str | None]:
+        """
+        Apply the pipeline to an already parsed tree without writing the file
+
+        The new code is spliced from the source and the code of the statements that changed, see `find_edits`, and the diff only compares the lines around them.
+
+        :param source: The code the tree was parsed from, generated from the tree if not given
+        :return: The `ChangeSet` and the new code, or `None` for both if no changes were applied
+        """
         tree = source_tree
+        # The imports requested by all the transformers are changed in one pass
+        scratch: dict = {DEFER_IMPORT_CHANGES: True}
         with file_context.timer.measure("transform"):
-            for transformer in self.transformers:
-                tree = transformer.transform(tree, results, file_context)
+            for index, transformer in enumerate(self.transformers):
+                new_tree = transformer.transform(
+                    tree, results, file_context, self.prune_by_results, scratch
+                )
+                # The next transformer can reuse the metadata of an unchanged tree
+                if index == len(self.transformers) - 1 or not new_tree.deep_equals(
+                    tree
+                ):
+                    tree = new_tree
+            tree = apply_import_changes(CodemodContext(scratch=scratch), tree)
 
         if not file_context.codemod_changes:
-            return None
-
-        diff = create_diff_from_tree(source_tree, tree)
+            return None, None
+
+        source_lines = split_lines(source_tree.code if source is None else source)
+        if (edits := find_edits(source_lines, source_tree, tree)) is not None:
+            new_lines = apply_edits(source_lines, edits)
+            diff = create_diff_from_edits(source_lines, new_lines, edits)
+        else:
+            new_lines = split_lines(tree.code)
+            diff = create_diff(source_lines, new_lines)
         if not diff:
-            return None
+            return None, None
 
         change_set = ChangeSet(
             str(file_context.file_path.relative_to(context.directory)),
             diff,
             changes=file_context.codemod_changes,
         )
+        return change_set, "".join(new_lines)
 
-        if not context.dry_run:
-            with file_context.timer.measure("write"):
-                update_code(file_context.file_path, tree.code)
 
-        return change_set
+def read_file(file_path: Path) -> str:
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def get_cached_result(
+    context: CodemodExecutionContext, file_context: FileContext, source: str
+) -> tuple[str | None, CacheEntry | None]:
+    """
+    Look up the result of applying a codemod to the given source in the result cache
+
+    Any dependencies recorded with a cached result are added to the `file_context`.
+
+    :return: The cache key (`None` if the cache is not used) and the cached entry, if any
+    """
+    if context.cache is None:
+        return None, None
+    if (cache_key := context.cache.key(file_context, source)) is None:
+        return None, None
+
+    entry = context.cache.get(cache_key)
+    file_context.cache_hit = entry is not None
+    if entry is not None:
+        file_context.dependencies.update(entry.dependencies)
+    return cache_key, entry
+
+
+def cache_result(
+    context: CodemodExecutionContext,
+    file_context: FileContext,
+    cache_key: str | None,
+    change_set: ChangeSet | None,
+    code: str | None,
+):
+    if context.cache is None or cache_key is None:
+        return
+    context.cache.put(
+        cache_key, CacheEntry(change_set, code, set(file_context.dependencies))
+    )
+
+
+def apply_codemods_to_file(
+    context: CodemodExecutionContext,
+    file_path: Path,
+    pipelines: Sequence[tuple["LibcstTransformerPipeline", FileContext]],
+) -> list[FileContext]:
+    """
+    Parse a file once and pass the tree through each of the given pipelines in order
+
+    Each pipeline has its own `FileContext` and the diff of each `ChangeSet` is relative to the output of the pipelines that ran before it, just as if the codemods were applied one at a time. The file is written at most once.
+
+    Pipelines that only change the tree from visitor hooks are first checked together in a single traversal of the tree, see `find_unchanged`. Only the ones that may change the file are then applied one at a time.
+
+    :param context: The codemod execution context
+    :param file_path: The file to transform
+    :param pipelines: The pipeline of each codemod together with the codemod's `FileContext` for this file
+    :return: The `FileContext` of each pipeline, in the same order as `pipelines`
+    """
+    file_contexts = [file_context for _, file_context in pipelines]
+    if not file_contexts:
+        return []
+
+    try:
+        with file_contexts[0].timer.measure("parse"):
+            code = read_file(file_path)
+    except Exception:
+        for file_context in file_contexts:
+            file_context.add_failure(file_path)
+        logger.exception("error reading file %s", file_path)
+        return file_contexts
+
+    # Avoid a circular import
+    from codemodder.codemods.fused_visitor import can_fuse, find_unchanged
+
+    fusable = [can_fuse(pipeline) for pipeline, _ in pipelines]
+    # The pipelines that have been checked for changes to the current code in
+    # a shared traversal, and the ones that were found to change nothing
+    probed: set[int] = set()
+    unchanged: set[int] = set()
+
+    # The tree is only parsed once a codemod actually needs it
+    tree = None
+    changed = False
+    for index, (pipeline, file_context) in enumerate(pipelines):
+        cache_key, entry = get_cached_result(context, file_context, code)
+        if entry is not None:
+            change_set, new_code = entry.change_set, entry.code
+        else:
+            if tree is None:
+                try:
+                    with file_context.timer.measure("parse"):
+                        tree = cst.parse_module(code)
+                except Exception:
+                    for remaining_context in file_contexts[index:]:
+                        remaining_context.add_failure(file_path)
+                    logger.exception("error parsing file %s", file_path)
+                    break
+
+            if fusable[index] and index not in probed:
+                group = [
+                    later
+                    for later in range(index, len(pipelines))
+                    if fusable[later] and later not in probed
+                ]
+                # A single pipeline is cheaper to apply than to check
+                if len(group) > 1:
+                    probed.update(group)
+                    with file_context.timer.measure("transform"):
+                        found = find_unchanged(tree, [pipelines[i] for i in group])
+                    unchanged.update(i for i, ok in zip(group, found) if ok)
+
+            if index in unchanged:
+                change_set, new_code = None, None
+            else:
+                change_set, new_code = pipeline.apply_to_tree(
+                    context, file_context, tree, file_context.findings, code
+                )
+            cache_result(context, file_context, cache_key, change_set, new_code)
+
+        if not change_set or new_code is None:
+            continue
+
+        file_context.add_result(change_set)
+        # In a dry run nothing is written so each codemod sees the original
+        # file, unless the changes must apply in sequence
+        if context.sequential_changes:
+            code = new_code
+            changed = True
+            # Following codemods parse the new code so that they see exactly
+            # the tree the parser produces rather than any synthesized nodes
+            tree = None
+            # Checks made against the previous code no longer hold
+            probed.clear()
+            unchanged.clear()
+
+    if changed and not context.dry_run:
+        with file_contexts[-1].timer.measure("write"):
+            update_code(file_path, code)
+
+    return file_contexts
+
+
+def _overrides(cls: type, name: str, base: type) -> bool:
+    return inspect.getattr_static(cls, name) is not inspect.getattr_static(base, name)
 
 
 def _match_with_existing_arg(arg, args_info):
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Collection, Generic, Iterator, Mapping, TypeVar
+
+import libcst as cst
+from libcst.metadata.base_provider import ProviderT
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class IdentityCache(Generic[K, V]):
+    """
+    Values computed for the most recently used objects, keyed by object identity
+
+    Each thread has its own cache since a file is always transformed by a
+    single thread.
+    """
+
+    max_size: int
+
+    def __init__(self, factory: Callable[[K], V], max_size: int = 4):
+        self.factory = factory
+        self.max_size = max_size
+        self._local = threading.local()
+
+    @property
+    def _entries(self) -> OrderedDict[int, tuple[K, V]]:
+        if (entries := getattr(self._local, "entries", None)) is None:
+            entries = self._local.entries = OrderedDict()
+        return entries
+
+    def get(self, key: K) -> V:
+        """
+        Return the value for the object, computing it if needed
+        """
+        entries = self._entries
+        # The object is kept in the entry so that its id can't be reused
+        if (entry := entries.get(id(key))) is not None and entry[0] is key:
+            entries.move_to_end(id(key))
+            return entry[1]
+
+        value = self.factory(key)
+        entries[id(key)] = (key, value)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
+class MetadataCache(IdentityCache[cst.Module, cst.MetadataWrapper]):
+    """
+    Metadata wrappers of the most recently transformed trees, keyed by tree identity
+
+    Transformers and codemods given the same tree object share its wrapper so
+    that each metadata provider is computed at most once per tree. A
+    transformer that changes the tree returns a new tree, which gets a new
+    wrapper.
+    """
+
+    def __init__(self, max_size: int = 4):
+        super().__init__(cst.MetadataWrapper, max_size)
+
+    def wrapper(self, module: cst.Module) -> cst.MetadataWrapper:
+        """
+        Return the metadata wrapper of the module, creating it if needed
+        """
+        return self.get(module)
+
+
+metadata_cache = MetadataCache()
+
+
+class LazyMetadata(Mapping[ProviderT, Mapping[cst.CSTNode, object]]):
+    """
+    The metadata of a wrapper, computed for each provider the first time it is looked up
+    """
+
+    def __init__(self, wrapper: cst.MetadataWrapper, providers: Collection[ProviderT]):
+        self.wrapper = wrapper
+        self.providers = providers
+
+    def __getitem__(self, provider: ProviderT) -> Mapping[cst.CSTNode, object]:
+        if provider not in self.providers:
+            raise KeyError(provider)
+        # The wrapper keeps the metadata of each provider once computed
+        return self.wrapper.resolve(provider)
+
+    def __iter__(self) -> Iterator[ProviderT]:
+        return iter(self.providers)
+
+    def __len__(self) -> int:
+        return len(self.providers)
@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import tempfile
@@ -35,6 +36,9 @@ class SemgrepRuleDetector(BaseDetector):
     def __init__(self, rule: str):
         self.rule = rule
 
+    def rules_hash(self) -> str:
+        return hashlib.sha256(self.rule.encode()).hexdigest()
+
     def get_yaml_files(self, codemod_id: str) -> list[Path]:
         return _create_temp_yaml_file(self.rule, codemod_id)
 
@@ -44,6 +48,9 @@ class SemgrepRuleDetector(BaseDetector):
         context: CodemodExecutionContext,
         files_to_analyze: list[Path],
     ) -> ResultSet:
+        if context.semgrep_prefilter_results is not None:
+            # Semgrep has already been run once with the rules of every codemod
+            return context.semgrep_prefilter_results
+
         yaml_files = self.get_yaml_files(codemod_id)
-        with context.timer.measure("semgrep"):
-            return semgrep_run(context, yaml_files, files_to_analyze)
+        return semgrep_run(context, yaml_files, files_to_analyze)
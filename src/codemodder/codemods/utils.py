@@ -79,6 +79,52 @@ class Prepend(SequenceExtension):
     pass
 
 
+_fields_by_node_type: dict[type[cst.CSTNode], tuple[str, ...]] = {}
+
+
+def _node_fields(cls: type[cst.CSTNode]) -> tuple[str, ...]:
+    if (names := _fields_by_node_type.get(cls)) is None:
+        names = _fields_by_node_type[cls] = tuple(cls.__dataclass_fields__)
+    return names
+
+
+def keep_unchanged(original_node: cst.CSTNode, updated_node: cst.CSTNode):
+    """
+    Return the original node if the updated node has the very same children, otherwise the updated node
+
+    libcst builds a new node for every node it visits even when none of its
+    children changed. Keeping the original nodes instead lets the unchanged
+    parts of a tree be recognized by identity, see `find_edits`.
+    """
+    if updated_node is original_node or type(updated_node) is not type(original_node):
+        return updated_node
+    for name in _node_fields(type(original_node)):
+        original_value = getattr(original_node, name)
+        updated_value = getattr(updated_node, name)
+        if original_value is updated_value:
+            continue
+        if not (
+            isinstance(original_value, (tuple, list))
+            and isinstance(updated_value, (tuple, list))
+            and len(original_value) == len(updated_value)
+            and all(a is b for a, b in zip(original_value, updated_value))
+        ):
+            return updated_node
+    return original_node
+
+
+class KeepUnchangedNodes(cst.CSTTransformer):
+    """
+    Transformer mixin that returns the original nodes whose children didn't change, see `keep_unchanged`
+    """
+
+    def on_leave(self, original_node, updated_node):
+        result = super().on_leave(original_node, updated_node)
+        if result is updated_node:
+            return keep_unchanged(original_node, updated_node)
+        return result
+
+
 class ReplaceNodes(cst.CSTTransformer):
     """
     Replace nodes with their corresponding values in a given dict. The replacements dictionary should either contain a mapping from a node to another node, RemovalSentinel, or FlattenSentinel to be replaced, or a dict mapping each attribute, by name, to a new value. Additionally if the attribute is a sequence, you may pass Append(l)/Prepend(l), where l is a list of nodes, to append or prepend, respectively.
@@ -115,7 +161,7 @@ class ReplaceNodes(cst.CSTTransformer):
                     return updated_node.with_changes(**changes_dict)
                 case cst.CSTNode() | cst.RemovalSentinel() | cst.FlattenSentinel():
                     return replacement
-        return updated_node
+        return keep_unchanged(original_node, updated_node)
 
 
 class MetadataPreservingTransformer(
@@ -1,5 +1,5 @@
 import itertools
-from typing import ClassVar, Collection, Optional, Union
+from typing import ClassVar, Collection, Mapping, Optional, Union
 
 import libcst as cst
 from libcst import MetadataDependent, matchers
@@ -17,12 +17,67 @@ from libcst.metadata import (
 )
 from libcst.metadata.scope_provider import GlobalScope
 
+from codemodder.codemods.metadata_cache import IdentityCache
 from codemodder.utils.utils import extract_targets_of_assignment
 
 
+class ScopeMemo:
+    """
+    Name resolution results for the scopes of a single tree
+
+    The memo is only valid for the scope metadata it was created with. It is
+    shared by everything resolving names in the same tree, while a changed
+    tree has new scope metadata and so gets a new memo.
+    """
+
+    scopes: Mapping[cst.CSTNode, Optional[Scope]]
+    used_names: dict[Scope, frozenset[str]]
+    base_names: dict[cst.CSTNode, Optional[str]]
+    single_assignments: dict[cst.CSTNode, Optional[BaseAssignment]]
+    # Def-use edges of the tree, followed transitively: the expression a name
+    # resolves to, and the assignment targets a name flows into
+    resolved_names: dict[cst.Name, Optional[cst.BaseExpression]]
+    name_targets: dict[
+        cst.Name,
+        tuple[tuple[cst.Name, ...], tuple[cst.BaseAssignTargetExpression, ...]],
+    ]
+
+    def __init__(self, scopes: Mapping[cst.CSTNode, Optional[Scope]]):
+        self.scopes = scopes
+        self._children: Optional[dict[Scope, list[Scope]]] = None
+        self.used_names = {}
+        self.base_names = {}
+        self.single_assignments = {}
+        self.resolved_names = {}
+        self.name_targets = {}
+
+    @property
+    def children(self) -> dict[Scope, list[Scope]]:
+        """
+        The child scopes of each scope of the tree
+        """
+        if self._children is None:
+            all_scopes = {scope for scope in self.scopes.values() if scope}
+            self._children = {scope: [] for scope in all_scopes}
+            for scope in all_scopes:
+                if not isinstance(scope, GlobalScope):
+                    self._children.get(scope.parent, []).append(scope)
+        return self._children
+
+
+# The memos of the most recently resolved trees, keyed by their scope metadata
+scope_memos: IdentityCache[Mapping, ScopeMemo] = IdentityCache(ScopeMemo)
+
+
 class NameResolutionMixin(MetadataDependent):
     METADATA_DEPENDENCIES: ClassVar[Collection[ProviderT]] = (ScopeProvider,)
 
+    def get_scope_memo(self) -> ScopeMemo:
+        """
+        Return the name resolution results memoized for the tree being visited
+        """
+        return scope_memos.get(self.metadata[ScopeProvider])
+
     def _find_imported_name(self, node: cst.Name) -> Optional[str]:
         match self.find_single_assignment(node):
             case ImportAssignment(
@@ -58,6 +113,12 @@ class NameResolutionMixin(MetadataDependent):
         exec.capitalize()
         ```
         """
+        base_names = self.get_scope_memo().base_names
+        if node not in base_names:
+            base_names[node] = self._find_base_name(node)
+        return base_names[node]
+
+    def _find_base_name(self, node) -> Optional[str]:
         match node:
             case cst.Name():
                 return self._find_imported_name(node)
@@ -207,6 +268,12 @@ class NameResolutionMixin(MetadataDependent):
         """
         Find all the names used within all the ancestor and descendent scopes for a given scope.
         """
+        used_names = self.get_scope_memo().used_names
+        if scope not in used_names:
+            used_names[scope] = frozenset(self._find_used_names_within_scope(scope))
+        return set(used_names[scope])
+
+    def _find_used_names_within_scope(self, scope: Scope) -> set[str]:
         related = itertools.chain(
             self._find_ancestor_scopes(scope), self._find_descendent_scopes(scope)
         )
@@ -224,16 +291,7 @@ class NameResolutionMixin(MetadataDependent):
         return ancestors
 
     def _build_scopes_child_tree(self) -> dict[Scope, list[Scope]]:
-        all_scopes = {
-            scope
-            for scope in self.context.wrapper.resolve(ScopeProvider).values()
-            if scope
-        }
-        tree: dict[Scope, list[Scope]] = {k: [] for k in all_scopes if k}
-        for s in all_scopes:
-            if not isinstance(s, GlobalScope):
-                tree.get(s.parent, []).append(s)
-        return tree
+        return self.get_scope_memo().children
 
     def _find_descendent_scopes(self, scope: Scope):
         tree = self._build_scopes_child_tree()
@@ -263,10 +321,13 @@ class NameResolutionMixin(MetadataDependent):
         """
         Given a MetadataWrapper and a CSTNode representing an access, find if there is a single assignment that it refers to.
         """
-        assignments = self.find_assignments(node)
-        if len(assignments) == 1:
-            return next(iter(assignments))
-        return None
+        single_assignments = self.get_scope_memo().single_assignments
+        if node not in single_assignments:
+            assignments = self.find_assignments(node)
+            single_assignments[node] = (
+                next(iter(assignments)) if len(assignments) == 1 else None
+            )
+        return single_assignments[node]
 
     def is_builtin_function(self, node: cst.Call):
         """
@@ -489,6 +550,12 @@ class NameAndAncestorResolutionMixin(NameResolutionMixin, AncestorPatternsMixin)
         return node
 
     def _resolve_name_transitive(self, node: cst.Name) -> Optional[cst.BaseExpression]:
+        resolved_names = self.get_scope_memo().resolved_names
+        if node not in resolved_names:
+            resolved_names[node] = self._resolve_name(node)
+        return resolved_names[node]
+
+    def _resolve_name(self, node: cst.Name) -> Optional[cst.BaseExpression]:
         maybe_assignment = self.find_single_assignment(node)
         if maybe_assignment and isinstance(maybe_assignment, Assignment):
             if maybe_target_assignment := self.is_target_of_assignment(
@@ -515,6 +582,16 @@ class NameAndAncestorResolutionMixin(NameResolutionMixin, AncestorPatternsMixin)
 
     def _find_name_assignment_targets(
         self, name: cst.Name
+    ) -> tuple[list[cst.Name], list[cst.BaseAssignTargetExpression]]:
+        name_targets = self.get_scope_memo().name_targets
+        if name not in name_targets:
+            found_named, found_other = self._find_name_targets(name)
+            name_targets[name] = (tuple(found_named), tuple(found_other))
+        named_targets, other_targets = name_targets[name]
+        return list(named_targets), list(other_targets)
+
+    def _find_name_targets(
+        self, name: cst.Name
     ) -> tuple[list[cst.Name], list[cst.BaseAssignTargetExpression]]:
         named_targets, other_targets = self._sieve_targets(
             self._find_direct_name_assignment_targets(name)
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import itertools
 import logging
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 from textwrap import indent
-from typing import TYPE_CHECKING, Iterator, List
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Sized
 
+from codemodder.cache import ResultCache
 from codemodder.change import ChangeSet
+from codemodder.code_directory import file_line_patterns
 from codemodder.dependency import (
     Dependency,
     build_dependency_notification,
@@ -17,10 +22,23 @@ from codemodder.logging import log_list, logger
 from codemodder.project_analysis.file_parsers.package_store import PackageStore
 from codemodder.project_analysis.python_repo_manager import PythonRepoManager
 from codemodder.registry import CodemodRegistry
+from codemodder.report.codetf_reporter import CodeTFStream
+from codemodder.report.diff_reporter import DiffStream
+from codemodder.result import ResultSet
+from codemodder.triggers import TriggerScanner
 from codemodder.utils.timer import Timer
 
 if TYPE_CHECKING:
     from codemodder.codemods.base_codemod import BaseCodemod
+    from codemodder.dependency_management import DependencyManager
+    from codemodder.sonar_results import SonarResultSet
+
+# Calls are sent to workers in chunks of at most this many items
+MAX_CHUNK_SIZE = 16
+
+
+def _map_chunk(fn: Callable[..., Any], chunk: list[tuple]) -> list:
+    return [fn(*args) for args in chunk]
 
 
 class CodemodExecutionContext:
@@ -28,6 +46,9 @@ class CodemodExecutionContext:
     _failures_by_codemod: dict[str, list[Path]] = {}
     _dependency_update_by_codemod: dict[str, PackageStore | None] = {}
     dependencies: dict[str, set[Dependency]] = {}
+    _dependency_managers: dict[Path, DependencyManager]
+    _dependency_changes: dict[Path, list[tuple[str, ChangeSet]]]
+    _dependencies_written: bool = False
     directory: Path
     dry_run: bool = False
     verbose: bool = False
@@ -37,7 +58,22 @@ class CodemodExecutionContext:
     path_include: list[str]
     path_exclude: list[str]
     max_workers: int = 1
+    executor_type: str = "thread"
     tool_result_files_map: dict[str, list[str]]
+    semgrep_prefilter_results: ResultSet | None = None
+    semgrep_run_count: int = 0
+    changed_lines: dict[Path, list[int]] | None = None
+    _line_filters: dict[Path, tuple[list[int], list[int]]]
+    cache: ResultCache | None = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    trigger_scanner: TriggerScanner
+    reporter: CodeTFStream | DiffStream | None = None
+    # Whether the changes of each codemod are made to the output of the ones
+    # before it, which a dry run only does when they are written as a patch
+    sequential_changes: bool = True
+    _reported_codemods: set[str]
+    _reported_changed_files: list[str]
 
     def __init__(
         self,
@@ -50,6 +86,8 @@ class CodemodExecutionContext:
         path_exclude: list[str],
         tool_result_files_map: dict[str, list[str]] | None = None,
         max_workers: int = 1,
+        executor_type: str = "thread",
+        cache: ResultCache | None = None,
     ):
         self.directory = directory
         self.dry_run = dry_run
@@ -57,17 +95,152 @@ class CodemodExecutionContext:
         self._results_by_codemod = {}
         self._failures_by_codemod = {}
         self.dependencies = {}
+        self._dependency_update_by_codemod = {}
+        self._dependency_managers = {}
+        self._dependency_changes = {}
+        self._dependencies_written = False
         self.registry = registry
         self.repo_manager = repo_manager
         self.timer = Timer()
         self.path_include = path_include
         self.path_exclude = path_exclude
         self.max_workers = max_workers
+        self.executor_type = executor_type
         self.tool_result_files_map = tool_result_files_map or {}
+        self.semgrep_prefilter_results = None
+        self.changed_lines = None
+        self._line_filters = {}
+        self.semgrep_run_count = 0
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.trigger_scanner = TriggerScanner()
+        self.reporter = None
+        self.sequential_changes = not dry_run
+        self._reported_codemods = set()
+        self._reported_changed_files = []
+
+    def __getstate__(self):
+        # Worker processes only need the settings of the run in order to
+        # process files. The state of the run stays in the main process.
+        state = self.__dict__.copy()
+        for name in (
+            "registry",
+            "repo_manager",
+            "executor",
+            "semgrep_prefilter_results",
+            "sonar_results",
+            "trigger_scanner",
+            "_results_by_codemod",
+            "_failures_by_codemod",
+            "dependencies",
+            "_dependency_update_by_codemod",
+            "_dependency_managers",
+            "_dependency_changes",
+            "reporter",
+            "_reported_codemods",
+            "_reported_changed_files",
+        ):
+            state.pop(name, None)
+        state["timer"] = Timer()
+        state["_line_filters"] = {}
+        return state
+
+    @cached_property
+    def sonar_results(self) -> SonarResultSet:
+        """
+        The results of all Sonar issues JSON files, loaded once and shared by all Sonar codemods
+        """
+        from codemodder.sonar_results import SonarResultSet
+
+        return SonarResultSet.from_json_files(
+            self.tool_result_files_map.get("sonar", [])
+        )
+
+    @cached_property
+    def executor(self) -> Executor:
+        """
+        The pool of workers shared by all codemods for processing files in parallel
+        """
+        logger.debug(
+            "using %s executor with %s workers", self.executor_type, self.max_workers
+        )
+        match self.executor_type:
+            case "process":
+                return ProcessPoolExecutor(max_workers=self.max_workers)
+            case "thread":
+                return ThreadPoolExecutor(max_workers=self.max_workers)
+        raise ValueError(f"Unknown executor type: {self.executor_type}")
+
+    def map(self, fn: Callable[..., Any], *iterables: Iterable) -> Iterator:
+        """
+        Map `fn` over `iterables` using the shared pool of workers
+
+        Like `Executor.map` the results are in the order of the items, but the
+        items are only taken from the iterables as workers become free rather
+        than all at once. Iterables can then be generators that build the
+        arguments of each call, and only those of the pending calls are kept
+        in memory.
+        """
+        size = len(iterables[0]) if iterables and isinstance(iterables[0], Sized) else 0
+        chunksize = min(max(1, size // (self.max_workers * 4)), MAX_CHUNK_SIZE)
+        items = zip(*iterables)
+        pending: deque[Future] = deque()
+        while chunk := list(itertools.islice(items, chunksize)):
+            pending.append(self.executor.submit(_map_chunk, fn, chunk))
+            if len(pending) > 2 * self.max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def shutdown(self):
+        """
+        Shut down the pool of workers, if any was started
+        """
+        if (executor := self.__dict__.pop("executor", None)) is not None:
+            executor.shutdown(wait=True)
+
+    @cached_property
+    def _line_patterns(self) -> tuple[list[str], list[str]]:
+        return (
+            [pattern for pattern in self.path_exclude if ":" in pattern],
+            [pattern for pattern in self.path_include if ":" in pattern],
+        )
+
+    def line_filters(self, filename: Path) -> tuple[list[int], list[int]]:
+        """
+        Return the lines excluded and included for the given file
+
+        These are computed once per file and shared by all codemods.
+        """
+        if (filters := self._line_filters.get(filename)) is None:
+            exclude_patterns, include_patterns = self._line_patterns
+            line_exclude = file_line_patterns(filename, exclude_patterns)
+            line_include = file_line_patterns(filename, include_patterns)
+            if not line_include and self.changed_lines is not None:
+                # Only lines changed since the `--since` ref are considered
+                line_include = self.changed_lines.get(filename, [])
+            filters = self._line_filters[filename] = (line_exclude, line_include)
+        return filters
+
+    def lines_changed_since(self, filename: Path) -> bool:
+        """
+        Whether the lines included for the given file are the lines changed since the `--since` ref, see `line_filters`
+        """
+        return self.changed_lines is not None and not file_line_patterns(
+            filename, self._line_patterns[1]
+        )
 
     def add_results(self, codemod_name: str, change_sets: List[ChangeSet]):
         self._results_by_codemod.setdefault(codemod_name, []).extend(change_sets)
 
+    def report_change_sets(self, change_sets: List[ChangeSet]):
+        """
+        Write change sets to the patch as soon as they are made, if the changes are written as a patch
+        """
+        if isinstance(self.reporter, DiffStream):
+            self.reporter.add_change_sets(change_sets)
+
     def add_failures(self, codemod_name: str, failed_files: List[Path]):
         self._failures_by_codemod.setdefault(codemod_name, []).extend(failed_files)
 
@@ -78,7 +251,7 @@ class CodemodExecutionContext:
         return self._results_by_codemod.get(codemod_name, [])
 
     def get_changed_files(self):
-        return [
+        return self._reported_changed_files + [
             change_set.path
             for changes in self._results_by_codemod.values()
             for change_set in changes
@@ -97,8 +270,10 @@ class CodemodExecutionContext:
     def process_dependencies(
         self, codemod_id: str
     ) -> dict[Dependency, PackageStore | None]:
-        """Write the dependencies a codemod added to the appropriate dependency
+        """Add the dependencies a codemod added to the appropriate dependency
         file in the project. Returns a dict listing the locations the dependencies were added.
+
+        Dependency files are only written by `write_dependencies` once all codemods have run.
         """
         dependencies = self.dependencies.get(codemod_id)
         if not dependencies:
@@ -121,9 +296,18 @@ class CodemodExecutionContext:
         from codemodder.dependency_management import DependencyManager
 
         for package_store in store_list:
-            dm = DependencyManager(package_store, self.directory)
-            if (changeset := dm.write(list(dependencies), self.dry_run)) is not None:
+            if (dm := self._dependency_managers.get(package_store.file)) is None:
+                dm = self._dependency_managers[package_store.file] = DependencyManager(
+                    package_store, self.directory
+                )
+            # Each codemod gets its own change set but the file is written later
+            if (changeset := dm.write(list(dependencies), dry_run=True)) is not None:
                 self.add_results(codemod_id, [changeset])
+                self._dependency_changes.setdefault(package_store.file, []).append(
+                    (codemod_id, changeset)
+                )
+                if self.dry_run:
+                    self.report_change_sets([changeset])
                 self._dependency_update_by_codemod[codemod_id] = package_store
                 for dep in dependencies:
                     record[dep] = package_store
@@ -131,6 +315,46 @@ class CodemodExecutionContext:
 
         return record
 
+    def write_dependencies(self):
+        """
+        Write each dependency file updated by `process_dependencies` once
+
+        Files changed by codemods since their dependencies were added get the
+        dependencies added again, replacing the change sets of the codemods
+        that added them. The changes to a file that can't be written are
+        removed from the results of the codemods that made them, and the file
+        is recorded as failed for them instead.
+        """
+        if self.dry_run:
+            return
+        with self.timer.measure("write"):
+            for file, dm in self._dependency_managers.items():
+                changes = self._dependency_changes.get(file, [])
+                if (changesets := dm.reapply()) is not None:
+                    for (codemod_id, changeset), new in zip(changes, changesets):
+                        results = self._results_by_codemod[codemod_id]
+                        if new is None:
+                            results.remove(changeset)
+                            self._dependency_failed(codemod_id, file)
+                        else:
+                            results[results.index(changeset)] = new
+                    changes = [
+                        (codemod_id, new)
+                        for (codemod_id, _), new in zip(changes, changesets)
+                        if new is not None
+                    ]
+                if dm.write_file():
+                    self.report_change_sets([changeset for _, changeset in changes])
+                    continue
+                for codemod_id, changeset in changes:
+                    self._results_by_codemod[codemod_id].remove(changeset)
+                    self._dependency_failed(codemod_id, file)
+        self._dependencies_written = True
+
+    def _dependency_failed(self, codemod_id: str, file: Path):
+        self.add_failures(codemod_id, [file])
+        self._dependency_update_by_codemod[codemod_id] = None
+
     def add_description(self, codemod: BaseCodemod):
         description = codemod.description
         if dependencies := list(self.dependencies.get(codemod.id, [])):
@@ -143,31 +367,67 @@ class CodemodExecutionContext:
 
         return description
 
-    def process_results(self, codemod_id: str, results: Iterator[FileContext]):
+    def process_results(
+        self,
+        codemod_id: str,
+        results: Iterable[FileContext],
+        reported: bool = False,
+    ):
+        """
+        Record the results of a codemod for each file
+
+        :param reported: Whether the change sets were already reported as they were made, see `report_change_sets`
+        """
         for file_context in results:
             self.add_results(codemod_id, file_context.results)
+            if not reported:
+                self.report_change_sets(file_context.results)
             self.add_failures(codemod_id, file_context.failures)
             self.add_dependencies(codemod_id, file_context.dependencies)
             self.timer.aggregate(file_context.timer)
+            if file_context.cache_hit is not None:
+                if file_context.cache_hit:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+
+    def compile_result(self, codemod: BaseCodemod):
+        return {
+            "codemod": codemod.id,
+            "summary": codemod.summary,
+            "description": self.add_description(codemod),
+            "references": [ref.to_json() for ref in codemod.references],
+            "properties": {},
+            "failedFiles": [str(file) for file in self.get_failures(codemod.id)],
+            "changeset": [change.to_json() for change in self.get_results(codemod.id)],
+        }
 
     def compile_results(self, codemods: list[BaseCodemod]):
-        results = []
-        for codemod in codemods:
-            data = {
-                "codemod": codemod.id,
-                "summary": codemod.summary,
-                "description": self.add_description(codemod),
-                "references": [ref.to_json() for ref in codemod.references],
-                "properties": {},
-                "failedFiles": [str(file) for file in self.get_failures(codemod.id)],
-                "changeset": [
-                    change.to_json() for change in self.get_results(codemod.id)
-                ],
-            }
-
-            results.append(data)
-
-        return results
+        return [self.compile_result(codemod) for codemod in codemods]
+
+    def report_results(self, codemod: BaseCodemod):
+        """
+        Write the results of a codemod that finished to the streaming report, if any, and release its change sets
+
+        The change sets of a reported codemod are no longer returned by `get_results`.
+        """
+        if self.reporter is None or codemod.id in self._reported_codemods:
+            return
+        if (
+            not self.dry_run
+            and not self._dependencies_written
+            and self._dependency_update_by_codemod.get(codemod.id)
+        ):
+            # Wait for the dependency file, since its changes are only
+            # reported if it can be written
+            return
+        if isinstance(self.reporter, CodeTFStream):
+            self.reporter.add_result(self.compile_result(codemod))
+        self._reported_codemods.add(codemod.id)
+        self._reported_changed_files.extend(
+            change_set.path
+            for change_set in self._results_by_codemod.pop(codemod.id, [])
+        )
 
     def log_changes(self, codemod_id: str):
         if failures := self.get_failures(codemod_id):
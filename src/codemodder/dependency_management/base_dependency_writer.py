@@ -6,28 +6,115 @@ from packaging.requirements import Requirement
 
 from codemodder.change import Action, Change, ChangeSet, PackageAction, Result
 from codemodder.dependency import Dependency
+from codemodder.logging import logger
 from codemodder.project_analysis.file_parsers.package_store import PackageStore
 
 
 class DependencyWriter(metaclass=ABCMeta):
+    """
+    Adds dependencies to a dependency file
+
+    The file is read once and updated in memory by each call to `add_to_file`,
+    so that the dependencies of several codemods can be written to it at once
+    with `write_file`. If the file is changed in the meantime, e.g. by another
+    codemod, the dependencies are added again to its new contents with
+    `reapply`.
+    """
+
     dependency_store: PackageStore
+    _pending_contents: Optional[str] = None
+    _original_contents: Optional[str] = None
 
     def __init__(self, dependency_store: PackageStore, parent_directory: Path):
         self.dependency_store = dependency_store
         self.path = Path(dependency_store.file)
         self.parent_directory = parent_directory
+        self._pending_dependencies: list[list[Dependency]] = []
 
     @abstractmethod
     def add_to_file(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
-        pass
+        """
+        Add `dependencies` to the contents of the file and write it unless `dry_run`
+        """
+
+    def update_contents(self, contents: str, dry_run: bool) -> bool:
+        """
+        Record the new contents of the file and write it unless `dry_run`
+
+        Returns whether the file was written successfully or is left to `write_file`.
+        """
+        self._pending_contents = contents
+        return dry_run or self.write_file()
+
+    def read_file(self) -> str:
+        """
+        Read the contents of the file, remembering the contents it had when first read
+        """
+        with open(self.path, encoding="utf-8") as f:
+            contents = f.read()
+        if self._original_contents is None:
+            self._original_contents = contents
+        return contents
+
+    def clear(self):
+        """
+        Forget the contents of the file read by `add_to_file`
+        """
+        self._original_contents = None
+        self._pending_contents = None
+
+    def reapply(self) -> Optional[list[Optional[ChangeSet]]]:
+        """
+        Add the dependencies added with `dry_run` again if the file changed since it was read
+
+        Returns the new change set of each call to `write` with `dry_run`, or
+        `None` for the calls whose dependencies can no longer be added, or
+        `None` if the file is unchanged.
+        """
+        if self._pending_contents is None:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                if f.read() == self._original_contents:
+                    return None
+        except OSError:
+            return None
+
+        self.clear()
+        pending, self._pending_dependencies = self._pending_dependencies, []
+        changesets = []
+        for dependencies in pending:
+            changesets.append(changeset := self.add_to_file(dependencies, True))
+            if changeset is not None:
+                self._pending_dependencies.append(dependencies)
+        return changesets
+
+    def write_file(self) -> bool:
+        """
+        Write any contents added to the file that haven't been written yet.
+        """
+        if self._pending_contents is None:
+            return True
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(self._pending_contents)
+        except Exception:
+            logger.exception("unable to write dependencies to %s", self.path)
+            return False
+        self._pending_contents = None
+        self._pending_dependencies = []
+        return True
 
     def write(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
         if new_dependencies := self.add(dependencies):
-            return self.add_to_file(new_dependencies, dry_run)
+            changeset = self.add_to_file(new_dependencies, dry_run)
+            if dry_run and changeset is not None:
+                self._pending_dependencies.append(new_dependencies)
+            return changeset
         return None
 
     def add(self, dependencies: list[Dependency]) -> list[Dependency]:
@@ -37,7 +124,7 @@ class DependencyWriter(metaclass=ABCMeta):
         for new_dep in dependencies:
             requirement: Requirement = new_dep.requirement
             if not self.dependency_store.has_requirement(requirement):
-                self.dependency_store.dependencies.add(requirement)
+                self.dependency_store.add_requirement(requirement)
                 new.append(new_dep)
         return new
 
@@ -1,8 +1,10 @@
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
 from codemodder.change import ChangeSet
 from codemodder.dependency import Dependency
+from codemodder.dependency_management.base_dependency_writer import DependencyWriter
 from codemodder.dependency_management.pyproject_writer import PyprojectWriter
 from codemodder.dependency_management.requirements_txt_writer import (
     RequirementsTxtWriter,
@@ -23,27 +25,48 @@ class DependencyManager:
         self.dependencies_store = dependencies_store
         self.parent_directory = parent_directory
 
-    def write(
-        self, dependencies: list[Dependency], dry_run: bool = False
-    ) -> Optional[ChangeSet]:
-        """
-        Write `dependencies` to the appropriate location in the project.
-        """
+    @cached_property
+    def writer(self) -> Optional[DependencyWriter]:
         match self.dependencies_store.type:
             case FileType.REQ_TXT:
                 return RequirementsTxtWriter(
                     self.dependencies_store, self.parent_directory
-                ).write(dependencies, dry_run)
+                )
             case FileType.TOML:
-                return PyprojectWriter(
-                    self.dependencies_store, self.parent_directory
-                ).write(dependencies, dry_run)
+                return PyprojectWriter(self.dependencies_store, self.parent_directory)
             case FileType.SETUP_PY:
-                return SetupPyWriter(
-                    self.dependencies_store, self.parent_directory
-                ).write(dependencies, dry_run)
+                return SetupPyWriter(self.dependencies_store, self.parent_directory)
             case FileType.SETUP_CFG:
-                return SetupCfgWriter(
-                    self.dependencies_store, self.parent_directory
-                ).write(dependencies, dry_run)
+                return SetupCfgWriter(self.dependencies_store, self.parent_directory)
         return None
+
+    def write(
+        self, dependencies: list[Dependency], dry_run: bool = False
+    ) -> Optional[ChangeSet]:
+        """
+        Write `dependencies` to the appropriate location in the project.
+
+        With `dry_run` the dependencies are only added in memory and can be
+        written later along with any others by `write_file`.
+        """
+        if self.writer is None:
+            return None
+        return self.writer.write(dependencies, dry_run)
+
+    def reapply(self) -> Optional[list[Optional[ChangeSet]]]:
+        """
+        Add the dependencies added with `dry_run` again if the dependency file changed since, see `DependencyWriter.reapply`.
+        """
+        if self.writer is None:
+            return None
+        return self.writer.reapply()
+
+    def write_file(self) -> bool:
+        """
+        Write all dependencies added with `dry_run` to the dependency file at once.
+
+        Returns whether the file was written successfully.
+        """
+        if self.writer is None:
+            return True
+        return self.writer.write_file()
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import Optional
 
 import tomlkit
@@ -15,11 +14,14 @@ def added_line_nums_strategy(lines, i):
 
 
 class PyprojectWriter(DependencyWriter):
+    _pyproject: Optional[tomlkit.TOMLDocument] = None
+    _contents: str = ""
+
     def add_to_file(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
         pyproject = self._parse_file()
-        original = deepcopy(pyproject)
+        original = self._contents
 
         try:
             pyproject["project"]["dependencies"].extend(
@@ -29,13 +31,13 @@ class PyprojectWriter(DependencyWriter):
             logger.debug("Unable to add dependencies to pyproject.toml file.")
             return None
 
+        self._contents = tomlkit.dumps(pyproject)
         diff, added_line_nums = create_diff_and_linenums(
-            tomlkit.dumps(original).split("\n"), tomlkit.dumps(pyproject).split("\n")
+            original.split("\n"), self._contents.split("\n")
         )
 
-        if not dry_run:
-            with open(self.path, "w", encoding="utf-8") as f:
-                tomlkit.dump(pyproject, f)
+        if not self.update_contents(self._contents, dry_run):
+            return None
 
         changes = self.build_changes(
             dependencies, added_line_nums_strategy, added_line_nums
@@ -46,6 +48,12 @@ class PyprojectWriter(DependencyWriter):
             changes=changes,
         )
 
+    def clear(self):
+        super().clear()
+        self._pyproject = None
+
     def _parse_file(self):
-        with open(self.path, encoding="utf-8") as f:
-            return tomlkit.load(f)
+        if self._pyproject is None:
+            self._pyproject = tomlkit.parse(self.read_file())
+            self._contents = tomlkit.dumps(self._pyproject)
+        return self._pyproject
@@ -11,6 +11,8 @@ def original_lines_strategy(original_lines, i):
 
 
 class RequirementsTxtWriter(DependencyWriter):
+    _lines: Optional[list[str]] = None
+
     def add_to_file(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
@@ -29,12 +31,10 @@ class RequirementsTxtWriter(DependencyWriter):
 
         diff = create_diff(original_lines, updated_lines)
 
-        if not dry_run:
-            try:
-                with open(self.path, "w", encoding="utf-8") as f:
-                    f.writelines(updated_lines)
-            except Exception:
-                return None
+        contents = "".join(updated_lines)
+        self._lines = contents.splitlines(keepends=True)
+        if not self.update_contents(contents, dry_run):
+            return None
 
         changes = self.build_changes(
             dependencies, original_lines_strategy, original_lines
@@ -45,9 +45,14 @@ class RequirementsTxtWriter(DependencyWriter):
             changes=changes,
         )
 
+    def clear(self):
+        super().clear()
+        self._lines = None
+
     def _parse_file(self) -> Optional[list[str]]:
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                return f.readlines()
-        except Exception:
-            return None
+        if self._lines is None:
+            try:
+                self._lines = self.read_file().splitlines(keepends=True)
+            except Exception:
+                return None
+        return self._lines.copy()
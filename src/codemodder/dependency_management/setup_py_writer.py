@@ -20,6 +20,8 @@ def fixed_line_number_strategy(line_num_changed, _):
 
 
 class SetupPyWriter(DependencyWriter):
+    _tree: Optional[cst.Module] = None
+
     def add_to_file(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
@@ -40,9 +42,9 @@ class SetupPyWriter(DependencyWriter):
 
         diff = create_diff_from_tree(input_tree, output_tree)
 
-        if not dry_run:
-            with open(self.path, "w", encoding="utf-8") as f:
-                f.write(output_tree.code)
+        self._tree = output_tree
+        if not self.update_contents(output_tree.code, dry_run):
+            return None
 
         changes = self.build_changes(
             dependencies, fixed_line_number_strategy, codemod.line_num_changed
@@ -53,9 +55,14 @@ class SetupPyWriter(DependencyWriter):
             changes=changes,
         )
 
-    def _parse_file(self):
-        with open(self.path, encoding="utf-8") as f:
-            return cst.parse_module(f.read())
+    def clear(self):
+        super().clear()
+        self._tree = None
+
+    def _parse_file(self) -> cst.Module:
+        if self._tree is None:
+            self._tree = cst.parse_module(self.read_file())
+        return self._tree
 
 
 class SetupPyAddDependencies(SimpleCodemod, NameResolutionMixin):
@@ -20,13 +20,18 @@ def added_line_nums_strategy(lines, i):
 
 
 class SetupCfgWriter(DependencyWriter):
+    _lines: Optional[list[str]] = None
+
     def add_to_file(
         self, dependencies: list[Dependency], dry_run: bool = False
     ) -> Optional[ChangeSet]:
         config = configparser.ConfigParser()
 
+        if (original_lines := self._parse_file()) is None:
+            return None
+
         try:
-            config.read(self.path)
+            config.read_string("".join(original_lines), source=str(self.path))
         except configparser.ParsingError:
             logger.debug("Unable to parse setup.cfg file.")
             return None
@@ -37,9 +42,6 @@ class SetupCfgWriter(DependencyWriter):
             logger.debug("Unable to add dependencies to setup.cfg file.")
             return None
 
-        with open(self.path, "r", encoding="utf-8") as f:
-            original_lines = f.readlines()
-
         new_lines = self.build_new_lines(
             original_lines, defined_dependencies, dependencies
         )
@@ -47,13 +49,10 @@ class SetupCfgWriter(DependencyWriter):
             logger.debug("Unable to add dependencies to setup.cfg file.")
             return None
 
-        if not dry_run:
-            try:
-                with open(self.path, "w", encoding="utf-8") as f:
-                    f.writelines(new_lines)
-            except Exception:
-                logger.debug("Unable to add dependencies to setup.cfg file.")
-                return None
+        contents = "".join(new_lines)
+        self._lines = contents.splitlines(keepends=True)
+        if not self.update_contents(contents, dry_run):
+            return None
 
         diff, added_line_nums = create_diff_and_linenums(original_lines, new_lines)
 
@@ -66,6 +65,19 @@ class SetupCfgWriter(DependencyWriter):
             changes=changes,
         )
 
+    def clear(self):
+        super().clear()
+        self._lines = None
+
+    def _parse_file(self) -> Optional[list[str]]:
+        if self._lines is None:
+            try:
+                self._lines = self.read_file().splitlines(keepends=True)
+            except OSError:
+                logger.debug("Unable to read setup.cfg file.")
+                return None
+        return self._lines.copy()
+
     def build_new_lines(
         self,
         original_lines: list[str],
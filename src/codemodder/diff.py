@@ -1,10 +1,16 @@
 import difflib
+from typing import Sequence
 
 import libcst as cst
 
+from codemodder.edits import Edit
+
+# The number of unchanged lines shown around each change
+CONTEXT_LINES = 3
+
 
 def create_diff(original_lines: list[str], new_lines: list[str]) -> str:
-    diff_lines = list(difflib.unified_diff(original_lines, new_lines))
+    diff_lines, _ = unified_diff(original_lines, new_lines)
     return difflines_to_str(diff_lines)
 
 
@@ -18,11 +24,104 @@ def create_diff_from_tree(original_tree: cst.Module, new_tree: cst.Module) -> st
     )
 
 
+def create_diff_from_edits(
+    original_lines: list[str], new_lines: list[str], edits: Sequence[Edit]
+) -> str:
+    """
+    Create a diff between the original lines and the new lines the edits produced
+    """
+    if not edits:
+        return ""
+    changed = (min(edit.start for edit in edits), max(edit.end for edit in edits))
+    diff_lines, _ = unified_diff(original_lines, new_lines, changed)
+    return difflines_to_str(diff_lines)
+
+
 def create_diff_and_linenums(
     original_lines: list[str], new_lines: list[str]
 ) -> tuple[str, list[int]]:
-    diff_lines = list(difflib.unified_diff(original_lines, new_lines))
-    return difflines_to_str(diff_lines), calc_new_line_nums(diff_lines)
+    diff_lines, added_line_nums = unified_diff(original_lines, new_lines)
+    return difflines_to_str(diff_lines), added_line_nums
+
+
+def unified_diff(
+    original_lines: list[str],
+    new_lines: list[str],
+    changed: tuple[int, int] | None = None,
+) -> tuple[list[str], list[int]]:
+    """
+    Diff the lines in the format of `difflib.unified_diff`, also returning the line numbers of the added lines
+
+    Only the changed region of the lines and the context around it are
+    compared, rather than all lines. `changed` is the range of the original
+    lines that the changes are within, if known. Otherwise it's found by
+    skipping the lines that the original and new lines start and end with.
+    """
+    if changed is None:
+        changed = _changed_region(original_lines, new_lines)
+        if changed is None:
+            return [], []
+    start = max(changed[0] - CONTEXT_LINES, 0)
+    end = min(changed[1] + CONTEXT_LINES, len(original_lines))
+    new_end = end + len(new_lines) - len(original_lines)
+    original_region = original_lines[start:end]
+    new_region = new_lines[start:new_end]
+    matcher = difflib.SequenceMatcher(None, original_region, new_region)
+
+    diff_lines: list[str] = []
+    added_line_nums: list[int] = []
+    for group in matcher.get_grouped_opcodes(CONTEXT_LINES):
+        if not diff_lines:
+            diff_lines += ["--- \n", "+++ \n"]
+        _, i1, _, j1, _ = group[0]
+        _, _, i2, _, j2 = group[-1]
+        diff_lines.append(
+            f"@@ -{_format_range(start + i1, start + i2)}"
+            f" +{_format_range(start + j1, start + j2)} @@\n"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                diff_lines.extend(" " + line for line in original_region[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                diff_lines.extend("-" + line for line in original_region[i1:i2])
+            if tag in ("replace", "insert"):
+                diff_lines.extend("+" + line for line in new_region[j1:j2])
+                added_line_nums.extend(range(start + j1 + 1, start + j2 + 1))
+    return diff_lines, added_line_nums
+
+
+def _changed_region(
+    original_lines: list[str], new_lines: list[str]
+) -> tuple[int, int] | None:
+    """
+    The range of the original lines between the lines that are the same at the start and at the end
+
+    :return: The range, or `None` if the lines are the same
+    """
+    size = min(len(original_lines), len(new_lines))
+    first = 0
+    while first < size and original_lines[first] == new_lines[first]:
+        first += 1
+    if first == len(original_lines) == len(new_lines):
+        return None
+    trailing = 0
+    while (
+        trailing < size - first
+        and original_lines[-1 - trailing] == new_lines[-1 - trailing]
+    ):
+        trailing += 1
+    return first, len(original_lines) - trailing
+
+
+def _format_range(start: int, stop: int) -> str:
+    # Same as the ranges of `difflib.unified_diff`
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
 
 
 def calc_new_line_nums(diff_lines: list[str]) -> list[int]:
@@ -0,0 +1,148 @@
+import io
+from dataclasses import dataclass
+from typing import Sequence
+
+import libcst as cst
+from libcst.metadata import PositionProvider
+
+from codemodder.codemods.metadata_cache import metadata_cache
+
+
+@dataclass
+class Edit:
+    """
+    Replacement of the lines of the original source from `start` up to `end`
+
+    Lines are indexed from 0 and `end` is excluded, so an edit with `start ==
+    end` inserts its lines before line `start`.
+    """
+
+    start: int
+    end: int
+    lines: list[str]
+
+
+def split_lines(code: str) -> list[str]:
+    """
+    Split code into lines, keeping line endings
+
+    Unlike `str.splitlines`, only the line endings that libcst counts lines by
+    are split on, so that the lines match the positions of the tree.
+    """
+    return io.StringIO(code, newline="").readlines()
+
+
+def apply_edits(source_lines: list[str], edits: Sequence[Edit]) -> list[str]:
+    """
+    Splice the edits into the lines of the original source
+
+    :raises ValueError: If edits overlap, which `find_edits` never returns
+    """
+    new_lines: list[str] = []
+    position = 0
+    for edit in sorted(edits, key=lambda edit: (edit.start, edit.end)):
+        if edit.start < position:
+            raise ValueError(
+                f"Edit of lines {edit.start}-{edit.end} overlaps a previous edit"
+            )
+        new_lines.extend(source_lines[position : edit.start])
+        new_lines.extend(edit.lines)
+        position = edit.end
+    new_lines.extend(source_lines[position:])
+    return new_lines
+
+
+def find_edits(
+    source_lines: list[str], source_tree: cst.Module, new_tree: cst.Module
+) -> list[Edit] | None:
+    """
+    Find the edits to the source that produce the code of the new tree
+
+    Transformers that keep the nodes they don't change (see `KeepUnchangedNodes`)
+    return the very same node for a statement they don't change, so the
+    top-level statements of the new tree that are also in the source tree keep
+    their lines of the source. Code is only generated for the other
+    statements, using the positions of the source tree to find the lines they
+    replace.
+
+    The new tree must be the result of transforming the tree of the metadata
+    wrapper of the source tree, see `MetadataCache`.
+
+    :return: The edits, or `None` if they can't be found and the code must be generated for the whole tree
+    """
+    wrapper = metadata_cache.wrapper(source_tree)
+    original = wrapper.module
+    if (
+        not original.body
+        or not new_tree.body
+        or not original.has_trailing_newline
+        or not new_tree.has_trailing_newline
+        or original.default_newline != new_tree.default_newline
+        or original.default_indent != new_tree.default_indent
+    ):
+        return None
+
+    positions = wrapper.resolve(PositionProvider)
+    starts = [_first_line(stmt, positions) for stmt in original.body]
+    footer_start = len(source_lines) - len(original.footer)
+    starts.append(footer_start)
+    # The statements are expected to cover the source between header and footer
+    if starts[0] != len(original.header) or any(
+        start >= end for start, end in zip(starts, starts[1:])
+    ):
+        return None
+
+    edits = []
+    if not _same_nodes(new_tree.header, original.header):
+        edits.append(
+            Edit(0, starts[0], _lines(new_tree, new_tree.header)),
+        )
+
+    index = {id(stmt): i for i, stmt in enumerate(original.body)}
+    # The next statement of the source and the code replacing the ones before it
+    next_index = 0
+    replacement: list[cst.CSTNode] = []
+    for stmt in new_tree.body:
+        if (i := index.get(id(stmt))) is None:
+            replacement.append(stmt)
+            continue
+        if i < next_index:
+            # Statements were reordered
+            return None
+        if replacement or i > next_index:
+            edits.append(
+                Edit(starts[next_index], starts[i], _lines(new_tree, replacement))
+            )
+            replacement = []
+        next_index = i + 1
+    if replacement or next_index < len(original.body):
+        edits.append(
+            Edit(starts[next_index], footer_start, _lines(new_tree, replacement))
+        )
+
+    if not _same_nodes(new_tree.footer, original.footer):
+        edits.append(
+            Edit(footer_start, len(source_lines), _lines(new_tree, new_tree.footer))
+        )
+    return edits
+
+
+def _first_line(stmt: cst.BaseStatement, positions) -> int:
+    """
+    The index of the first line of a top-level statement, including the empty lines and comments before it
+    """
+    start = stmt
+    leading = len(stmt.leading_lines)
+    if isinstance(stmt, (cst.FunctionDef, cst.ClassDef)) and stmt.decorators:
+        # The position of functions and classes doesn't include their decorators
+        start = stmt.decorators[0]
+        leading += len(start.leading_lines)
+    return positions[start].start.line - 1 - leading
+
+
+def _same_nodes(nodes: Sequence[cst.CSTNode], others: Sequence[cst.CSTNode]) -> bool:
+    return len(nodes) == len(others) and all(a is b for a, b in zip(nodes, others))
+
+
+def _lines(module: cst.Module, nodes: Sequence[cst.CSTNode]) -> list[str]:
+    return split_lines("".join(module.code_for_node(node) for node in nodes))
@@ -23,6 +23,10 @@ class FileContext:
     results: list[ChangeSet] = field(default_factory=list)
     failures: list[Path] = field(default_factory=list)
     timer: Timer = field(default_factory=Timer)
+    cache_key: str | None = None
+    cache_hit: bool | None = None
+    # Whether `line_include` holds the lines changed since the `--since` ref
+    lines_changed_since: bool = False
 
     def add_dependency(self, dependency: Dependency):
         self.dependencies.add(dependency)
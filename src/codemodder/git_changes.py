@@ -0,0 +1,74 @@
+import re
+from pathlib import Path
+
+import git
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def parse_changed_lines(diff: str) -> dict[str, list[int]]:
+    """
+    Find the lines added or modified in each file of a zero-context, prefix-less git diff
+    """
+    changed_lines: dict[str, list[int]] = {}
+    lines: list[int] | None = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            name = line[4:]
+            if name.startswith('"') and name.endswith('"'):
+                name = name[1:-1]
+            lines = None if name == "/dev/null" else changed_lines.setdefault(name, [])
+        elif lines is not None and (match := HUNK_HEADER.match(line)):
+            start, count = int(match[1]), int(match[2] or 1)
+            # A count of zero means that lines were only removed
+            lines.extend(range(start, start + count))
+    return {name: lines for name, lines in changed_lines.items() if lines}
+
+
+def changed_lines_since(directory: Path, ref: str) -> dict[Path, list[int]]:
+    """
+    Find the Python files under `directory` that have changed since the git `ref` along with their changed lines
+
+    Changes in the working tree are included, and all lines of untracked files
+    that aren't ignored are changed. Files that only had lines removed are not
+    returned. Returned paths are relative to `directory`.
+
+    :raises git.GitError: if `directory` is not in a git repository or `ref` can't be resolved
+    """
+    repo = git.Repo(directory, search_parent_directories=True)
+    root = Path(repo.working_tree_dir or directory).resolve()
+    directory = directory.resolve()
+    # Don't escape non-ASCII file names
+    repo_git = repo.git(c="core.quotepath=off")
+    diff = repo_git.diff(
+        ref,
+        "--unified=0",
+        "--no-prefix",
+        "--no-color",
+        "--no-ext-diff",
+        "--diff-filter=d",
+        "--",
+        str(directory),
+    )
+
+    changed_lines = parse_changed_lines(diff)
+    untracked: str = repo_git.ls_files(
+        "--others", "--exclude-standard", "-z", "--", str(directory)
+    )
+    for name in filter(None, untracked.split("\0")):
+        if name.endswith(".py") and (root / name).is_file():
+            changed_lines[name] = _all_lines(root / name)
+
+    return {
+        path.relative_to(directory): lines
+        for name, lines in changed_lines.items()
+        if (path := root / name).suffix == ".py"
+        and lines
+        and path.is_relative_to(directory)
+        and path.is_file()
+    }
+
+
+def _all_lines(path: Path) -> list[int]:
+    with open(path, "rb") as f:
+        return list(range(1, sum(1 for _ in f) + 1))
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
 
 from codemodder.logging import logger
 
@@ -25,12 +25,16 @@ class BaseParser(ABC):
     def find_file_locations(self) -> List[Path]:
         return list(Path(self.parent_directory).rglob(self.file_type.value))
 
-    def parse(self) -> list[PackageStore]:
+    def parse(self, file_locations: Sequence[Path] | None = None) -> list[PackageStore]:
         """
         Find 0 or more project config or dependency files within a project repo.
+
+        :param file_locations: the files to parse if already known, otherwise they are searched for
         """
         stores = []
-        req_files = self.find_file_locations()
+        req_files = (
+            self.find_file_locations() if file_locations is None else file_locations
+        )
         for file in req_files:
             try:
                 store = self._parse_file(file)
@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+from packaging.utils import canonicalize_name
+
 from codemodder.dependency import Requirement
 
 
@@ -33,6 +35,13 @@ class PackageStore:
             for dep in dependencies
         }
         self.py_versions = py_versions
+        self._requirement_names = {
+            canonicalize_name(dep.name) for dep in self.dependencies
+        }
 
     def has_requirement(self, requirement: Requirement) -> bool:
-        return requirement.name in {dep.name for dep in self.dependencies}
+        return canonicalize_name(requirement.name) in self._requirement_names
+
+    def add_requirement(self, requirement: Requirement):
+        self.dependencies.add(requirement)
+        self._requirement_names.add(canonicalize_name(requirement.name))
@@ -1,19 +1,38 @@
 from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
+from codemodder.code_directory import ProjectFiles, scan_project
 from codemodder.project_analysis.file_parsers import (
     PyprojectTomlParser,
     RequirementsTxtParser,
     SetupCfgParser,
     SetupPyParser,
 )
-from codemodder.project_analysis.file_parsers.package_store import PackageStore
+from codemodder.project_analysis.file_parsers.package_store import (
+    FileType,
+    PackageStore,
+)
+
+PACKAGE_FILE_NAMES = [file_type.value for file_type in FileType]
 
 
 class PythonRepoManager:
-    def __init__(self, parent_directory: Path):
+    def __init__(
+        self,
+        parent_directory: Path,
+        project_files: Optional[ProjectFiles] = None,
+        path_exclude: Optional[Sequence[str]] = None,
+    ):
+        """
+        Package stores are found and parsed the first time they are needed.
+
+        :param project_files: the result of a scan of the project for `PACKAGE_FILE_NAMES`, if already done
+        :param path_exclude: UNIX glob patterns of directories to skip when scanning the project
+        """
         self.parent_directory = parent_directory
+        self._project_files = project_files
+        self._path_exclude = path_exclude
         self._potential_stores = [
             PyprojectTomlParser,
             SetupPyParser,
@@ -38,10 +57,18 @@ class PythonRepoManager:
         """Wrapper around cached-property for clarity when calling it the first time."""
         return self.package_stores
 
+    @cached_property
+    def package_files(self) -> dict[str, list[Path]]:
+        """The candidate package store files in the project by file name."""
+        project_files = self._project_files or scan_project(
+            self.parent_directory, self._path_exclude, PACKAGE_FILE_NAMES
+        )
+        return project_files.named_files
+
     def _parse_all_stores(self) -> list[PackageStore]:
         discovered_pkg_stores: list[PackageStore] = []
         for store in self._potential_stores:
-            discovered_pkg_stores.extend(
-                store(self.parent_directory).parse()  # type: ignore
-            )
+            parser = store(self.parent_directory)  # type: ignore
+            if file_locations := self.package_files.get(parser.file_type.value):
+                discovered_pkg_stores.extend(parser.parse(file_locations))
         return discovered_pkg_stores
@@ -1,3 +1,5 @@
+import contextlib
+import gzip
 import json
 from os.path import abspath
 
@@ -24,6 +26,15 @@ def report_default(elapsed_ms, parsed_args, original_args, results_by_codemod):
     report.write_report(parsed_args.output)
 
 
+def open_report(outfile):
+    """
+    Open the report file for writing, compressed with gzip if its name ends with `.gz`
+    """
+    if str(outfile).endswith(".gz"):
+        return gzip.open(outfile, "wt", encoding="utf-8")
+    return open(outfile, "w", encoding="utf-8")
+
+
 class CodeTF:
     def __init__(self):
         self.report = base_report()
@@ -41,7 +52,7 @@ class CodeTF:
 
     def write_report(self, outfile):
         try:
-            with open(outfile, "w", encoding="utf-8") as f:
+            with open_report(outfile) as f:
                 json.dump(self.report, f)
         except Exception:
             logger.exception("failed to write report file.")
@@ -49,3 +60,73 @@ class CodeTF:
             return 2
         logger.debug("wrote report to %s", outfile)
         return 0
+
+
+class CodeTFStream(CodeTF):
+    """
+    Write the report incrementally, one codemod at a time
+
+    The results of each codemod are written as soon as they are added so that
+    they don't have to be kept until the end of the run. The run information
+    is written last because it includes the elapsed time. With `json_lines`
+    each codemod's results are written on a line of their own, followed by a
+    line with the run information, so that the report can be followed while
+    it's written.
+    """
+
+    def __init__(self, outfile, json_lines: bool = False):
+        super().__init__()
+        self.outfile = outfile
+        self.json_lines = json_lines
+        self.file = None
+        self.failed = False
+        self.result_count = 0
+
+    def open(self):
+        try:
+            self.file = open_report(self.outfile)
+            if not self.json_lines:
+                self.file.write('{"results": [')
+        except Exception:
+            self._fail()
+
+    def add_result(self, result: dict):
+        if self.file is None:
+            return
+        try:
+            if self.json_lines:
+                self.file.write(json.dumps(result) + "\n")
+            else:
+                separator = ", " if self.result_count else ""
+                self.file.write(separator + json.dumps(result))
+            # Let the result be seen while the rest of the run continues
+            self.file.flush()
+        except Exception:
+            self._fail()
+            return
+        self.result_count += 1
+
+    def finish(self, elapsed_ms, original_args, absolute_path):
+        self.generate(elapsed_ms, original_args, absolute_path, [])
+        if self.file is not None:
+            try:
+                if self.json_lines:
+                    self.file.write(json.dumps({"run": self.report["run"]}) + "\n")
+                else:
+                    self.file.write('], "run": ' + json.dumps(self.report["run"]) + "}")
+                self.file.close()
+            except Exception:
+                self._fail()
+        if self.failed:
+            # Any issues with writing the output file should exit status 2.
+            return 2
+        logger.debug("wrote report to %s", self.outfile)
+        return 0
+
+    def _fail(self):
+        logger.exception("failed to write report file.")
+        self.failed = True
+        if self.file is not None:
+            file, self.file = self.file, None
+            with contextlib.suppress(Exception):
+                file.close()
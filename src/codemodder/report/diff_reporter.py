@@ -0,0 +1,108 @@
+import contextlib
+import os
+from pathlib import Path
+
+from codemodder.change import ChangeSet
+from codemodder.logging import logger
+from codemodder.report.codetf_reporter import open_report
+
+NO_NEWLINE = "\\ No newline at end of file\n"
+
+
+class DiffStream:
+    """
+    Write the changes as a patch that `git apply` accepts, one change set at a time
+
+    Each change set is written as soon as it's added, with the paths of the
+    files relative to the project directory. Change sets of several codemods
+    for the same file are applied in the order they were made.
+    """
+
+    def __init__(self, outfile, directory: Path):
+        self.outfile = outfile
+        self.directory = directory
+        self.file = None
+        self.failed = False
+
+    def open(self):
+        try:
+            self.file = open_report(self.outfile)
+        except Exception:
+            self._fail()
+
+    def add_change_sets(self, change_sets: list[ChangeSet]):
+        if self.file is None:
+            return
+        try:
+            for change_set in change_sets:
+                self.file.write(
+                    format_patch(change_set, self._missing_newline(change_set))
+                )
+            # Let the changes be seen while the rest of the run continues
+            self.file.flush()
+        except Exception:
+            self._fail()
+
+    def finish(self, elapsed_ms, original_args, absolute_path):
+        del elapsed_ms, original_args, absolute_path
+        if self.file is not None:
+            try:
+                self.file.close()
+            except Exception:
+                self._fail()
+        if self.failed:
+            # Any issues with writing the output file should exit status 2.
+            return 2
+        logger.debug("wrote diff to %s", self.outfile)
+        return 0
+
+    def _missing_newline(self, change_set: ChangeSet) -> bool:
+        if change_set.diff.endswith("\n"):
+            return False
+        # libcst keeps whether a file ends with a newline, so the file on disk
+        # tells for both the original and the new code
+        try:
+            with open(self.directory / change_set.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False
+
+    def _fail(self):
+        logger.exception("failed to write diff file.")
+        self.failed = True
+        if self.file is not None:
+            file, self.file = self.file, None
+            with contextlib.suppress(Exception):
+                file.close()
+
+
+def format_patch(change_set: ChangeSet, missing_newline: bool = False) -> str:
+    """
+    Format the diff of a change set with the headers that `git apply` expects
+
+    The diffs of change sets don't mark the lines that aren't followed by a
+    newline at the end of the file, so `missing_newline` tells whether both
+    the original and the new file end without one. Otherwise only the last
+    line of the diff is marked if it has no newline.
+    """
+    path = change_set.path.replace("\\", "/")
+    header = f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"
+    # The diffs of change sets start with headers without file names
+    hunks = change_set.diff.split("\n", 2)[2]
+    if hunks.endswith("\n"):
+        return header + hunks
+
+    lines = hunks.split("\n")
+    marked = {len(lines) - 1}
+    if missing_newline:
+        # The last lines of the original and the new file are in the last hunk
+        marked = {
+            max(i for i, line in enumerate(lines) if line[:1] in sides)
+            for sides in (("-", " "), ("+", " "))
+            if any(line[:1] in sides for line in lines)
+        }
+    return header + "".join(
+        line + "\n" + (NO_NEWLINE if i in marked else "")
+        for i, line in enumerate(lines)
+    )
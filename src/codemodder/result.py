@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, fields
+from functools import cache, cached_property
+from itertools import accumulate
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
 
 import libcst as cst
 from libcst._position import CodeRange
@@ -13,21 +17,29 @@ if TYPE_CHECKING:
     from codemodder.context import CodemodExecutionContext
 
 
-@dataclass
+@dataclass(slots=True)
 class LineInfo:
     line: int
     column: int
     snippet: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Location(ABCDataclass):
     file: Path
     start: LineInfo
     end: LineInfo
 
+    def read_snippet(self, directory: Path) -> str:
+        """
+        Read the lines of source code spanned by this location from the file in `directory`
+        """
+        with open(directory / self.file, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines(keepends=True)
+        return "".join(lines[self.start.line - 1 : self.end.line])
 
-@dataclass
+
+@dataclass(slots=True)
 class Result(ABCDataclass):
     rule_id: str
     locations: list[Location]
@@ -47,6 +59,55 @@ class Result(ABCDataclass):
         )
 
 
+class ResultIndex:
+    """
+    Index of results by the lines spanned by their locations
+
+    Results only match nodes that start and end on the same lines as one of
+    their locations, so only the results indexed under the lines of a node
+    need to be matched against it.
+    """
+
+    def __init__(self, results: Iterable[Result]):
+        self._results_by_lines: dict[tuple[int, int], list[Result]] = {}
+        for result in results:
+            for lines in dict.fromkeys(
+                (location.start.line, location.end.line)
+                for location in result.locations
+            ):
+                self._results_by_lines.setdefault(lines, []).append(result)
+
+    @cached_property
+    def _line_ranges(self) -> tuple[list[int], list[int]]:
+        # The start lines of all locations in order, along with the furthest
+        # end line of the locations up to each of them
+        ranges = sorted(self._results_by_lines)
+        return [start for start, _ in ranges], list(
+            accumulate((end for _, end in ranges), max)
+        )
+
+    def overlaps_lines(self, start_line: int, end_line: int) -> bool:
+        """
+        Whether any result has a location that overlaps the lines from `start_line` to `end_line`
+        """
+        starts, max_ends = self._line_ranges
+        # Only locations that start before the end of the range can overlap it
+        count = bisect_right(starts, end_line)
+        return count > 0 and max_ends[count - 1] >= start_line
+
+    def results_for_position(self, pos: CodeRange) -> list[Result]:
+        """
+        Return the results with a location on the same lines as `pos`
+        """
+        return self._results_by_lines.get((pos.start.line, pos.end.line), [])
+
+    def match_location(self, pos: CodeRange, node: cst.CSTNode) -> bool:
+        return any(
+            result.match_location(pos, node)
+            for result in self.results_for_position(pos)
+        )
+
+
 def same_line(pos: CodeRange, location: Location) -> bool:
     return pos.start.line == location.start.line and pos.end.line == location.end.line
 
@@ -59,10 +120,114 @@ def fuzzy_column_match(pos: CodeRange, location: Location) -> bool:
     )
 
 
-class ResultSet(dict[str, dict[Path, list[Result]]]):
+class ResultSet(Mapping[str, Mapping[Path, list[Result]]]):
+    """
+    Results indexed by rule id and file
+
+    Results are stored in columns rather than as individual objects so that
+    very large numbers of results fit in memory: rule ids, file paths and
+    classes are interned and the positions of locations are kept in arrays.
+    `Result` objects are only created when they are looked up.
+    """
+
+    def __init__(self) -> None:
+        self._rules: list[str] = []
+        self._rule_ids: dict[str, int] = {}
+        self._files: list[Path] = []
+        self._file_ids: dict[Path, int] = {}
+        self._classes: list[type] = []
+        self._class_ids: dict[type, int] = {}
+        # One entry per result, the locations of result `i` are the locations
+        # from `_first_location[i]` up to `_first_location[i + 1]`
+        self._result_rules = array("I")
+        self._result_classes = array("H")
+        self._first_location = array("I", [0])
+        # One entry per location, with four positions per location
+        self._location_files = array("I")
+        self._location_classes = array("H")
+        self._positions = array("i")
+        self._snippets: dict[int, tuple[str | None, str | None]] = {}
+        # Results that can't be stored in columns, such as results with extra fields
+        self._objects: dict[int, Result] = {}
+        self._index: dict[str, dict[Path, array]] = {}
+
+    def _intern_rule(self, rule_id: str) -> int:
+        if (index := self._rule_ids.get(rule_id)) is None:
+            index = self._rule_ids[rule_id] = len(self._rules)
+            self._rules.append(rule_id)
+        return index
+
+    def _intern_file(self, file: Path) -> int:
+        if (index := self._file_ids.get(file)) is None:
+            index = self._file_ids[file] = len(self._files)
+            self._files.append(file)
+        return index
+
+    def _intern_class(self, cls: type) -> int:
+        if (index := self._class_ids.get(cls)) is None:
+            index = self._class_ids[cls] = len(self._classes)
+            self._classes.append(cls)
+        return index
+
     def add_result(self, result: Result):
-        for loc in result.locations:
-            self.setdefault(result.rule_id, {}).setdefault(loc.file, []).append(result)
+        result_id = len(self._result_rules)
+        self._result_rules.append(self._intern_rule(result.rule_id))
+        self._result_classes.append(self._intern_class(type(result)))
+        file_ids = [self._intern_file(location.file) for location in result.locations]
+        if _is_columnar(result):
+            for location, file_id in zip(result.locations, file_ids):
+                location_id = len(self._location_files)
+                self._location_files.append(file_id)
+                self._location_classes.append(self._intern_class(type(location)))
+                self._positions.extend(
+                    (
+                        location.start.line,
+                        location.start.column,
+                        location.end.line,
+                        location.end.column,
+                    )
+                )
+                if (
+                    location.start.snippet is not None
+                    or location.end.snippet is not None
+                ):
+                    self._snippets[location_id] = (
+                        location.start.snippet,
+                        location.end.snippet,
+                    )
+        else:
+            self._objects[result_id] = result
+        self._first_location.append(len(self._location_files))
+
+        # Results are listed once for each file they have locations in
+        results_by_file = self._index.setdefault(result.rule_id, {})
+        for file_id in dict.fromkeys(file_ids):
+            results_by_file.setdefault(self._files[file_id], array("I")).append(
+                result_id
+            )
+
+    def _result(self, result_id: int) -> Result:
+        if (result := self._objects.get(result_id)) is not None:
+            return result
+
+        locations = []
+        for location_id in range(
+            self._first_location[result_id], self._first_location[result_id + 1]
+        ):
+            start_line, start_column, end_line, end_column = self._positions[
+                4 * location_id : 4 * location_id + 4
+            ]
+            start_snippet, end_snippet = self._snippets.get(location_id, (None, None))
+            locations.append(
+                self._classes[self._location_classes[location_id]](
+                    file=self._files[self._location_files[location_id]],
+                    start=LineInfo(start_line, start_column, start_snippet),
+                    end=LineInfo(end_line, end_column, end_snippet),
+                )
+            )
+        return self._classes[self._result_classes[result_id]](
+            rule_id=self._rules[self._result_rules[result_id]], locations=locations
+        )
 
     def results_for_rule_and_file(
         self, context: CodemodExecutionContext, rule_id: str, file: Path
@@ -77,25 +242,122 @@ class ResultSet(dict[str, dict[Path, list[Result]]]):
         Some implementers may need to use the context to compute paths that are relative to the target directory.
         """
         del context
-        return self.get(rule_id, {}).get(file, [])
+        result_ids = self._index.get(rule_id, {}).get(file, ())
+        return [self._result(result_id) for result_id in result_ids]
 
     def files_for_rule(self, rule_id: str) -> list[Path]:
-        return list(self.get(rule_id, {}).keys())
+        return list(self._index.get(rule_id, {}))
 
     def all_rule_ids(self) -> list[str]:
-        return list(self.keys())
+        return list(self._index)
+
+    def __getitem__(self, rule_id: str) -> Mapping[Path, list[Result]]:
+        return _RuleResults(self, self._index[rule_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
 
-    def __or__(self, other):
-        result = ResultSet(super().__or__(other))
-        for k in self.keys() | other.keys():
-            result[k] = list_dict_or(self[k], other[k])
+    def __contains__(self, rule_id) -> bool:
+        return rule_id in self._index
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({ {rule_id: dict(results) for rule_id, results in self.items()} !r})"
+
+    def __ior__(self, other: ResultSet):
+        # Merge the columns of the other set in place, renumbering its interned values
+        result_offset = len(self._result_rules)
+        location_offset = len(self._location_files)
+        rules = [self._intern_rule(rule_id) for rule_id in other._rules]
+        files = [self._intern_file(file) for file in other._files]
+        classes = [self._intern_class(cls) for cls in other._classes]
+
+        self._result_rules.extend([rules[index] for index in other._result_rules])
+        self._result_classes.extend([classes[index] for index in other._result_classes])
+        self._first_location.extend(
+            [location_offset + index for index in other._first_location[1:]]
+        )
+        self._location_files.extend([files[index] for index in other._location_files])
+        self._location_classes.extend(
+            [classes[index] for index in other._location_classes]
+        )
+        self._positions.extend(other._positions[:])
+        self._snippets.update(
+            {
+                location_offset + location_id: snippets
+                for location_id, snippets in list(other._snippets.items())
+            }
+        )
+        self._objects.update(
+            {
+                result_offset + result_id: result
+                for result_id, result in list(other._objects.items())
+            }
+        )
+        for rule_id, results_by_file in list(other._index.items()):
+            own_results_by_file = self._index.setdefault(rule_id, {})
+            for file, result_ids in list(results_by_file.items()):
+                file = self._files[files[other._file_ids[file]]]
+                own_results_by_file.setdefault(file, array("I")).extend(
+                    [result_offset + result_id for result_id in result_ids]
+                )
+        return self
+
+    def __or__(self, other: ResultSet):
+        result = type(self)()
+        result |= self
+        result |= other
         return result
 
 
-def list_dict_or(
-    dictionary: dict[Any, list[Any]], other: dict[Any, list[Any]]
-) -> dict[Path, list[Any]]:
-    result_dict = other | dictionary
-    for k in other.keys() | dictionary.keys():
-        result_dict[k] = dictionary[k] + other[k]
-    return result_dict
+class _RuleResults(Mapping[Path, list[Result]]):
+    """
+    The results of a rule by file, which are created when they are looked up
+    """
+
+    def __init__(self, result_set: ResultSet, result_ids_by_file: dict[Path, array]):
+        self._result_set = result_set
+        self._result_ids_by_file = result_ids_by_file
+
+    def __getitem__(self, file: Path) -> list[Result]:
+        return [
+            self._result_set._result(result_id)
+            for result_id in self._result_ids_by_file[file]
+        ]
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self._result_ids_by_file)
+
+    def __len__(self) -> int:
+        return len(self._result_ids_by_file)
+
+    def __contains__(self, file) -> bool:
+        return file in self._result_ids_by_file
+
+
+@cache
+def _has_base_fields(cls: type, base: type) -> bool:
+    return [f.name for f in fields(cls)] == [f.name for f in fields(base)]
+
+
+def _is_columnar(result: Result) -> bool:
+    """
+    Whether a result can be stored in columns and recreated from them
+    """
+    return _has_base_fields(type(result), Result) and all(
+        _has_base_fields(type(location), Location)
+        and type(location.start) is LineInfo
+        and type(location.end) is LineInfo
+        and all(
+            isinstance(value, int) and not isinstance(value, bool)
+            for value in (
+                location.start.line,
+                location.start.column,
+                location.end.line,
+                location.end.column,
+            )
+        )
+        for location in result.locations
+    )
@@ -1,8 +1,9 @@
 import json
+import re
 from abc import ABCMeta, abstractmethod
 from importlib.metadata import entry_points
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, Optional, TextIO
 
 from typing_extensions import Self
 
@@ -15,7 +16,153 @@ class AbstractSarifToolDetector(metaclass=ABCMeta):
     @classmethod
     @abstractmethod
     def detect(cls, run_data: dict) -> bool:
-        pass
+        """
+        Whether a run of a SARIF file is from the tool
+
+        Only the `tool` entry of the run is given, the rest of the run isn't read.
+        """
+
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JsonStream:
+    """
+    Incrementally decode a JSON document from a file
+
+    The structure of the document is walked with `items` and `elements` and
+    only the values decoded with `value` are held in memory, so that large
+    documents can be processed one element at a time.
+    """
+
+    chunk_size = 1 << 20
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        # Values must fit in the buffer so it grows along with them
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Return the next character that isn't whitespace without consuming it
+        """
+        while True:
+            if match := WHITESPACE.match(self.buffer, self.pos):
+                self.pos = match.end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, chars: str) -> str:
+        if (char := self.peek()) not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Decode the next value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the file
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        """
+        Consume the next value without keeping it
+
+        Arrays are decoded one element at a time, so that only the largest
+        element is held in memory rather than the whole value.
+        """
+        match self.peek():
+            case "{":
+                for _ in self.items():
+                    self.skip()
+            case "[":
+                for _ in self.elements():
+                    self.value()
+            case _:
+                self.value()
+
+    def items(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the next object
+
+        The value of each key must be consumed before moving on to the next key.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if not isinstance(key := self.value(), str):
+                raise ValueError(f"Expected an object key but found {key!r}")
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[None]:
+        """
+        Iterate over the next array, or nothing if the next value is `null`
+
+        Each element must be consumed before moving on to the next element.
+        """
+        if self.peek() == "n":
+            self.value()
+            return
+        self._expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+
+def iter_sarif_tools(sarif_file: str | Path) -> Iterator[dict]:
+    """
+    Iterate over the `tool` entry of each run of a SARIF file
+
+    The rest of the file, such as the results, is skipped without being decoded.
+    """
+    with open(sarif_file, "r", encoding="utf-8") as f:
+        stream = JsonStream(f)
+        for key in stream.items():
+            if key != "runs":
+                stream.skip()
+                continue
+            for _ in stream.elements():
+                tool = None
+                for run_key in stream.items():
+                    if run_key == "tool":
+                        tool = stream.value()
+                    else:
+                        stream.skip()
+                if tool is not None:
+                    yield tool
 
 
 def detect_sarif_tools(filenames: list[Path]) -> dict[str, list[str]]:
@@ -26,12 +173,11 @@ def detect_sarif_tools(filenames: list[Path]) -> dict[str, list[str]]:
         ent.name: ent.load() for ent in entry_points().select(group="sarif_detectors")
     }
     for fname in filenames:
-        data = json.loads(fname.read_text())
-        for name, det in detectors.items():
-            # TODO: handle malformed sarif?
-            for run in data["runs"]:
+        # TODO: handle malformed sarif?
+        for tool in iter_sarif_tools(fname):
+            for name, det in detectors.items():
                 try:
-                    if det.detect(run):
+                    if det.detect({"tool": tool}):
                         logger.debug("detected %s sarif: %s", name, fname)
                         results.setdefault(name, []).append(str(fname))
                 except (KeyError, AttributeError, ValueError):
@@ -56,24 +202,30 @@ def extract_rule_id(result, sarif_run) -> Optional[str]:
 
 # NOTE: These Sarif classes are actually specific to Semgrep and should be moved elsewhere
 class SarifLocation(Location):
+    __slots__ = ()
+
     @classmethod
     def from_sarif(cls, sarif_location) -> Self:
         artifact_location = sarif_location["physicalLocation"]["artifactLocation"]
         file = Path(artifact_location["uri"])
+        # Snippets are not kept since they can take up a lot of memory in
+        # large SARIF files. They can be read with `read_snippet` when needed.
         start = LineInfo(
             line=sarif_location["physicalLocation"]["region"]["startLine"],
             column=sarif_location["physicalLocation"]["region"]["startColumn"],
-            snippet=sarif_location["physicalLocation"]["region"]["snippet"]["text"],
+            snippet=None,
         )
         end = LineInfo(
             line=sarif_location["physicalLocation"]["region"]["endLine"],
             column=sarif_location["physicalLocation"]["region"]["endColumn"],
-            snippet=sarif_location["physicalLocation"]["region"]["snippet"]["text"],
+            snippet=None,
         )
         return cls(file=file, start=start, end=end)
 
 
 class SarifResult(Result):
+    __slots__ = ()
+
     @classmethod
     def from_sarif(cls, sarif_result, sarif_run) -> Self:
         rule_id = extract_rule_id(sarif_result, sarif_run)
@@ -90,13 +242,39 @@ class SarifResult(Result):
 class SarifResultSet(ResultSet):
     @classmethod
     def from_sarif(cls, sarif_file: str | Path) -> Self:
-        with open(sarif_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        """
+        Index the results of a SARIF file by rule and file in a single pass
 
+        Results are decoded one at a time so the whole file is never held in memory.
+        """
         result_set = cls()
-        for sarif_run in data["runs"]:
-            for result in sarif_run["results"]:
-                sarif_result = SarifResult.from_sarif(result, sarif_run)
-                result_set.add_result(sarif_result)
+        with open(sarif_file, "r", encoding="utf-8") as f:
+            stream = JsonStream(f)
+            for key in stream.items():
+                if key == "runs":
+                    for _ in stream.elements():
+                        result_set._add_run(stream)
+                else:
+                    stream.skip()
 
         return result_set
+
+    def _add_run(self, stream: JsonStream):
+        sarif_run: dict = {}
+        # Rule ids may refer to the tool, which may come after the results
+        pending_results = []
+        for key in stream.items():
+            if key == "results":
+                for _ in stream.elements():
+                    result = stream.value()
+                    if "tool" in sarif_run:
+                        self.add_result(SarifResult.from_sarif(result, sarif_run))
+                    else:
+                        pending_results.append(result)
+            elif key == "tool":
+                sarif_run["tool"] = stream.value()
+            else:
+                stream.skip()
+
+        for result in pending_results:
+            self.add_result(SarifResult.from_sarif(result, sarif_run))
@@ -20,7 +20,11 @@ def run(
     if not yaml_files:
         raise ValueError("No Semgrep rules were provided")
 
-    with NamedTemporaryFile(prefix="semgrep", suffix=".sarif") as temp_sarif_file:
+    execution_context.semgrep_run_count += 1
+    with (
+        execution_context.timer.measure("semgrep"),
+        NamedTemporaryFile(prefix="semgrep", suffix=".sarif") as temp_sarif_file,
+    ):
         command = [
             "semgrep",
             "scan",
@@ -1,6 +1,7 @@
 import json
 from dataclasses import replace
 from pathlib import Path
+from typing import Sequence
 
 import libcst as cst
 from typing_extensions import Self, override
@@ -11,16 +12,19 @@ from codemodder.result import LineInfo, Location, Result, ResultSet
 
 
 class SonarLocation(Location):
+    __slots__ = ()
+
     @classmethod
     def from_issue(cls, issue) -> Self:
         location = issue.get("textRange")
-        start = LineInfo(location.get("startLine"), location.get("startOffset"), "")
-        end = LineInfo(location.get("endLine"), location.get("endOffset"), "")
+        start = LineInfo(location.get("startLine"), location.get("startOffset"), None)
+        end = LineInfo(location.get("endLine"), location.get("endOffset"), None)
         file = Path(issue.get("component").split(":")[-1])
         return cls(file=file, start=start, end=end)
 
 
 class SonarResult(Result):
+    __slots__ = ()
 
     @classmethod
     def from_issue(cls, issue) -> Self:
@@ -60,9 +64,24 @@ class SonarResultSet(ResultSet):
             logger.debug("Could not parse sonar json %s", json_file)
         return cls()
 
+    @classmethod
+    def from_json_files(cls, json_files: Sequence[str | Path]) -> Self:
+        """
+        Load and merge several Sonar issues JSON files, such as the pages of a paginated export
+
+        The results are merged in the order of the files. Files are loaded one
+        after another: nearly all the time goes to decoding the JSON and
+        building the results, which holds the GIL, rather than reading files.
+        """
+        result_set = cls()
+        for json_file in json_files:
+            result_set |= cls.from_json(json_file)
+        return result_set
+
     @override
     def results_for_rule_and_file(
         self, context: CodemodExecutionContext, rule_id: str, file: Path
     ) -> list[Result]:
-        paths_for_rule = self.get(rule_id, {})
-        return paths_for_rule.get(file.relative_to(context.directory), [])
+        return super().results_for_rule_and_file(
+            context, rule_id, file.relative_to(context.directory)
+        )
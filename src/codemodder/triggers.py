@@ -0,0 +1,84 @@
+import re
+from pathlib import Path
+from typing import Iterable
+
+from codemodder.logging import logger
+
+
+class TriggerScanner:
+    """
+    Finds the trigger names mentioned by each file so that codemods can skip the files they can't change
+
+    Each file is scanned once, as bytes and without parsing, for all the
+    trigger names known when it is first scanned. A name is found wherever it
+    appears as a whole word, including in comments and strings, so a file is
+    only skipped when it can't possibly match.
+    """
+
+    triggers: set[str]
+    _pattern: re.Pattern[bytes] | None
+    _found: dict[Path, frozenset[str] | None]
+
+    def __init__(self, triggers: Iterable[str] = ()):
+        self.triggers = set()
+        self._pattern = None
+        self._found = {}
+        self.add(triggers)
+
+    def add(self, triggers: Iterable[str]):
+        """
+        Add trigger names to look for
+
+        Adding all the trigger names of a run before filtering any file means
+        that each file is scanned only once.
+        """
+        if new_triggers := set(triggers) - self.triggers:
+            self.triggers |= new_triggers
+            self._pattern = None
+            # Files scanned so far weren't checked for the new names
+            self._found.clear()
+
+    @property
+    def pattern(self) -> re.Pattern[bytes]:
+        if self._pattern is None:
+            names = sorted(self.triggers, key=len, reverse=True)
+            self._pattern = re.compile(
+                rb"\b(?:"
+                + b"|".join(re.escape(name.encode()) for name in names)
+                + rb")\b"
+            )
+        return self._pattern
+
+    def found(self, filename: Path) -> frozenset[str] | None:
+        """
+        Return the trigger names found in the file, or `None` if the file can't be read
+        """
+        if filename not in self._found:
+            try:
+                data = filename.read_bytes()
+            except OSError:
+                logger.debug("unable to scan %s for triggers", filename, exc_info=True)
+                found = None
+            else:
+                found = frozenset(
+                    name.decode() for name in set(self.pattern.findall(data))
+                )
+            self._found[filename] = found
+        return self._found[filename]
+
+    def filter(self, files: list[Path], triggers: Iterable[str]) -> list[Path]:
+        """
+        Return the files that mention any of the given trigger names
+
+        All files are returned if there are no trigger names. Files that can't
+        be read are kept so that their failures are reported as before.
+        """
+        if not (triggers := set(triggers)):
+            return files
+
+        self.add(triggers)
+        return [
+            filename
+            for filename in files
+            if (found := self.found(filename)) is None or not found.isdisjoint(triggers)
+        ]
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 class ABCDataclass(ABC):
     """Inspired by https://stackoverflow.com/a/60669138"""
 
+    __slots__ = ()
+
     def __new__(cls, *args, **kwargs):
         del args, kwargs
         if cls == ABCDataclass or cls.__bases__[0] == ABCDataclass:
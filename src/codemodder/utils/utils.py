@@ -1,4 +1,8 @@
+import math
+import os
+import sys
 from functools import cache
+from pathlib import Path
 from typing import Sequence
 
 import libcst as cst
@@ -69,3 +73,51 @@ def positional_to_keyword(
         else:
             new_args.append(arg)
     return new_args
+
+
+def _cgroup_cpu_limit() -> float | None:
+    """
+    Returns the CPU limit imposed by cgroups (v2 or v1) if any.
+    """
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    return quota_us / period_us if quota_us > 0 and period_us > 0 else None
+
+
+def available_cpu_count() -> int:
+    """
+    Returns the number of CPUs this process can use, respecting CPU affinity and cgroup limits.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    if (limit := _cgroup_cpu_limit()) is not None:
+        count = min(count, math.ceil(limit))
+    return max(count, 1)
+
+
+def peak_memory_mb() -> float | None:
+    """
+    Returns the peak resident memory of this process in MB, or None if it can't be measured on this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
@@ -1,5 +1,3 @@
-from pathlib import Path
-
 from codemodder.codemods.api import BaseCodemod
 from codemodder.codemods.api import SimpleCodemod as _SimpleCodemod
 from codemodder.codemods.base_codemod import Metadata
@@ -8,7 +6,6 @@ from codemodder.codemods.base_transformer import BaseTransformerPipeline
 from codemodder.codemods.import_modifier_codemod import (
     ImportModifierCodemod as _ImportModifierCodemod,
 )
-from codemodder.context import CodemodExecutionContext
 
 
 class CoreCodemod(BaseCodemod):
@@ -41,12 +38,9 @@ class SASTCodemod(CoreCodemod):
         if requested_rules:
             self.requested_rules.extend(requested_rules)
 
-    def apply(
-        self,
-        context: CodemodExecutionContext,
-        files_to_analyze: list[Path],
-    ) -> None:
-        self._apply(context, files_to_analyze, self.requested_rules)
+    @property
+    def rules(self) -> list[str]:
+        return self.requested_rules
 
 
 class SimpleCodemod(_SimpleCodemod):
@@ -81,6 +81,7 @@ DjangoModelWithoutDunderStr = CoreCodemod(
                 url="https://docs.djangoproject.com/en/5.0/ref/models/instances/#django.db.models.Model.__str__"
             ),
         ],
+        triggers=["django"],
     ),
     transformer=LibcstTransformerPipeline(DjangoModelWithoutDunderStrTransformer),
     detector=None,
@@ -48,6 +48,7 @@ DjangoReceiverOnTop = CoreCodemod(
         references=[
             Reference(url="https://docs.djangoproject.com/en/4.1/topics/signals/"),
         ],
+        triggers=["django"],
     ),
     transformer=LibcstTransformerPipeline(DjangoReceiverOnTopTransformer),
     detector=None,
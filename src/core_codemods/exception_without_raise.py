@@ -66,6 +66,8 @@ ExceptionWithoutRaise = CoreCodemod(
             ),
         ],
     ),
-    transformer=LibcstTransformerPipeline(ExceptionWithoutRaiseTransformer),
+    transformer=LibcstTransformerPipeline(
+        ExceptionWithoutRaiseTransformer, prune_by_results=True
+    ),
     detector=None,
 )
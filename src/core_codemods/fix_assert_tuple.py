@@ -62,6 +62,8 @@ FixAssertTuple = CoreCodemod(
         review_guidance=ReviewGuidance.MERGE_AFTER_CURSORY_REVIEW,
         references=[],
     ),
-    transformer=LibcstTransformerPipeline(FixAssertTupleTransform),
+    transformer=LibcstTransformerPipeline(
+        FixAssertTupleTransform, prune_by_results=True
+    ),
     detector=None,
 )
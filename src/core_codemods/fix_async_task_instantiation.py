@@ -18,6 +18,7 @@ class FixAsyncTaskInstantiation(SimpleCodemod, NameAndAncestorResolutionMixin):
                 url="https://docs.python.org/3/library/asyncio-task.html#asyncio.Task"
             ),
         ],
+        triggers=["asyncio"],
     )
     change_description = "Replace instantiation of `asyncio.Task` with higher-level functions to create tasks."
     _module_name = "asyncio"
@@ -20,6 +20,7 @@ class FixDeprecatedAbstractproperty(SimpleCodemod, NameResolutionMixin):
                 url="https://docs.python.org/3/library/abc.html#abc.abstractstaticmethod"
             ),
         ],
+        triggers=["abc"],
     )
     change_description = "Replace deprecated `abc` decorator."
     DEPRECATED_TO_NEW = {
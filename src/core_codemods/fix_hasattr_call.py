@@ -12,6 +12,7 @@ class TransformFixHasattrCall(SimpleCodemod):
             Reference(url="https://docs.python.org/3/library/functions.html#callable"),
             Reference(url="https://docs.python.org/3/library/functions.html#hasattr"),
         ],
+        triggers=["hasattr"],
     )
     detector_pattern = """
         - patterns:
@@ -20,6 +20,7 @@ class FlaskEnableCSRFProtection(
             Reference(url="https://owasp.org/www-community/attacks/csrf"),
             Reference(url="https://flask-wtf.readthedocs.io/en/1.2.x/csrf/"),
         ],
+        triggers=["flask"],
     )
 
     change_description = "Add CSRFProtect module to harden the app"
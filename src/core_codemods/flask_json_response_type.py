@@ -282,6 +282,7 @@ FlaskJsonResponseType = CoreCodemod(
                 url="https://cheatsheetseries.owasp.org/cheatsheets/Cross_Site_Scripting_Prevention_Cheat_Sheet.html#output-encoding-for-javascript-contexts"
             ),
         ],
+        triggers=["flask"],
     ),
     transformer=LibcstTransformerPipeline(FlaskJsonResponseTypeTransformer),
     detector=None,
@@ -21,6 +21,7 @@ class HardenPickleLoad(ImportModifierCodemod):
                 url="https://github.com/trailofbits/fickling",
             ),
         ],
+        triggers=["pickle"],
     )
 
     change_description = "Harden `pickle.load()` against deserialization attacks"
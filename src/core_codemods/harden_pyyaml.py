@@ -19,6 +19,7 @@ class HardenPyyaml(SimpleCodemod, NameResolutionMixin):
                 url="https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation"
             ),
         ],
+        triggers=["yaml"],
     )
     change_description = "Replace unsafe `pyyaml` loader with `SafeLoader` in calls to `yaml.load` or custom loader classes."
 
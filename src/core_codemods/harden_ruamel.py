@@ -12,6 +12,7 @@ class HardenRuamel(SimpleCodemod):
                 url="https://owasp.org/www-community/vulnerabilities/Deserialization_of_untrusted_data"
             ),
         ],
+        triggers=["ruamel"],
     )
     change_description = (
         "Ensures all unsafe calls to ruamel.yaml.YAML use `typ='safe'`."
@@ -60,6 +60,7 @@ class HTTPSConnection(SimpleCodemod):
                 url="https://urllib3.readthedocs.io/en/stable/reference/urllib3.connectionpool.html#urllib3.HTTPConnectionPool"
             ),
         ],
+        triggers=["urllib3"],
     )
 
     change_description = "Enforce HTTPS connection for `urllib3`"
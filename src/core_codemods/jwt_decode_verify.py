@@ -86,6 +86,7 @@ JwtDecodeVerify = CoreCodemod(
                 url="https://owasp.org/www-project-web-security-testing-guide/latest/4-Web_Application_Security_Testing/06-Session_Management_Testing/10-Testing_JSON_Web_Tokens"
             ),
         ],
+        triggers=["jwt"],
     ),
     transformer=LibcstTransformerPipeline(JwtDecodeVerifyTransformer),
     detector=SemgrepRuleDetector(
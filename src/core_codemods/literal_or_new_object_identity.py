@@ -83,6 +83,8 @@ LiteralOrNewObjectIdentity = CoreCodemod(
             ),
         ],
     ),
-    transformer=LibcstTransformerPipeline(LiteralOrNewObjectIdentityTransformer),
+    transformer=LibcstTransformerPipeline(
+        LiteralOrNewObjectIdentityTransformer, prune_by_results=True
+    ),
     detector=None,
 )
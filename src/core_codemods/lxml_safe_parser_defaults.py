@@ -18,6 +18,7 @@ class LxmlSafeParserDefaults(SimpleCodemod):
                 url="https://cheatsheetseries.owasp.org/cheatsheets/XML_External_Entity_Prevention_Cheat_Sheet.html"
             ),
         ],
+        triggers=["lxml"],
     )
     change_description = "Replace `lxml` parser parameters with safe defaults."
     detector_pattern = """
@@ -18,6 +18,7 @@ class LxmlSafeParsing(SimpleCodemod):
                 url="https://cheatsheetseries.owasp.org/cheatsheets/XML_External_Entity_Prevention_Cheat_Sheet.html"
             ),
         ],
+        triggers=["lxml"],
     )
     change_description = (
         "Call `lxml.etree.parse` and `lxml.etree.fromstring` with a safe parser."
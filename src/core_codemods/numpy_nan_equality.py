@@ -72,7 +72,10 @@ NumpyNanEquality = CoreCodemod(
                 url="https://numpy.org/doc/stable/reference/constants.html#numpy.nan"
             ),
         ],
+        triggers=["numpy"],
+    ),
+    transformer=LibcstTransformerPipeline(
+        NumpyNanEqualityTransformer, prune_by_results=True
     ),
-    transformer=LibcstTransformerPipeline(NumpyNanEqualityTransformer),
     detector=None,
 )
@@ -158,6 +158,7 @@ RemoveAssertionInPytestRaises = CoreCodemod(
                 description="",
             ),
         ],
+        triggers=["pytest"],
     ),
     transformer=LibcstTransformerPipeline(RemoveAssertionInPytestRaisesTransformer),
     detector=None,
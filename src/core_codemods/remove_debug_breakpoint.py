@@ -12,6 +12,7 @@ class RemoveDebugBreakpoint(SimpleCodemod, NameResolutionMixin, AncestorPatterns
         summary="Remove Calls to `builtin` `breakpoint` and `pdb.set_trace",
         review_guidance=ReviewGuidance.MERGE_WITHOUT_REVIEW,
         references=[],
+        triggers=["breakpoint", "set_trace"],
     )
     change_description = "Remove breakpoint call"
 
@@ -19,6 +19,7 @@ class ReplaceFlaskSendFile(SimpleCodemod, NameAndAncestorResolutionMixin):
             ),
             Reference(url="https://owasp.org/www-community/attacks/Path_Traversal"),
         ],
+        triggers=["flask"],
     )
 
     change_description = (
@@ -14,6 +14,7 @@ class RequestsVerify(SimpleCodemod):
                 url="https://owasp.org/www-community/attacks/Manipulator-in-the-middle_attack"
             ),
         ],
+        triggers=["requests", "httpx"],
     )
     change_description = (
         "Ensures requests using the `requests` or `httpx` library use `verify=True`."
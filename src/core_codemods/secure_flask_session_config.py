@@ -24,6 +24,7 @@ class SecureFlaskSessionConfig(SimpleCodemod, Codemod):
                 url="https://cheatsheetseries.owasp.org/cheatsheets/Session_Management_Cheat_Sheet.html"
             ),
         ],
+        triggers=["flask"],
     )
     change_description = "Flip Flask session configuration if defined as insecure."
 
@@ -19,7 +19,7 @@ class JwtDecodeVerifySonarTransformer(JwtDecodeVerifyTransformer):
                 pos_to_match = self.node_position(node)
                 return any(
                     self.match_location(pos_to_match, result)
-                    for result in self.results or []
+                    for result in self.result_index.results_for_position(pos_to_match)
                 )
         return False
 
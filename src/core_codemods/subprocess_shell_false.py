@@ -22,6 +22,7 @@ class SubprocessShellFalse(SimpleCodemod, NameResolutionMixin):
             ),
             Reference(url="https://stackoverflow.com/a/3172488"),
         ],
+        triggers=["subprocess"],
     )
     change_description = "Set `shell` keyword argument to `False`"
     SUBPROCESS_FUNCS = [
@@ -12,6 +12,7 @@ class TempfileMktemp(SimpleCodemod, NameResolutionMixin):
                 url="https://docs.python.org/3/library/tempfile.html#tempfile.mktemp"
             ),
         ],
+        triggers=["mktemp"],
     )
     change_description = "Replaces `tempfile.mktemp` with `tempfile.mkstemp`."
 
@@ -3,7 +3,7 @@ from typing import List, Optional, Union
 import libcst as cst
 from libcst import CSTNode, matchers
 from libcst.codemod import CodemodContext, ContextAwareVisitor
-from libcst.codemod.visitors import AddImportsVisitor, ImportItem
+from libcst.codemod.visitors import AddImportsVisitor
 from libcst.metadata import PositionProvider, ScopeProvider
 
 from codemodder.change import Change
@@ -81,10 +81,9 @@ class UrlSandbox(SimpleCodemod):
                     for n in find_requests_visitor.nodes_to_change
                 )
             ):
-                new_tree = AddImportsVisitor(
-                    self.context,
-                    [ImportItem(Security.name, replacement_import, None, 0)],
-                ).transform_module(new_tree)
+                AddImportsVisitor.add_needed_import(
+                    self.context, Security.name, replacement_import
+                )
                 new_tree = RemoveUnusedImportsCodemod(self.context).transform_module(
                     new_tree
                 )
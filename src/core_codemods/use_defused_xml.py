@@ -26,6 +26,7 @@ class UseDefusedXml(ImportModifierCodemod):
                 url="https://cheatsheetseries.owasp.org/cheatsheets/XML_External_Entity_Prevention_Cheat_Sheet.html"
             ),
         ],
+        triggers=["xml"],
     )
 
     change_description = "Replace builtin XML method with safe `defusedxml` method"
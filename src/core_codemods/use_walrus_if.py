@@ -77,7 +77,7 @@ class UseWalrusIf(SimpleCodemod):
                 return test
         return None
 
-    def on_visit(self, node: cst.CSTNode) -> Optional[bool]:
+    def on_visit(self, node: cst.CSTNode) -> bool:
         if len(node.children) < 2:
             return super().on_visit(node)
 
@@ -1,8 +1,14 @@
+import json
+
 import libcst as cst
 import mock
 from libcst.codemod import CodemodContext
 
 from codemodder.codemods.api import Metadata, ReviewGuidance, SimpleCodemod
+from codemodder.codemods.base_codemod import BaseCodemod
+from codemodder.context import CodemodExecutionContext
+from core_codemods.numpy_nan_equality import NumpyNanEquality
+from core_codemods.sonar.sonar_numpy_nan_equality import SonarNumpyNanEquality
 
 
 class DoNothingCodemod(SimpleCodemod):
@@ -32,3 +38,92 @@ class TestEmptyResults:
     def test_empty_results(self):
         input_code = """print('Hello World')"""
         self.run_and_assert(input_code, input_code)
+
+
+class TestFilesWithResults:
+    def apply(self, tmp_path, rule):
+        issues = {
+            "issues": [
+                {
+                    "rule": rule,
+                    "status": "OPEN",
+                    "component": "with_finding.py",
+                    "textRange": {
+                        "startLine": 2,
+                        "endLine": 2,
+                        "startOffset": 3,
+                        "endOffset": 17,
+                    },
+                }
+            ]
+        }
+        code = "import numpy\nif a == numpy.nan:\n    pass\n"
+        files = [tmp_path / "with_finding.py", tmp_path / "without_finding.py"]
+        for path in files:
+            path.write_text(code)
+        results_file = tmp_path / "sonar.json"
+        results_file.write_text(json.dumps(issues))
+
+        context = CodemodExecutionContext(
+            directory=tmp_path,
+            dry_run=True,
+            verbose=False,
+            tool_result_files_map={"sonar": [str(results_file)]},
+            registry=mock.MagicMock(),
+            repo_manager=mock.MagicMock(),
+            path_include=[],
+            path_exclude=[],
+        )
+        codemod = SonarNumpyNanEquality
+        with mock.patch.object(
+            BaseCodemod, "_process_file", side_effect=BaseCodemod._process_file
+        ) as process_file:
+            codemod.apply(context, files)
+        return context, codemod, process_file
+
+    def test_only_files_with_results_processed(self, tmp_path):
+        context, codemod, process_file = self.apply(tmp_path, "python:S6725")
+
+        assert process_file.call_count == 1
+        file_context = process_file.call_args[0][2]
+        assert file_context.file_path == tmp_path / "with_finding.py"
+        assert [change.path for change in context.get_results(codemod.id)] == [
+            "with_finding.py"
+        ]
+
+    def test_no_results_for_rules(self, tmp_path):
+        context, _, process_file = self.apply(tmp_path, "python:S0000")
+
+        process_file.assert_not_called()
+        assert "executor" not in context.__dict__
+
+
+class TestFilesWithTriggers:
+    def test_only_files_with_triggers_processed(self, tmp_path):
+        with_trigger = tmp_path / "with_trigger.py"
+        with_trigger.write_text("import numpy\nif a == numpy.nan:\n    pass\n")
+        without_trigger = tmp_path / "without_trigger.py"
+        without_trigger.write_text("if a == b:\n    pass\n")
+
+        context = CodemodExecutionContext(
+            directory=tmp_path,
+            dry_run=True,
+            verbose=False,
+            registry=mock.MagicMock(),
+            repo_manager=mock.MagicMock(),
+            path_include=[],
+            path_exclude=[],
+        )
+        codemod = NumpyNanEquality
+        assert codemod.triggers == ["numpy"]
+        with mock.patch.object(
+            BaseCodemod, "_process_file", side_effect=BaseCodemod._process_file
+        ) as process_file:
+            codemod.apply(context, [with_trigger, without_trigger])
+
+        assert process_file.call_count == 1
+        file_context = process_file.call_args[0][2]
+        assert file_context.file_path == with_trigger
+        assert [change.path for change in context.get_results(codemod.id)] == [
+            "with_trigger.py"
+        ]
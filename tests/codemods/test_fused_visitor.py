@@ -0,0 +1,136 @@
+import libcst as cst
+import mock
+import pytest
+
+from codemodder.codemods.fused_visitor import (
+    can_fuse,
+    find_unchanged,
+    handled_node_types,
+)
+from codemodder.codemods.libcst_transformer import (
+    LibcstResultTransformer,
+    LibcstTransformerPipeline,
+    apply_codemods_to_file,
+)
+from codemodder.context import CodemodExecutionContext
+from codemodder.file_context import FileContext
+from core_codemods.https_connection import HTTPSConnection
+from core_codemods.use_generator import UseGenerator
+from core_codemods.use_set_literal import UseSetLiteral
+
+CODE = """\
+x = sum([i for i in range(10)])
+
+def f():
+    return set([1, 2])
+"""
+
+
+class CollectNames(LibcstResultTransformer):
+    names: list[str] = []
+
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> bool:
+        # Nothing inside functions is visited
+        return False
+
+    def visit_Name(self, node: cst.Name):
+        self.names.append(node.value)
+
+
+class Rename(LibcstResultTransformer):
+    change_description = "Rename x"
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name):
+        if original_node.value == "x":
+            self.report_change(original_node)
+            return updated_node.with_changes(value="y")
+        return updated_node
+
+
+def make_pipelines(tmp_path, *transformers):
+    return [
+        (
+            LibcstTransformerPipeline(transformer),
+            FileContext(tmp_path, tmp_path / "code.py", findings=None),
+        )
+        for transformer in transformers
+    ]
+
+
+def test_handled_node_types():
+    # Hooks that call `on_result_found`
+    assert handled_node_types(LibcstResultTransformer) == {"Assign", "Call", "ClassDef"}
+    assert handled_node_types(CollectNames) == {
+        "Assign",
+        "Call",
+        "ClassDef",
+        "FunctionDef",
+        "Name",
+    }
+    assert handled_node_types(Rename) == {"Assign", "Call", "ClassDef", "Name"}
+
+
+def test_can_fuse():
+    assert can_fuse(UseGenerator().transformer)
+    assert can_fuse(LibcstTransformerPipeline(Rename))
+    assert not can_fuse(LibcstTransformerPipeline(Rename, CollectNames))
+    # The transformer overrides `transform_module_impl`
+    assert not can_fuse(HTTPSConnection().transformer)
+
+
+class TestFindUnchanged:
+    def test_find_unchanged(self, tmp_path):
+        pipelines = make_pipelines(tmp_path, CollectNames, Rename, Rename)
+        assert find_unchanged(cst.parse_module(CODE), pipelines) == [
+            True,
+            False,
+            False,
+        ]
+        # Nothing is reported to the file contexts
+        assert not any(file_context.codemod_changes for _, file_context in pipelines)
+
+    def test_children_skipped_per_transformer(self, tmp_path):
+        CollectNames.names = []
+        pipelines = make_pipelines(tmp_path, CollectNames, Rename)
+        find_unchanged(cst.parse_module("x = 1\ndef f():\n    y = 2\n"), pipelines)
+        assert CollectNames.names == ["x"]
+
+    def test_no_change_reported(self, tmp_path):
+        pipelines = make_pipelines(tmp_path, Rename, Rename)
+        assert find_unchanged(cst.parse_module("y = 1\n"), pipelines) == [True, True]
+
+
+class TestApplyCodemodsToFile:
+    @pytest.mark.parametrize("dry_run", [True, False])
+    def test_unchanged_pipelines_not_applied(self, tmp_path, dry_run):
+        code_path = tmp_path / "code.py"
+        code_path.write_text(CODE)
+        context = CodemodExecutionContext(tmp_path, dry_run, False, None, None, [], [])
+        pipelines = make_pipelines(tmp_path, CollectNames, Rename)
+        pipelines += [
+            (
+                codemod.transformer,
+                FileContext(tmp_path, code_path, findings=None),
+            )
+            for codemod in (UseGenerator(), UseSetLiteral())
+        ]
+
+        with mock.patch.object(
+            LibcstTransformerPipeline,
+            "apply_to_tree",
+            autospec=True,
+            side_effect=LibcstTransformerPipeline.apply_to_tree,
+        ) as apply_to_tree:
+            file_contexts = apply_codemods_to_file(context, code_path, pipelines)
+
+        applied = [call.args[0] for call in apply_to_tree.call_args_list]
+        assert pipelines[0][0] not in applied
+        assert [
+            [change.description for change in file_context.codemod_changes]
+            for file_context in file_contexts
+        ] == [
+            [],
+            ["Rename x"],
+            [UseGenerator.change_description],
+            [UseSetLiteral.change_description],
+        ]
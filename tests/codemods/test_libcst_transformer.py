@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import libcst as cst
+import pytest
+from libcst.codemod.visitors import AddImportsVisitor, RemoveImportsVisitor
+
+from codemodder.codemods.libcst_transformer import (
+    LibcstResultTransformer,
+    LibcstTransformerPipeline,
+)
+from codemodder.context import CodemodExecutionContext
+from codemodder.file_context import FileContext
+from codemodder.result import LineInfo
+from codemodder.sonar_results import SonarLocation, SonarResult
+
+CODE = """\
+a = 1
+b = 2
+
+@decorator(c)
+def f():
+    d = 3
+    return e
+
+class C:
+    g = 4
+"""
+
+
+def make_result(line: int) -> SonarResult:
+    return SonarResult(
+        rule_id="rule",
+        locations=[
+            SonarLocation(
+                file=Path("code.py"),
+                start=LineInfo(line=line, column=0, snippet=None),
+                end=LineInfo(line=line, column=1, snippet=None),
+            )
+        ],
+    )
+
+
+class CollectNames(LibcstResultTransformer):
+    names: list[str] = []
+
+    def visit_Name(self, node: cst.Name):
+        self.names.append(node.value)
+
+
+class TestPruneByResults:
+    def visited_names(self, tmp_path, results, prune_by_results):
+        CollectNames.names = []
+        context = CodemodExecutionContext(tmp_path, True, False, None, None, [], [])
+        file_context = FileContext(tmp_path, tmp_path / "code.py")
+        pipeline = LibcstTransformerPipeline(
+            CollectNames, prune_by_results=prune_by_results
+        )
+        pipeline.apply_to_tree(context, file_context, cst.parse_module(CODE), results)
+        return CollectNames.names
+
+    @pytest.mark.parametrize(
+        "lines,names",
+        [
+            ([2], ["b"]),
+            ([6], ["decorator", "c", "f", "d"]),
+            # Decorators are part of the function but its body isn't visited
+            ([4], ["decorator", "c", "f"]),
+            ([2, 10], ["b", "C", "g"]),
+            ([], []),
+        ],
+    )
+    def test_prune(self, tmp_path, lines, names):
+        results = [make_result(line) for line in lines]
+        assert self.visited_names(tmp_path, results, True) == names
+
+    def test_no_pruning_without_results(self, tmp_path):
+        all_names = ["a", "b", "decorator", "c", "f", "d", "e", "C", "g"]
+        assert self.visited_names(tmp_path, None, True) == all_names
+        assert self.visited_names(tmp_path, [make_result(2)], False) == all_names
+
+
+class AddOsImport(LibcstResultTransformer):
+    def leave_Assign(self, original_node, updated_node):
+        self.add_needed_import("os")
+        self.report_change(original_node)
+        return updated_node.with_changes(value=cst.parse_expression("os.sep"))
+
+
+class AddSysImport(LibcstResultTransformer):
+    def leave_Assign(self, original_node, updated_node):
+        self.add_needed_import("sys")
+        self.report_change(original_node)
+        return updated_node
+
+
+class TestImportChanges:
+    def test_imports_changed_once(self, tmp_path, mocker):
+        add_imports = mocker.spy(AddImportsVisitor, "leave_Module")
+        remove_imports = mocker.spy(RemoveImportsVisitor, "visit_Module")
+        context = CodemodExecutionContext(tmp_path, True, False, None, None, [], [])
+        file_context = FileContext(tmp_path, tmp_path / "code.py")
+        pipeline = LibcstTransformerPipeline(AddOsImport, AddSysImport)
+
+        change_set, code = pipeline.apply_to_tree(
+            context, file_context, cst.parse_module("a = 1\n"), None
+        )
+
+        assert change_set is not None
+        assert code == "import os\nimport sys\n\na = os.sep\n"
+        add_imports.assert_called_once()
+        remove_imports.assert_not_called()
+
+    def test_transform_changes_imports(self, tmp_path):
+        file_context = FileContext(tmp_path, tmp_path / "code.py")
+        tree = AddOsImport.transform(cst.parse_module("a = 1\n"), None, file_context)
+        assert tree.code == "import os\n\na = os.sep\n"
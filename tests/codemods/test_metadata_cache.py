@@ -0,0 +1,99 @@
+import threading
+
+import libcst as cst
+import pytest
+from libcst.metadata import ParentNodeProvider, PositionProvider, ScopeProvider
+
+from codemodder.codemods.libcst_transformer import LibcstResultTransformer
+from codemodder.codemods.metadata_cache import (
+    LazyMetadata,
+    MetadataCache,
+    metadata_cache,
+)
+from codemodder.file_context import FileContext
+
+
+class TestMetadataCache:
+    def test_keyed_by_tree_identity(self):
+        cache = MetadataCache()
+        module = cst.parse_module("x = 1\n")
+        assert cache.wrapper(module) is cache.wrapper(module)
+        assert cache.wrapper(module) is not cache.wrapper(cst.parse_module("x = 1\n"))
+
+    def test_least_recently_used_evicted(self):
+        cache = MetadataCache(max_size=2)
+        modules = [cst.parse_module(f"x = {i}\n") for i in range(3)]
+        wrappers = [cache.wrapper(module) for module in modules[:2]]
+        # Using the first wrapper makes the second one the least recently used
+        assert cache.wrapper(modules[0]) is wrappers[0]
+        cache.wrapper(modules[2])
+
+        assert cache.wrapper(modules[0]) is wrappers[0]
+        assert cache.wrapper(modules[1]) is not wrappers[1]
+
+    def test_per_thread(self):
+        cache = MetadataCache()
+        module = cst.parse_module("x = 1\n")
+        wrappers = [cache.wrapper(module)]
+        thread = threading.Thread(target=lambda: wrappers.append(cache.wrapper(module)))
+        thread.start()
+        thread.join()
+        assert wrappers[0] is not wrappers[1]
+
+
+class TestLazyMetadata:
+    def test_resolved_when_looked_up(self):
+        wrapper = cst.MetadataWrapper(cst.parse_module("x = 1\n"))
+        metadata = LazyMetadata(wrapper, {PositionProvider, ScopeProvider})
+        assert set(metadata) == {PositionProvider, ScopeProvider}
+        assert ScopeProvider not in wrapper._metadata
+
+        scopes = metadata[ScopeProvider]
+        assert ScopeProvider in wrapper._metadata
+        assert metadata[ScopeProvider] is scopes
+        assert PositionProvider not in wrapper._metadata
+
+    def test_undeclared_provider(self):
+        wrapper = cst.MetadataWrapper(cst.parse_module("x = 1\n"))
+        with pytest.raises(KeyError):
+            LazyMetadata(wrapper, {PositionProvider})[ScopeProvider]
+
+
+class CollectAssignedNames(LibcstResultTransformer):
+    METADATA_DEPENDENCIES = (PositionProvider, ParentNodeProvider, ScopeProvider)
+
+    def leave_Assign(self, original_node, updated_node):
+        self.get_metadata(ParentNodeProvider, original_node)
+        return updated_node
+
+
+class CollectAssignedNamesWithVisitor(CollectAssignedNames):
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        return tree.visit(self)
+
+
+class TestTransform:
+    def transform(self, tmp_path, transformer, module):
+        file_context = FileContext(tmp_path, tmp_path / "code.py", findings=None)
+        return transformer.transform(module, None, file_context)
+
+    def test_metadata_shared_and_lazy(self, tmp_path):
+        module = cst.parse_module("x = 1\n")
+        self.transform(tmp_path, CollectAssignedNames, module)
+        wrapper = metadata_cache.wrapper(module)
+        # Only the providers that were looked up are computed
+        assert set(wrapper._metadata) == {ParentNodeProvider}
+
+        parents = wrapper._metadata[ParentNodeProvider]
+        self.transform(tmp_path, CollectAssignedNames, module)
+        assert metadata_cache.wrapper(module)._metadata[ParentNodeProvider] is parents
+
+    def test_metadata_resolved_for_other_visitors(self, tmp_path):
+        module = cst.parse_module("x = 1\n")
+        assert not CollectAssignedNamesWithVisitor.only_visits()
+        self.transform(tmp_path, CollectAssignedNamesWithVisitor, module)
+        assert set(metadata_cache.wrapper(module)._metadata) >= {
+            PositionProvider,
+            ParentNodeProvider,
+            ScopeProvider,
+        }
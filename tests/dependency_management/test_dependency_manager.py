@@ -1,11 +1,15 @@
+from textwrap import dedent
+
 import pytest
 
 from codemodder.change import ChangeSet
 from codemodder.dependency import DefusedXML, Security
 from codemodder.dependency_management import DependencyManager
 from codemodder.project_analysis.file_parsers import (
+    PyprojectTomlParser,
     RequirementsTxtParser,
     SetupCfgParser,
+    SetupPyParser,
 )
 from codemodder.project_analysis.file_parsers.package_store import PackageStore
 
@@ -48,3 +52,64 @@ class TestDependencyManager:
         changeset = dm.write(dependencies)
         assert isinstance(changeset, ChangeSet)
         assert len(changeset.changes)
+
+    @pytest.mark.parametrize(
+        "parser,contents",
+        [
+            (RequirementsTxtParser, "requests\n"),
+            (
+                PyprojectTomlParser,
+                """\
+                [project]
+                name = "test"
+                dependencies = [
+                    "requests",
+                ]
+                """,
+            ),
+            (
+                SetupPyParser,
+                """\
+                from setuptools import setup
+
+                setup(
+                    name="test",
+                    install_requires=[
+                        "requests",
+                    ],
+                )
+                """,
+            ),
+            (
+                SetupCfgParser,
+                """\
+                [options]
+                install_requires =
+                    requests
+                """,
+            ),
+        ],
+    )
+    def test_write_batched(self, tmp_path, parser, contents):
+        results = []
+        for name in ("immediate", "batched"):
+            project_dir = tmp_path / name
+            project_dir.mkdir()
+            file_name = parser(project_dir).file_type.value
+            (project_dir / file_name).write_text(dedent(contents))
+            dm = DependencyManager(parser(project_dir).parse()[0], project_dir)
+
+            batched = name == "batched"
+            changesets = [
+                dm.write([DefusedXML], dry_run=batched),
+                dm.write([Security], dry_run=batched),
+            ]
+            if batched:
+                # Nothing is written until all dependencies have been added
+                assert (project_dir / file_name).read_text() == dedent(contents)
+                dm.write_file()
+
+            results.append((changesets, (project_dir / file_name).read_text()))
+
+        assert all(results[0][0])
+        assert results[1] == results[0]
@@ -219,3 +219,18 @@ def test_pyproject_no_dependencies(tmpdir):
     writer.write(dependencies)
 
     assert pyproject_toml.read() == dedent(orig_pyproject)
+
+
+def test_update_pyproject_write_fails(tmpdir, mocker):
+    pyproject_toml = tmpdir.join("pyproject.toml")
+    pyproject_toml.write('[project]\ndependencies = ["libcst~=1.1.0"]\n')
+    store = PackageStore(
+        type=FileType.TOML,
+        file=pyproject_toml,
+        dependencies=set(),
+        py_versions=[],
+    )
+    writer = PyprojectWriter(store, tmpdir)
+    mocker.patch.object(writer, "write_file", return_value=False)
+
+    assert writer.write([DefusedXML], dry_run=False) is None
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from packaging.requirements import Requirement
+
+from codemodder.project_analysis.file_parsers.package_store import (
+    FileType,
+    PackageStore,
+)
+
+
+class TestPackageStore:
+    def test_has_requirement(self):
+        store = PackageStore(
+            FileType.REQ_TXT,
+            Path("requirements.txt"),
+            {"requests==2.31.0", "Flask_Login>=0.6"},
+            [],
+        )
+        assert store.has_requirement(Requirement("requests"))
+        assert store.has_requirement(Requirement("flask-login"))
+        assert not store.has_requirement(Requirement("defusedxml"))
+
+    def test_add_requirement(self):
+        store = PackageStore(FileType.REQ_TXT, Path("requirements.txt"), set(), [])
+        store.add_requirement(Requirement("defusedxml~=0.7.1"))
+        assert store.has_requirement(Requirement("defusedxml"))
+        assert store.dependencies == {Requirement("defusedxml~=0.7.1")}
@@ -1,3 +1,5 @@
+from codemodder.code_directory import ProjectFiles
+from codemodder.project_analysis.file_parsers.base_parser import BaseParser
 from codemodder.project_analysis.python_repo_manager import PythonRepoManager
 
 
@@ -6,3 +8,32 @@ class TestPythonRepoManager:
         rm = PythonRepoManager(pkg_with_reqs_txt)
         stores = rm.package_stores
         assert len(stores) == 1
+
+    def test_package_stores_ignore_excluded_directories(self, tmp_path):
+        (tmp_path / "requirements.txt").write_text("requests\n")
+        (tmp_path / "venv").mkdir()
+        (tmp_path / "venv" / "requirements.txt").write_text("black\n")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "requirements.txt").write_text("mypy\n")
+
+        stores = PythonRepoManager(tmp_path).package_stores
+
+        assert [store.file for store in stores] == [
+            tmp_path / "requirements.txt",
+            tmp_path / "sub" / "requirements.txt",
+        ]
+
+    def test_package_stores_from_project_files(self, pkg_with_reqs_txt, mocker):
+        parse = mocker.spy(BaseParser, "parse")
+        find_file_locations = mocker.spy(BaseParser, "find_file_locations")
+        project_files = ProjectFiles(
+            python_files=[],
+            named_files={"requirements.txt": [pkg_with_reqs_txt / "requirements.txt"]},
+        )
+
+        stores = PythonRepoManager(pkg_with_reqs_txt, project_files).package_stores
+
+        assert len(stores) == 1
+        # Only the parser for the files that exist does any work
+        assert parse.call_count == 1
+        find_file_locations.assert_not_called()
@@ -0,0 +1,44 @@
+import pytest
+
+from codemodder.change import ChangeSet
+from codemodder.diff import create_diff
+from codemodder.report.diff_reporter import format_patch
+
+HEADER = (
+    "diff --git a/pkg/code.py b/pkg/code.py\n--- a/pkg/code.py\n+++ b/pkg/code.py\n"
+)
+
+
+@pytest.mark.parametrize(
+    "original,new,missing_newline,expected",
+    [
+        (
+            ["a\n", "b\n"],
+            ["a\n", "c\n"],
+            False,
+            "@@ -1,2 +1,2 @@\n a\n-b\n+c\n",
+        ),
+        (
+            ["a\n", "b\n"],
+            ["a\n", "b\n", "c"],
+            False,
+            "@@ -1,2 +1,3 @@\n a\n b\n+c\n\\ No newline at end of file\n",
+        ),
+        (
+            ["a\n", "b"],
+            ["a\n", "c"],
+            True,
+            "@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n"
+            "+c\n\\ No newline at end of file\n",
+        ),
+        (
+            ["a\n", "b"],
+            ["c\n", "b"],
+            True,
+            "@@ -1,2 +1,2 @@\n-a\n+c\n b\n\\ No newline at end of file\n",
+        ),
+    ],
+)
+def test_format_patch(original, new, missing_newline, expected):
+    change_set = ChangeSet("pkg/code.py", create_diff(original, new), changes=[])
+    assert format_patch(change_set, missing_newline) == HEADER + expected
@@ -0,0 +1,148 @@
+import os
+from pathlib import Path
+
+import libcst as cst
+import mock
+from packaging.requirements import Requirement
+
+from codemodder.cache import CacheEntry, ResultCache
+from codemodder.change import Action, Change, ChangeSet, DiffSide, PackageAction, Result
+from codemodder.context import CodemodExecutionContext
+from codemodder.dependency import DefusedXML, Dependency, License
+from codemodder.file_context import FileContext
+from codemodder.result import LineInfo
+from codemodder.sonar_results import SonarLocation, SonarResult
+from core_codemods.use_generator import UseGenerator
+
+
+def make_result(file: Path, line: int) -> SonarResult:
+    return SonarResult(
+        rule_id="rule",
+        locations=[
+            SonarLocation(
+                file=file,
+                start=LineInfo(line=line, column=1, snippet=None),
+                end=LineInfo(line=line, column=5, snippet=None),
+            )
+        ],
+    )
+
+
+class TestResultCache:
+    def test_get_put(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        assert cache.get("abcd") is None
+
+        entry = CacheEntry(ChangeSet("code.py", "diff", []), "code")
+        cache.put("abcd", entry)
+        assert cache.get("abcd") == entry
+
+    def test_get_put_changes_and_dependencies(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        change = Change(
+            3,
+            "description",
+            DiffSide.RIGHT,
+            {"key": "value"},
+            [PackageAction(Action.ADD, Result.COMPLETED, "defusedxml")],
+        )
+        entry = CacheEntry(ChangeSet("code.py", "diff", [change]), "code", {DefusedXML})
+        cache.put("abcd", entry)
+        assert cache.get("abcd") == entry
+
+    def test_unknown_dependency_not_cached(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        dependency = Dependency(
+            Requirement("unknown==1.0"), "", License("", ""), "", ""
+        )
+        cache.put("abcd", CacheEntry(None, None, {dependency}))
+        assert cache.get("abcd") is None
+
+    def test_invalid_entry_is_miss(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        cache.put("abcd", CacheEntry(None, "code"))
+        cache._path("abcd").write_bytes(b"\x80\x04not json")
+        assert cache.get("abcd") is None
+        cache._path("abcd").write_text('{"changeSet": null}')
+        assert cache.get("abcd") is None
+
+    def test_evict_least_recently_used(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        for key in ("aa", "bb", "cc"):
+            cache.put(key, CacheEntry(None, "x" * 1000))
+
+        os.utime(cache._path("aa"), (1, 1))
+        os.utime(cache._path("bb"), (2, 2))
+        os.utime(cache._path("cc"), (3, 3))
+        # Reading an entry makes it the most recently used
+        assert cache.get("aa") is not None
+
+        cache.max_size = 2 * cache._path("aa").stat().st_size
+        cache.evict()
+
+        assert cache.get("aa") is not None
+        assert cache.get("bb") is None
+        assert cache.get("cc") is not None
+
+    def test_key(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        file_context = FileContext(tmp_path, tmp_path / "code.py", cache_key="codemod")
+
+        key = cache.key(file_context, "x = 1\n")
+        assert key == cache.key(file_context, "x = 1\n")
+        assert key != cache.key(file_context, "x = 2\n")
+        assert cache.key(FileContext(tmp_path, tmp_path / "code.py"), "x = 1\n") is None
+
+        file_context.cache_key = "other-codemod"
+        assert key != cache.key(file_context, "x = 1\n")
+
+    def test_key_independent_of_checkout(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", 1024 * 1024)
+        keys = []
+        for checkout in ("one", "two"):
+            file_path = tmp_path / checkout / "code.py"
+            file_context = FileContext(
+                tmp_path / checkout,
+                file_path,
+                findings=[make_result(file_path, 2)],
+                cache_key="codemod",
+            )
+            keys.append(cache.key(file_context, "x = 1\n"))
+
+        assert keys[0] == keys[1]
+
+        file_context.findings = [make_result(file_path, 3)]
+        assert cache.key(file_context, "x = 1\n") != keys[1]
+
+
+class TestCachedCodemod:
+    def run_codemod(self, tmp_path, code_path):
+        codemod = UseGenerator()
+        context = CodemodExecutionContext(
+            directory=tmp_path,
+            dry_run=False,
+            verbose=False,
+            registry=mock.MagicMock(),
+            repo_manager=mock.MagicMock(),
+            path_include=[],
+            path_exclude=[],
+            cache=ResultCache(tmp_path / "cache", 1024 * 1024),
+        )
+        codemod.apply(context, [code_path])
+        return context, context.get_results(codemod.id)
+
+    @mock.patch("libcst.parse_module", side_effect=cst.parse_module)
+    def test_cache_hit_skips_parsing(self, mock_parse, tmp_path):
+        code_path = tmp_path / "code.py"
+        code_path.write_text("x = sum([i for i in range(10)])\n")
+
+        context, results = self.run_codemod(tmp_path, code_path)
+        assert (context.cache_hits, context.cache_misses) == (0, 1)
+        assert len(results) == 1
+        mock_parse.assert_called()
+
+        mock_parse.reset_mock()
+        context, cached_results = self.run_codemod(tmp_path, code_path)
+        assert (context.cache_hits, context.cache_misses) == (1, 0)
+        assert cached_results == results
+        mock_parse.assert_not_called()
@@ -124,7 +124,7 @@ class TestParseArgs:
         error_logger.assert_called()
         assert error_logger.call_args_list[0][0] == (
             "CLI error: %s",
-            "argument --output-format: invalid choice: 'hello' (choose from 'codetf', 'diff')",
+            "argument --output-format: invalid choice: 'hello' (choose from 'codetf', 'codetf-jsonl', 'diff')",
         )
 
     @mock.patch("codemodder.cli.logger.error")
@@ -159,3 +159,22 @@ class TestParseArgs:
             ],
             self.registry,
         )
+
+    @mock.patch("codemodder.cli.available_cpu_count", return_value=7)
+    def test_max_workers_auto(self, _):
+        argv = parse_args(
+            ["tests/samples/", "--max-workers", "auto"],
+            self.registry,
+        )
+        assert argv.max_workers == 7
+
+    @pytest.mark.parametrize("value", ["0", "-1", "many"])
+    @mock.patch("codemodder.cli.logger.error")
+    def test_bad_max_workers(self, error_logger, value):
+        with pytest.raises(SystemExit) as err:
+            parse_args(
+                ["tests/samples/", f"--max-workers={value}"],
+                self.registry,
+            )
+        assert err.value.args[0] == 3
+        error_logger.assert_called()
@@ -1,8 +1,14 @@
+import os
 from pathlib import Path
 
 import pytest
 
-from codemodder.code_directory import file_line_patterns, match_files
+from codemodder.code_directory import (
+    compile_patterns,
+    file_line_patterns,
+    match_files,
+    scan_project,
+)
 
 
 @pytest.fixture(scope="module")
@@ -101,6 +107,19 @@ class TestMatchFiles:
         )
         self._assert_expected(files, expected)
 
+    def test_match_candidate_files(self, dir_structure):
+        expected = ["make_request.py"]
+        files = match_files(
+            dir_structure,
+            exclude_paths=["tests/**"],
+            candidate_files=[
+                Path("samples/make_request.py"),
+                Path("samples/more_samples/empty_for_testing.txt"),
+                Path("tests/test_make_request.py"),
+            ],
+        )
+        self._assert_expected(files, expected)
+
     def test_test_directory_not_excluded(self, dir_structure):
         expected = ["test_insecure_random.py", "test_make_request.py"]
         files = match_files(
@@ -108,34 +127,70 @@ class TestMatchFiles:
         )
         self._assert_expected(files, expected)
 
-    def test_include_test_overridden_by_default_excludes(self, mocker):
-        mocker.patch(
-            "codemodder.code_directory.Path.rglob",
-            return_value=[
-                "foo/tests/test_insecure_random.py",
-                "foo/tests/test_make_request.py",
-            ],
-        )
-        mocker.patch(
-            "codemodder.code_directory.Path.is_file",
-            return_value=True,
-        )
-        files = match_files(Path("."), include_paths=["tests/**"])
+    def test_include_test_overridden_by_default_excludes(self, tmp_path):
+        (tmp_path / "foo" / "tests").mkdir(parents=True)
+        (tmp_path / "foo" / "tests" / "test_insecure_random.py").touch()
+        (tmp_path / "foo" / "tests" / "test_make_request.py").touch()
+        files = match_files(tmp_path, include_paths=["tests/**"])
         self._assert_expected(files, [])
 
-    def test_include_test_without_default_includes(self, mocker):
+    def test_include_test_without_default_includes(self, tmp_path):
         files = ["foo/tests/test_insecure_random.py", "foo/tests/test_make_request.py"]
-        mocker.patch(
-            "codemodder.code_directory.Path.rglob",
-            return_value=files,
-        )
-        mocker.patch(
-            "codemodder.code_directory.Path.is_file",
-            return_value=True,
+        (tmp_path / "foo" / "tests").mkdir(parents=True)
+        for name in files:
+            (tmp_path / name).touch()
+        result = match_files(tmp_path, exclude_paths=[])
+        assert result == [tmp_path / x for x in files]
+
+    def test_excluded_directories_not_walked(self, tmp_path, mocker):
+        (tmp_path / "venv" / "lib").mkdir(parents=True)
+        (tmp_path / "venv" / "lib" / "module.py").touch()
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "code.py").touch()
+        scandir = mocker.patch(
+            "codemodder.code_directory.os.scandir", side_effect=os.scandir
         )
-        result = match_files(Path("."), exclude_paths=[])
-        assert result == [Path(x) for x in files]
+
+        files = match_files(tmp_path)
+
+        assert files == [tmp_path / "src" / "code.py"]
+        scanned = [Path(call.args[0]) for call in scandir.call_args_list]
+        assert sorted(scanned) == [tmp_path, tmp_path / "src"]
 
     def test_extract_line_from_pattern(self):
         lines = file_line_patterns(Path("insecure_random.py"), ["insecure_*.py:3"])
         assert lines == [3]
+
+
+def test_compile_patterns():
+    is_match = compile_patterns(["*.py", "tests/**"])
+    assert is_match("foo/bar.py")
+    assert is_match("tests/data.json")
+    assert not is_match("foo/data.json")
+    assert not compile_patterns([])("foo.py")
+
+
+def test_scan_project(dir_structure):
+    (dir_structure / "samples" / "requirements.txt").touch()
+    (dir_structure / "tests" / "requirements.txt").touch()
+    (dir_structure / "requirements.txt").touch()
+    try:
+        project_files = scan_project(
+            dir_structure, file_names=["requirements.txt", "setup.py"]
+        )
+    finally:
+        for path in dir_structure.rglob("requirements.txt"):
+            path.unlink()
+
+    assert sorted(project_files.python_files) == [
+        Path("samples/insecure_random.py"),
+        Path("samples/make_request.py"),
+        Path("samples/more_samples/empty_for_testing.py"),
+    ]
+    assert project_files.named_files == {
+        "requirements.txt": [
+            dir_structure / "requirements.txt",
+            dir_structure / "samples" / "requirements.txt",
+        ],
+        "setup.py": [],
+    }
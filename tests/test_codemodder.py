@@ -1,3 +1,7 @@
+import gzip
+import json
+
+import git
 import libcst as cst
 import mock
 import pytest
@@ -86,6 +90,25 @@ class TestRun:
 
         mock_update_code.assert_not_called()
 
+    @mock.patch("codemodder.codemods.semgrep.semgrep_run")
+    @mock.patch("codemodder.codemodder.run_semgrep", side_effect=semgrep_run)
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_semgrep_run_once(self, _, mock_run_semgrep, mock_detector_semgrep_run):
+        args = [
+            "tests/samples/",
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=url-sandbox,secure-random",
+        ]
+
+        res = run(args)
+        assert res == 0
+
+        mock_run_semgrep.assert_called_once()
+        # Detectors reuse the results of the batched semgrep run
+        mock_detector_semgrep_run.assert_not_called()
+
     @pytest.mark.parametrize("dry_run", [True, False])
     @mock.patch("codemodder.codemodder.report_default")
     def test_reporting(self, mock_reporting, dry_run):
@@ -109,6 +132,282 @@ class TestRun:
 
         assert len(results_by_codemod) == 3
 
+    @mock.patch("libcst.parse_module", side_effect=cst.parse_module)
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_file_major(self, mock_reporting, mock_parse_file):
+        args = [
+            "tests/samples/",
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=use-generator,use-walrus-if,remove-future-imports",
+        ]
+
+        assert run(args) == 0
+        codemod_major_parses = mock_parse_file.call_count
+        mock_parse_file.reset_mock()
+
+        assert run(args + ["--file-major"]) == 0
+        file_major_parses = mock_parse_file.call_count
+
+        # Each file is parsed once rather than once per codemod
+        assert codemod_major_parses == 3 * file_major_parses
+
+        assert mock_reporting.call_count == 2
+        codemod_major_results = mock_reporting.call_args_list[0][0][3]
+        file_major_results = mock_reporting.call_args_list[1][0][3]
+        assert len(codemod_major_results) == 3
+        assert file_major_results == codemod_major_results
+
+    @pytest.mark.parametrize("file_major", [True, False])
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_process_executor(self, mock_reporting, file_major):
+        args = [
+            "tests/samples/",
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=use-generator,use-walrus-if,fix-mutable-params",
+        ]
+        if file_major:
+            args += ["--file-major"]
+
+        assert run(args) == 0
+        assert run(args + ["--executor", "process", "--max-workers", "2"]) == 0
+
+        assert mock_reporting.call_count == 2
+        thread_results = mock_reporting.call_args_list[0][0][3]
+        process_results = mock_reporting.call_args_list[1][0][3]
+        assert all(result["changeset"] for result in thread_results)
+        assert process_results == thread_results
+
+    @pytest.mark.parametrize(
+        "output_args,output_name",
+        [
+            (["--stream-output"], "result.codetf"),
+            (["--stream-output"], "result.codetf.gz"),
+            (["--output-format", "codetf-jsonl"], "result.jsonl"),
+            (["--output-format", "codetf-jsonl"], "result.jsonl.gz"),
+        ],
+    )
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_stream_output(self, mock_reporting, tmp_path, output_args, output_name):
+        args = [
+            "tests/samples/",
+            "--dry-run",
+            # secure-random doesn't run since semgrep is mocked
+            "--codemod-include=use-generator,secure-random,use-walrus-if",
+        ]
+        assert run(args + ["--output", "here.txt"]) == 0
+        expected_results = mock_reporting.call_args_list[0][0][3]
+        mock_reporting.reset_mock()
+
+        output = tmp_path / output_name
+        assert run(args + ["--output", str(output)] + output_args) == 0
+
+        mock_reporting.assert_not_called()
+        with (gzip.open if output_name.endswith(".gz") else open)(output, "rt") as f:
+            if "codetf-jsonl" in output_args:
+                *results, run_info = [json.loads(line) for line in f]
+                run_info = run_info["run"]
+            else:
+                report = json.load(f)
+                results, run_info = report["results"], report["run"]
+        assert results == expected_results
+        assert any(result["changeset"] for result in results)
+        assert run_info["tool"] == "codemodder-python"
+        assert "elapsed" in run_info
+
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_diff_output(self, mock_reporting, tmp_path):
+        code = "x = sum([i for i in range(10)])\ny = len(x)\nif y:\n    pass\n"
+        (tmp_path / "code.py").write_text(code)
+        (tmp_path / "no_newline.py").write_text("z = any([i for i in x])")
+        patch = tmp_path / "changes.patch"
+        args = [
+            str(tmp_path),
+            "--output",
+            str(patch),
+            "--output-format",
+            "diff",
+            "--dry-run",
+            "--codemod-include=use-generator,use-walrus-if",
+        ]
+
+        assert run(args) == 0
+
+        mock_reporting.assert_not_called()
+        assert (tmp_path / "code.py").read_text() == code
+        assert patch.read_text().startswith(
+            "diff --git a/code.py b/code.py\n--- a/code.py\n+++ b/code.py\n@@ "
+        )
+        git.Git(tmp_path).apply(str(patch))
+        assert (tmp_path / "code.py").read_text() == (
+            "x = sum(i for i in range(10))\nif y := len(x):\n    pass\n"
+        )
+        assert (tmp_path / "no_newline.py").read_text() == "z = any(i for i in x)"
+
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_since(self, mock_reporting, tmp_path):
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "test")
+            config.set_value("user", "email", "test@example.com")
+        code = "x = sum([i for i in range(10)])\ny = sum([i for i in range(10)])\n"
+        (tmp_path / "changed.py").write_text(code)
+        (tmp_path / "unchanged.py").write_text(code)
+        repo.index.add(["changed.py", "unchanged.py"])
+        repo.index.commit("initial")
+        (tmp_path / "changed.py").write_text(
+            code.replace(
+                "y = sum([i for i in range(10)])", "y = sum([i for i in range(20)])"
+            )
+        )
+
+        args = [
+            str(tmp_path),
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=use-generator",
+            "--since",
+            "HEAD",
+        ]
+        assert run(args) == 0
+
+        results_by_codemod = mock_reporting.call_args_list[0][0][3]
+        changesets = results_by_codemod[0]["changeset"]
+        assert [changeset["path"] for changeset in changesets] == ["changed.py"]
+        assert [change["lineNumber"] for change in changesets[0]["changes"]] == ["2"]
+
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_since_module_level_codemod(self, mock_reporting, tmp_path):
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "test")
+            config.set_value("user", "email", "test@example.com")
+        code = "import pickle\npickle.load(a)\n"
+        (tmp_path / "changed.py").write_text(code)
+        repo.index.add(["changed.py"])
+        repo.index.commit("initial")
+        (tmp_path / "changed.py").write_text(code + "pickle.load(b)\n")
+        (tmp_path / "untracked.py").write_text(code)
+
+        args = [
+            str(tmp_path),
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=harden-pickle-load",
+            "--since",
+            "HEAD",
+        ]
+        assert run(args) == 0
+
+        results_by_codemod = mock_reporting.call_args_list[0][0][3]
+        changesets = {
+            changeset["path"]: [change["lineNumber"] for change in changeset["changes"]]
+            for changeset in results_by_codemod[0]["changeset"]
+        }
+        assert changesets == {"changed.py": ["3"], "untracked.py": ["2"]}
+
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_line_include_module_level_codemod(self, mock_reporting, tmp_path):
+        (tmp_path / "code.py").write_text("import pickle\npickle.load(a)\n")
+
+        args = [
+            str(tmp_path),
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=harden-pickle-load",
+            "--path-include",
+            "*code.py:2",
+        ]
+        assert run(args) == 0
+
+        # Unlike the lines changed since a ref, explicit line filters apply
+        # to the module too
+        results_by_codemod = mock_reporting.call_args_list[0][0][3]
+        assert results_by_codemod[0]["changeset"] == []
+
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_since_bad_ref(self, mock_reporting, tmp_path):
+        git.Repo.init(tmp_path)
+        args = [
+            str(tmp_path),
+            "--output",
+            "here.txt",
+            "--codemod-include=use-generator",
+            "--since",
+            "does-not-exist",
+        ]
+        assert run(args) == 1
+        mock_reporting.assert_not_called()
+
+    @pytest.mark.parametrize("file_major", [False, True])
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_dependencies_added_to_file_changed_by_codemod(
+        self, mock_reporting, mocker, tmp_path, file_major
+    ):
+        # Both the code and the dependencies are written to the files
+        mocker.stopall()
+        (tmp_path / "setup.py").write_text(
+            "from setuptools import setup\n"
+            "\n"
+            "x = set([1, 2])\n"
+            "\n"
+            "setup(\n"
+            '    name="pkg",\n'
+            "    install_requires=[\n"
+            '        "requests",\n'
+            "    ],\n"
+            ")\n"
+        )
+        (tmp_path / "main.py").write_text("import pickle\npickle.load(a)\n")
+
+        args = [
+            str(tmp_path),
+            "--output",
+            "here.txt",
+            "--codemod-include=harden-pickle-load,use-set-literal",
+        ] + (["--file-major"] if file_major else [])
+        assert run(args) == 0
+
+        setup_py = (tmp_path / "setup.py").read_text()
+        assert "x = {1, 2}" in setup_py
+        assert '"fickling~=0.1.0",' in setup_py
+
+        results_by_codemod = {
+            result["codemod"]: result
+            for result in mock_reporting.call_args_list[0][0][3]
+        }
+        pickle_result = results_by_codemod["pixee:python/harden-pickle-load"]
+        assert not pickle_result["failedFiles"]
+        assert pickle_result["changeset"][-1]["path"] == "setup.py"
+        assert '+        "fickling~=0.1.0",\n' in pickle_result["changeset"][-1]["diff"]
+        set_literal_result = results_by_codemod["pixee:python/use-set-literal"]
+        assert [change["path"] for change in set_literal_result["changeset"]] == [
+            "setup.py"
+        ]
+
+    @mock.patch(
+        "codemodder.project_analysis.python_repo_manager.PythonRepoManager._parse_all_stores"
+    )
+    @mock.patch("codemodder.codemodder.report_default")
+    def test_package_stores_not_parsed_without_dependencies(
+        self, mock_reporting, mock_parse_stores
+    ):
+        args = [
+            "tests/samples/",
+            "--output",
+            "here.txt",
+            "--dry-run",
+            "--codemod-include=use-generator",
+        ]
+        assert run(args) == 0
+        mock_parse_stores.assert_not_called()
+
     @mock.patch("codemodder.codemods.semgrep.semgrep_run")
     def test_no_codemods_to_run(self, mock_semgrep_run, tmpdir):
         codetf = tmpdir / "result.codetf"
@@ -1,7 +1,12 @@
+import pickle
+
+import pytest
+
 from codemodder.context import CodemodExecutionContext as Context
-from codemodder.dependency import Security
+from codemodder.dependency import DefusedXML, Security
 from codemodder.project_analysis.python_repo_manager import PythonRepoManager
 from codemodder.registry import load_registered_codemods
+from codemodder.sonar_results import SonarResultSet
 
 
 class TestContext:
@@ -18,7 +23,7 @@ class TestContext:
         pkg_store = mocker.Mock()
         pkg_store.type.value = pkg_store_name
         mocker.patch(
-            "codemodder.project_analysis.file_parsers.base_parser.BaseParser.parse",
+            "codemodder.project_analysis.python_repo_manager.PythonRepoManager._parse_all_stores",
             return_value=[pkg_store],
         )
 
@@ -63,3 +68,159 @@ class TestContext:
 ```"""
             in description
         )
+
+    def test_executor_honors_max_workers(self, mocker):
+        context = Context(
+            mocker.Mock(), True, False, mocker.Mock(), mocker.Mock(), [], [], {}, 3
+        )
+        assert context.executor._max_workers == 3
+        assert context.executor is context.executor
+        assert list(context.map(str, [1, 2, 3])) == ["1", "2", "3"]
+
+        context.shutdown()
+        assert "executor" not in context.__dict__
+
+    def test_map_takes_items_as_workers_become_free(self, mocker):
+        context = Context(
+            mocker.Mock(), True, False, mocker.Mock(), mocker.Mock(), [], [], {}, 1
+        )
+        taken = []
+
+        def items():
+            for i in range(100):
+                taken.append(i)
+                yield i
+
+        results = context.map(str, items())
+        assert next(results) == "0"
+        assert len(taken) < 100
+        assert list(results) == [str(i) for i in range(1, 100)]
+
+        context.shutdown()
+
+    def test_pickled_context_only_keeps_settings(self, tmp_path):
+        context = Context(tmp_path, True, False, None, None, ["*.py"], [])
+        context.add_failures("codemod", [tmp_path / "code.py"])
+        context.timer._add_time("parse", 1)
+
+        worker_context = pickle.loads(pickle.dumps(context))
+
+        assert worker_context.directory == tmp_path
+        assert worker_context.dry_run
+        assert worker_context.path_include == ["*.py"]
+        assert not hasattr(worker_context, "registry")
+        assert worker_context.get_failures("codemod") == []
+        assert worker_context.timer.get_time_ms("parse") == 0
+
+    def test_line_filters(self, tmp_path):
+        context = Context(
+            tmp_path,
+            True,
+            False,
+            None,
+            None,
+            ["*.py", "*code.py:3"],
+            ["*code.py:5"],
+        )
+        code_path = tmp_path / "code.py"
+        assert context.line_filters(code_path) == ([5], [3])
+        assert context.line_filters(code_path) is context.line_filters(code_path)
+        assert context.line_filters(tmp_path / "other.py") == ([], [])
+
+    def test_line_filters_changed_lines(self, tmp_path):
+        context = Context(tmp_path, True, False, None, None, ["*.py"], [])
+        context.changed_lines = {tmp_path / "code.py": [1, 2]}
+        assert context.line_filters(tmp_path / "code.py") == ([], [1, 2])
+        assert context.line_filters(tmp_path / "other.py") == ([], [])
+        assert context.lines_changed_since(tmp_path / "code.py")
+
+    def test_line_filters_changed_lines_and_patterns(self, tmp_path):
+        context = Context(tmp_path, True, False, None, None, ["*code.py:3"], [])
+        assert not context.lines_changed_since(tmp_path / "code.py")
+        context.changed_lines = {tmp_path / "code.py": [1, 2]}
+        # Explicit line filters take precedence over the changed lines
+        assert context.line_filters(tmp_path / "code.py") == ([], [3])
+        assert not context.lines_changed_since(tmp_path / "code.py")
+
+    @pytest.mark.parametrize("dry_run", [True, False])
+    def test_dependencies_written_once(self, mocker, pkg_with_reqs_txt, dry_run):
+        write_file = mocker.patch(
+            "codemodder.dependency_management.DependencyManager.write_file"
+        )
+        context = Context(
+            pkg_with_reqs_txt,
+            dry_run,
+            False,
+            mocker.Mock(),
+            PythonRepoManager(pkg_with_reqs_txt),
+            [],
+            [],
+        )
+        context.add_dependencies("codemod-1", {DefusedXML})
+        context.add_dependencies("codemod-2", {Security})
+
+        context.process_dependencies("codemod-1")
+        context.process_dependencies("codemod-2")
+        assert len(context.get_results("codemod-1")) == 1
+        assert len(context.get_results("codemod-2")) == 1
+        write_file.assert_not_called()
+
+        context.write_dependencies()
+        assert write_file.call_count == (0 if dry_run else 1)
+
+    def test_dependency_write_fails(self, mocker, pkg_with_reqs_txt):
+        mocker.patch(
+            "codemodder.dependency_management.DependencyManager.write_file",
+            return_value=False,
+        )
+        registry = load_registered_codemods()
+        codemod = registry.match_codemods(codemod_include=["url-sandbox"])[0]
+        context = Context(
+            pkg_with_reqs_txt,
+            False,
+            False,
+            registry,
+            PythonRepoManager(pkg_with_reqs_txt),
+            [],
+            [],
+        )
+        context.add_dependencies(codemod.id, {Security})
+
+        context.process_dependencies(codemod.id)
+        assert len(context.get_results(codemod.id)) == 1
+
+        context.write_dependencies()
+        assert context.get_results(codemod.id) == []
+        assert context.get_failures(codemod.id) == [
+            pkg_with_reqs_txt / "requirements.txt"
+        ]
+        assert "### Manual Installation\n" in context.add_description(codemod)
+
+    def test_sonar_results_shared(self, mocker, tmp_path):
+        from_json = mocker.patch(
+            "codemodder.sonar_results.SonarResultSet.from_json",
+            return_value=SonarResultSet(),
+        )
+        context = Context(
+            tmp_path,
+            True,
+            False,
+            None,
+            None,
+            [],
+            [],
+            {"sonar": ["sonar1.json", "sonar2.json"]},
+        )
+        codemods = load_registered_codemods().match_codemods(
+            codemod_include=["numpy-nan-equality-S6725", "fix-assert-tuple-S5905"]
+        )
+        assert len(codemods) == 2
+        for codemod in codemods:
+            assert codemod.detector.apply(codemod.id, context, []) is (
+                context.sonar_results
+            )
+
+        assert sorted(call.args[0] for call in from_json.call_args_list) == [
+            "sonar1.json",
+            "sonar2.json",
+        ]
@@ -0,0 +1,48 @@
+import difflib
+
+import pytest
+
+from codemodder.diff import (
+    calc_new_line_nums,
+    create_diff,
+    create_diff_and_linenums,
+    unified_diff,
+)
+
+LINES = [f"{i}\n" for i in range(100)]
+
+
+def replace(lines, index, *new):
+    return lines[:index] + list(new) + lines[index + 1 :]
+
+
+@pytest.mark.parametrize(
+    "new_lines",
+    [
+        replace(LINES, 0, "zero\n"),
+        replace(LINES, 99, "ninety-nine\n", "one hundred\n"),
+        replace(replace(LINES, 80, "eighty\n"), 10, "ten\n"),
+        replace(LINES, 50),
+        LINES + ["100"],
+        [],
+    ],
+)
+def test_same_diff_as_difflib(new_lines):
+    diff_lines, added_line_nums = unified_diff(LINES, new_lines)
+
+    assert diff_lines == list(difflib.unified_diff(LINES, new_lines))
+    assert added_line_nums == calc_new_line_nums(diff_lines)
+
+
+def test_no_diff():
+    assert create_diff(LINES, list(LINES)) == ""
+    assert create_diff_and_linenums(LINES, list(LINES)) == ("", [])
+
+
+def test_changed_region():
+    new_lines = replace(LINES, 50, "fifty\n", "more\n")
+
+    diff_lines, added_line_nums = unified_diff(LINES, new_lines, (50, 51))
+
+    assert diff_lines[2] == "@@ -48,7 +48,8 @@\n"
+    assert added_line_nums == [51, 52]
@@ -0,0 +1,140 @@
+import difflib
+
+import libcst as cst
+import pytest
+
+from codemodder.codemods.metadata_cache import metadata_cache
+from codemodder.codemods.utils import KeepUnchangedNodes
+from codemodder.diff import create_diff, create_diff_from_edits
+from codemodder.edits import Edit, apply_edits, find_edits, split_lines
+
+CODE = """\
+# header
+
+import os  # comment
+x = '''a
+b'''
+
+# comment
+@decorator(
+    1,
+)
+
+# after decorator
+def f():
+    print(x)
+
+    # end of block
+
+class C:
+    def g(self):
+        print(os)
+y = 1
+z = 2
+# footer
+"""
+
+
+class ReplacePrint(KeepUnchangedNodes):
+    def leave_Name(self, original_node, updated_node):
+        if updated_node.value == "print":
+            return updated_node.with_changes(value="log")
+        return updated_node
+
+
+class RemoveY(KeepUnchangedNodes):
+    def leave_SimpleStatementLine(self, original_node, updated_node):
+        if cst.Module([]).code_for_node(original_node).startswith("y ="):
+            return cst.RemoveFromParent()
+        return updated_node
+
+
+class InsertAfterImport(KeepUnchangedNodes):
+    def leave_Module(self, original_node, updated_node):
+        body = list(updated_node.body)
+        body.insert(1, cst.parse_statement("import sys\n"))
+        return updated_node.with_changes(body=body)
+
+
+class ChangeFooter(KeepUnchangedNodes):
+    def leave_Module(self, original_node, updated_node):
+        return updated_node.with_changes(
+            footer=[cst.EmptyLine(comment=cst.Comment("# new footer"))]
+        )
+
+
+class Reorder(KeepUnchangedNodes):
+    def leave_Module(self, original_node, updated_node):
+        return updated_node.with_changes(body=list(reversed(updated_node.body)))
+
+
+def transform(code: str, transformer: cst.CSTTransformer):
+    source_tree = cst.parse_module(code)
+    new_tree = metadata_cache.wrapper(source_tree).module.visit(transformer)
+    return source_tree, new_tree
+
+
+@pytest.mark.parametrize(
+    "transformer",
+    [ReplacePrint(), RemoveY(), InsertAfterImport(), ChangeFooter()],
+)
+def test_spliced_code_matches_generated_code(transformer):
+    source_tree, new_tree = transform(CODE, transformer)
+    source_lines = split_lines(CODE)
+
+    edits = find_edits(source_lines, source_tree, new_tree)
+
+    assert edits is not None
+    new_lines = apply_edits(source_lines, edits)
+    assert "".join(new_lines) == new_tree.code
+    assert create_diff_from_edits(source_lines, new_lines, edits) == create_diff(
+        source_lines, new_lines
+    )
+
+
+def test_only_changed_statements_are_edited():
+    source_tree, new_tree = transform(CODE, ReplacePrint())
+
+    edits = find_edits(split_lines(CODE), source_tree, new_tree)
+
+    assert edits is not None
+    # The function with its decorator and comments, followed by the class
+    assert [(edit.start, edit.end) for edit in edits] == [(5, 20)]
+
+
+def test_unchanged_tree_has_no_edits():
+    source_tree = cst.parse_module(CODE)
+    new_tree = metadata_cache.wrapper(source_tree).module
+    assert find_edits(split_lines(CODE), source_tree, new_tree) == []
+
+
+@pytest.mark.parametrize(
+    "code,transformer",
+    [
+        (CODE, Reorder()),
+        ("print(1)", ReplacePrint()),
+    ],
+)
+def test_no_edits(code, transformer):
+    source_tree, new_tree = transform(code, transformer)
+    assert find_edits(split_lines(code), source_tree, new_tree) is None
+
+
+def test_overlapping_edits():
+    with pytest.raises(ValueError):
+        apply_edits(["a\n", "b\n", "c\n"], [Edit(0, 2, []), Edit(1, 3, [])])
+
+
+def test_split_lines():
+    assert split_lines("a\x0cb\r\nc\rd\n") == ["a\x0cb\r\n", "c\r", "d\n"]
+
+
+def test_diff_from_edits_numbers_lines_of_file():
+    source_lines = [f"{i}\n" for i in range(20)]
+    edits = [Edit(10, 11, ["ten\n"])]
+    new_lines = apply_edits(source_lines, edits)
+
+    diff = create_diff_from_edits(source_lines, new_lines, edits)
+
+    assert diff == "".join(difflib.unified_diff(source_lines, new_lines))
+    assert "@@ -8,7 +8,7 @@" in diff
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import git
+import pytest
+
+from codemodder.git_changes import changed_lines_since, parse_changed_lines
+
+DIFF = """\
+diff --git foo.py foo.py
+index 1234567..89abcde 100644
+--- foo.py
++++ foo.py
+@@ -2 +2 @@ import os
+-x = 1
++x = 2
+@@ -10,0 +11,3 @@ def f():
++    a = 1
++    b = 2
++    c = 3
+@@ -20,2 +22,0 @@ def g():
+-    pass
+-    pass
+diff --git only_removed.py only_removed.py
+index 1234567..89abcde 100644
+--- only_removed.py
++++ only_removed.py
+@@ -5 +4,0 @@
+-y = 1
+diff --git new.py new.py
+new file mode 100644
+index 0000000..89abcde
+--- /dev/null
++++ new.py
+@@ -0,0 +1,2 @@
++import os
++import sys
+"""
+
+
+def test_parse_changed_lines():
+    assert parse_changed_lines(DIFF) == {
+        "foo.py": [2, 11, 12, 13],
+        "new.py": [1, 2],
+    }
+
+
+class TestChangedLinesSince:
+    @pytest.fixture
+    def repo_dir(self, tmp_path):
+        repo = git.Repo.init(tmp_path)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "test")
+            config.set_value("user", "email", "test@example.com")
+
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "code.py").write_text("a = 1\nb = 2\nc = 3\n")
+        (tmp_path / "src" / "other.py").write_text("x = 1\n")
+        (tmp_path / "README.md").write_text("readme\n")
+        repo.index.add(["src/code.py", "src/other.py", "README.md"])
+        repo.index.commit("initial")
+        return tmp_path
+
+    def test_changed_lines(self, repo_dir):
+        (repo_dir / "src" / "code.py").write_text("a = 1\nb = 20\nc = 3\nd = 4\n")
+        (repo_dir / "README.md").write_text("changed\n")
+
+        assert changed_lines_since(repo_dir, "HEAD") == {Path("src/code.py"): [2, 4]}
+        assert changed_lines_since(repo_dir / "src", "HEAD") == {
+            Path("code.py"): [2, 4]
+        }
+
+    def test_untracked_files(self, repo_dir):
+        (repo_dir / ".gitignore").write_text("ignored.py\n")
+        (repo_dir / "src" / "new.py").write_text("a = 1\nb = 2")
+        (repo_dir / "src" / "ignored.py").write_text("a = 1\n")
+        (repo_dir / "src" / "empty.py").write_text("")
+
+        assert changed_lines_since(repo_dir, "HEAD") == {Path("src/new.py"): [1, 2]}
+
+    def test_bad_ref(self, repo_dir):
+        with pytest.raises(git.GitError):
+            changed_lines_since(repo_dir, "does-not-exist")
+
+    def test_not_a_repo(self, tmp_path_factory):
+        with pytest.raises(git.GitError):
+            changed_lines_since(tmp_path_factory.mktemp("not-a-repo"), "HEAD")
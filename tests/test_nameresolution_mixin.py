@@ -1,9 +1,14 @@
 from textwrap import dedent
 
 import libcst as cst
+import mock
 from libcst.codemod import Codemod, CodemodContext
+from libcst.metadata import ScopeProvider
 
-from codemodder.codemods.utils_mixin import NameResolutionMixin
+from codemodder.codemods.utils_mixin import (
+    NameAndAncestorResolutionMixin,
+    NameResolutionMixin,
+)
 
 
 class TestNameResolutionMixin:
@@ -185,3 +190,80 @@ class TestNameResolutionMixin:
         )
         tree = cst.parse_module(input_code)
         TestCodemod(CodemodContext()).transform_module(tree)
+
+    def test_memoized_per_tree(self):
+        class TestCodemod(Codemod, NameResolutionMixin):
+            def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+                return tree
+
+        def find_base_name(codemod, wrapper):
+            stmt = cst.ensure_type(wrapper.module.body[-1], cst.SimpleStatementLine)
+            node = cst.ensure_type(stmt.body[0], cst.Expr).value
+            with codemod.resolve(wrapper):
+                return codemod.find_base_name(node.func), codemod.get_scope_memo()
+
+        input_code = "from sys import executable as exec\nexec()\n"
+        wrapper = cst.MetadataWrapper(cst.parse_module(input_code))
+        first, second = TestCodemod(CodemodContext()), TestCodemod(CodemodContext())
+
+        with mock.patch.object(
+            first, "_find_base_name", wraps=first._find_base_name
+        ) as find_first:
+            assert find_base_name(first, wrapper)[0] == "sys.executable"
+            assert find_base_name(first, wrapper)[0] == "sys.executable"
+            find_first.assert_called_once()
+
+        # Codemods resolving names in the same tree share the results
+        with mock.patch.object(second, "_find_base_name") as find_second:
+            name, memo = find_base_name(second, wrapper)
+            assert name == "sys.executable"
+            find_second.assert_not_called()
+
+        # A new tree gets new results
+        other_wrapper = cst.MetadataWrapper(cst.parse_module(input_code))
+        assert find_base_name(second, other_wrapper)[1] is not memo
+
+    def test_used_names_memoized(self):
+        class TestCodemod(Codemod, NameResolutionMixin):
+            def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+                node = cst.ensure_type(tree.body[-1], cst.FunctionDef)
+                scope = self.get_metadata(ScopeProvider, node)
+
+                names = self.find_used_names_within_scope(scope)
+                assert names == {"a", "f"}
+                # Callers can't change the memoized names
+                names.add("b")
+                assert self.find_used_names_within_scope(scope) == {"a", "f"}
+                return tree
+
+        tree = cst.parse_module("a = 1\ndef f():\n    pass\n")
+        TestCodemod(CodemodContext()).transform_module(tree)
+
+    def test_def_use_memoized(self):
+        class TestCodemod(Codemod, NameAndAncestorResolutionMixin):
+            def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+                stmt = cst.ensure_type(tree.body[-1], cst.SimpleStatementLine)
+                name = cst.ensure_type(stmt.body[0], cst.Expr).value
+                first = cst.ensure_type(tree.body[0], cst.SimpleStatementLine)
+                value = cst.ensure_type(first.body[0], cst.Assign).value
+
+                with mock.patch.object(
+                    self, "_resolve_name", wraps=self._resolve_name
+                ) as resolve:
+                    assert self.resolve_expression(name).value == "'x'"
+                    assert self.resolve_expression(name).value == "'x'"
+                    # c, b and a are each resolved once
+                    assert resolve.call_count == 3
+
+                named, _ = self.find_transitive_assignment_targets(value)
+                expected = [n.value for n in named]
+                assert set(expected) == {"a", "b", "c"}
+                # Callers can't change the memoized targets
+                named.clear()
+                named, _ = self.find_transitive_assignment_targets(value)
+                assert [n.value for n in named] == expected
+                return tree
+
+        input_code = "a = 'x'\nb = a\nc = b\nc\n"
+        tree = cst.parse_module(input_code)
+        TestCodemod(CodemodContext()).transform_module(tree)
@@ -1,7 +1,30 @@
 import json
+from dataclasses import dataclass
 from pathlib import Path
 
-from codemodder.sonar_results import SonarResultSet
+import libcst as cst
+import pytest
+from libcst._position import CodeRange
+
+from codemodder.result import LineInfo, ResultIndex, ResultSet
+from codemodder.sonar_results import SonarLocation, SonarResult, SonarResultSet
+
+
+def make_location(line: int, file: str = "code.py", snippet=None) -> SonarLocation:
+    return SonarLocation(
+        file=Path(file),
+        start=LineInfo(line=line, column=1, snippet=snippet),
+        end=LineInfo(line=line, column=5, snippet=snippet),
+    )
+
+
+def make_result(line: int, rule_id: str = "rule") -> SonarResult:
+    return SonarResult(rule_id=rule_id, locations=[make_location(line)])
+
+
+@dataclass
+class ResultWithMessage(SonarResult):
+    message: str = ""
 
 
 class TestResults:
@@ -49,6 +72,93 @@ class TestResults:
         assert result2["rule"][Path("code.py")][0] in combined["rule"][Path("code.py")]
         assert result1["rule"][Path("code.py")][0] in combined["rule"][Path("code.py")]
 
+    def test_ior(self):
+        first = make_result(2)
+        second = make_result(1)
+        result1 = SonarResultSet()
+        result1.add_result(first)
+        result2 = SonarResultSet()
+        result2.add_result(second)
+        result2.add_result(make_result(3, rule_id="other"))
+
+        combined = result1
+        combined |= result2
+        assert combined is result1
+        assert combined["rule"][Path("code.py")] == [first, second]
+        assert len(combined["other"][Path("code.py")]) == 1
+        assert result2["rule"][Path("code.py")] == [second]
+
+    def test_from_json_files(self, tmpdir):
+        json_files = []
+        for page, line in enumerate([3, 1, 2]):
+            issues = {
+                "issues": [
+                    {
+                        "rule": "rule",
+                        "status": "OPEN",
+                        "component": "code.py",
+                        "textRange": {
+                            "startLine": line,
+                            "endLine": line,
+                            "startOffset": 1,
+                            "endOffset": 1,
+                        },
+                    }
+                ]
+            }
+            json_files.append(Path(tmpdir) / f"sonar{page}.json")
+            json_files[-1].write_text(json.dumps(issues))
+
+        combined = SonarResultSet.from_json_files(json_files)
+        # Results are merged in the order of the files
+        assert [
+            result.locations[0].start.line
+            for result in combined["rule"][Path("code.py")]
+        ] == [3, 1, 2]
+        assert SonarResultSet.from_json_files([]) == SonarResultSet()
+
+    def test_query(self):
+        results = ResultSet()
+        first = make_result(1)
+        second = SonarResult(
+            rule_id="rule",
+            locations=[make_location(2, snippet="x = 1"), make_location(3, "other.py")],
+        )
+        results.add_result(first)
+        results.add_result(second)
+        results.add_result(make_result(4, rule_id="other"))
+
+        assert results.all_rule_ids() == ["rule", "other"]
+        assert results.files_for_rule("rule") == [Path("code.py"), Path("other.py")]
+        assert results.files_for_rule("missing") == []
+        assert "rule" in results and "missing" not in results
+        assert results.results_for_rule_and_file(None, "rule", Path("code.py")) == [
+            first,
+            second,
+        ]
+        assert results.results_for_rule_and_file(None, "rule", Path("other.py")) == [
+            second
+        ]
+        assert results.results_for_rule_and_file(None, "rule", Path("none.py")) == []
+        assert not hasattr(results["rule"][Path("code.py")][0], "__dict__")
+
+    def test_result_listed_once_per_file(self):
+        results = ResultSet()
+        result = SonarResult(
+            rule_id="rule", locations=[make_location(1), make_location(2)]
+        )
+        results.add_result(result)
+        assert results["rule"][Path("code.py")] == [result]
+
+    def test_result_with_extra_fields(self):
+        results = ResultSet()
+        result = ResultWithMessage(
+            rule_id="rule", locations=[make_location(1)], message="message"
+        )
+        results.add_result(result)
+        results |= ResultSet()
+        assert results["rule"][Path("code.py")][0] is result
+
     def test_sonar_only_open_issues(self, tmpdir):
         issues = {
             "issues": [
@@ -89,3 +199,62 @@ class TestResults:
         result = SonarResultSet.from_json(sonar_json)
         # did not crash and returned an empty ResultSet
         assert not result
+
+
+class TestResultIndex:
+    def test_results_for_position(self):
+        first = make_result(2)
+        second = make_result(2, rule_id="other")
+        multiline = SonarResult(
+            rule_id="rule",
+            locations=[
+                SonarLocation(
+                    file=Path("code.py"),
+                    start=LineInfo(line=3, column=1, snippet=None),
+                    end=LineInfo(line=5, column=1, snippet=None),
+                )
+            ],
+        )
+        index = ResultIndex([first, second, multiline])
+
+        assert index.results_for_position(CodeRange((2, 0), (2, 4))) == [
+            first,
+            second,
+        ]
+        assert index.results_for_position(CodeRange((3, 0), (5, 1))) == [multiline]
+        assert index.results_for_position(CodeRange((3, 0), (3, 1))) == []
+
+    @pytest.mark.parametrize(
+        "start_line,end_line,expected",
+        [(1, 1, False), (1, 2, True), (3, 3, True), (6, 9, True), (10, 12, False)],
+    )
+    def test_overlaps_lines(self, start_line, end_line, expected):
+        multiline = SonarResult(
+            rule_id="rule",
+            locations=[
+                SonarLocation(
+                    file=Path("code.py"),
+                    start=LineInfo(line=4, column=1, snippet=None),
+                    end=LineInfo(line=7, column=1, snippet=None),
+                )
+            ],
+        )
+        index = ResultIndex([make_result(2), multiline, make_result(3)])
+        assert index.overlaps_lines(start_line, end_line) == expected
+        assert not ResultIndex([]).overlaps_lines(start_line, end_line)
+
+    def test_match_location(self):
+        index = ResultIndex([make_result(2)])
+        node = cst.Name("x")
+
+        assert index.match_location(CodeRange((2, 1), (2, 5)), node)
+        assert not index.match_location(CodeRange((2, 2), (2, 7)), node)
+        assert not index.match_location(CodeRange((1, 1), (1, 5)), node)
+
+    def test_match_location_sonar_tuple(self):
+        index = ResultIndex([make_result(2)])
+        pos = CodeRange((2, 2), (2, 4))
+
+        # Sonar tuple locations don't include the parentheses
+        assert index.match_location(pos, cst.Tuple([]))
+        assert not index.match_location(pos, cst.Name("x"))
@@ -1,8 +1,18 @@
+import io
 import json
 import subprocess
 from pathlib import Path
 
-from codemodder.sarifs import SarifResultSet, extract_rule_id
+import pytest
+
+from codemodder.sarifs import (
+    JsonStream,
+    SarifResult,
+    SarifResultSet,
+    detect_sarif_tools,
+    extract_rule_id,
+    iter_sarif_tools,
+)
 
 
 class TestSarifProcessing:
@@ -43,6 +53,133 @@ class TestSarifProcessing:
             results[expected_rule][expected_path][0].locations[0].file == expected_path
         )
 
+    @pytest.mark.parametrize(
+        "sarif_file",
+        ["tests/samples/semgrep.sarif", "tests/samples/webgoat_v8.2.0_codeql.sarif"],
+    )
+    def test_streamed_results_match_loaded(self, mocker, sarif_file):
+        with open(sarif_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        expected = SarifResultSet()
+        for sarif_run in data["runs"]:
+            for result in sarif_run["results"]:
+                expected.add_result(SarifResult.from_sarif(result, sarif_run))
+
+        # Values are split across many reads of the file
+        mocker.patch.object(JsonStream, "chunk_size", 16)
+        assert SarifResultSet.from_sarif(sarif_file) == expected
+
+    def test_tool_after_results(self, tmp_path):
+        location = {
+            "physicalLocation": {
+                "artifactLocation": {"uri": "code.py"},
+                "region": {
+                    "startLine": 1,
+                    "startColumn": 1,
+                    "endLine": 1,
+                    "endColumn": 5,
+                },
+            }
+        }
+        sarif = {
+            "runs": [
+                {
+                    "results": [
+                        {
+                            "rule": {"index": 1, "toolComponent": {"index": 0}},
+                            "locations": [location],
+                        }
+                    ],
+                    "tool": {
+                        "driver": {"name": "tool"},
+                        "extensions": [{"rules": [{"id": "first"}, {"id": "second"}]}],
+                    },
+                }
+            ]
+        }
+        sarif_file = tmp_path / "results.sarif"
+        sarif_file.write_text(json.dumps(sarif))
+
+        results = SarifResultSet.from_sarif(sarif_file)
+        assert list(results) == ["second"]
+        assert list(results["second"]) == [Path("code.py")]
+
+    def test_iter_sarif_tools(self, tmp_path):
+        sarif_file = tmp_path / "results.sarif"
+        sarif_file.write_text(
+            '{"version": "2.1.0", "runs": ['
+            '{"tool": {"driver": {"name": "x"}}, "results": [{"a": [true]}]}, '
+            '{"results": [], "tool": {"driver": {"name": "y"}}}, '
+            '{"results": []}'
+            "]}"
+        )
+        assert list(iter_sarif_tools(sarif_file)) == [
+            {"driver": {"name": "x"}},
+            {"driver": {"name": "y"}},
+        ]
+
+        sarif_file.write_text('{"runs": []}')
+        assert list(iter_sarif_tools(sarif_file)) == []
+
+    def test_detect_sarif_tools(self, mocker):
+        class SemgrepDetector:
+            @classmethod
+            def detect(cls, run_data):
+                return run_data["tool"]["driver"]["name"] == "semgrep"
+
+        entry_point = mocker.Mock()
+        entry_point.name = "semgrep"
+        entry_point.load.return_value = SemgrepDetector
+        mocker.patch(
+            "codemodder.sarifs.entry_points"
+        ).return_value.select.return_value = [entry_point]
+
+        semgrep_sarif = Path("tests/samples/semgrep.sarif")
+        codeql_sarif = Path("tests/samples/webgoat_v8.2.0_codeql.sarif")
+        assert detect_sarif_tools([semgrep_sarif, codeql_sarif]) == {
+            "semgrep": [str(semgrep_sarif)]
+        }
+
+    def test_read_snippet(self, tmp_path):
+        (tmp_path / "code.py").write_text("a = 1\nb = 2\nc = 3\n")
+        sarif_file = tmp_path / "results.sarif"
+        sarif_file.write_text(
+            json.dumps(
+                {
+                    "runs": [
+                        {
+                            "tool": {"driver": {"name": "tool"}},
+                            "results": [
+                                {
+                                    "ruleId": "rule",
+                                    "locations": [
+                                        {
+                                            "physicalLocation": {
+                                                "artifactLocation": {"uri": "code.py"},
+                                                "region": {
+                                                    "startLine": 2,
+                                                    "startColumn": 1,
+                                                    "endLine": 3,
+                                                    "endColumn": 6,
+                                                    "snippet": {"text": "b = 2\nc = 3"},
+                                                },
+                                            }
+                                        }
+                                    ],
+                                }
+                            ],
+                        }
+                    ]
+                }
+            )
+        )
+
+        location = SarifResultSet.from_sarif(sarif_file)["rule"][Path("code.py")][
+            0
+        ].locations[0]
+        assert location.start.snippet is None
+        assert location.read_snippet(tmp_path) == "b = 2\nc = 3\n"
+
     def test_codeql_sarif_input(self, tmpdir):
         completed_process = subprocess.run(
             [
@@ -59,3 +196,50 @@ class TestSarifProcessing:
             check=False,
         )
         assert completed_process.returncode == 0
+
+
+class TestJsonStream:
+    def test_walk(self, mocker):
+        mocker.patch.object(JsonStream, "chunk_size", 1)
+        stream = JsonStream(
+            io.StringIO(' { "a" : 12345, "b": [1, 22, null, true], "c": {}, "d": []}')
+        )
+        values: dict = {}
+        for key in stream.items():
+            if key == "b":
+                values[key] = []
+                for _ in stream.elements():
+                    values[key].append(stream.value())
+            else:
+                values[key] = stream.value()
+
+        assert values == {"a": 12345, "b": [1, 22, None, True], "c": {}, "d": []}
+
+    @pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+    def test_skip(self, mocker, chunk_size):
+        mocker.patch.object(JsonStream, "chunk_size", chunk_size)
+        stream = JsonStream(
+            io.StringIO(
+                '{"a": [1, {"b": "]}\\"[{"}, [], "\\\\"], "c": 2, "d": {"e": [3]}, "f": "g"}'
+            )
+        )
+        values: dict = {}
+        for key in stream.items():
+            if key == "c":
+                values[key] = stream.value()
+            else:
+                stream.skip()
+
+        assert values == {"c": 2}
+
+    def test_invalid(self):
+        stream = JsonStream(io.StringIO('{"a": [1, 2'))
+        with pytest.raises(ValueError):
+            for _ in stream.items():
+                for _ in stream.elements():
+                    stream.value()
+
+        stream = JsonStream(io.StringIO('{"a": [1, "]'))
+        with pytest.raises(ValueError):
+            for _ in stream.items():
+                stream.skip()
@@ -0,0 +1,55 @@
+from codemodder.triggers import TriggerScanner
+
+
+class TestTriggerScanner:
+    def test_found(self, tmp_path):
+        code_path = tmp_path / "code.py"
+        code_path.write_text("import yaml as y\n# pickle\nmy_yaml = y.load(data)\n")
+
+        scanner = TriggerScanner(["yaml", "pickle", "load", "jwt"])
+        assert scanner.found(code_path) == {"yaml", "pickle", "load"}
+
+    def test_found_whole_words_only(self, tmp_path):
+        code_path = tmp_path / "code.py"
+        code_path.write_text("pyyaml = yaml_loader(mktemp_name)\n")
+
+        scanner = TriggerScanner(["yaml", "mktemp"])
+        assert scanner.found(code_path) == set()
+
+    def test_found_unreadable(self, tmp_path):
+        scanner = TriggerScanner(["yaml"])
+        assert scanner.found(tmp_path / "missing.py") is None
+
+    def test_filter(self, tmp_path):
+        files = []
+        for name, code in [
+            ("yaml_code.py", "import yaml\n"),
+            ("pickle_code.py", "import pickle\n"),
+            ("other_code.py", "import os\n"),
+        ]:
+            (path := tmp_path / name).write_text(code)
+            files.append(path)
+        missing = tmp_path / "missing.py"
+
+        scanner = TriggerScanner()
+        assert scanner.filter(files, []) == files
+        assert scanner.filter(files + [missing], ["yaml", "pickle"]) == [
+            files[0],
+            files[1],
+            missing,
+        ]
+        assert scanner.filter(files, ["pickle"]) == [files[1]]
+
+    def test_scanned_once(self, tmp_path, mocker):
+        code_path = tmp_path / "code.py"
+        code_path.write_text("import yaml\n")
+        read_bytes = mocker.spy(type(code_path), "read_bytes")
+
+        scanner = TriggerScanner(["yaml", "pickle"])
+        assert scanner.filter([code_path], ["yaml"]) == [code_path]
+        assert scanner.filter([code_path], ["pickle"]) == []
+        assert read_bytes.call_count == 1
+
+        # New trigger names require scanning the file again
+        assert scanner.filter([code_path], ["os"]) == []
+        assert read_bytes.call_count == 2